@@ -1,4 +1,5 @@
 from fastapi import FastAPI, HTTPException, Header, Request
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
@@ -9,26 +10,84 @@ import uuid
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(ROOT))
 
-from models.baseline import BaselineDetector
+from models.factory import create_detector
+from models.cascade import CascadeDetector
+from models.face_crop import FaceCropDetector
+from models.audio import AudioScorer, TorchScriptAudioModel
+from scripts.extract_frames import download_video, iter_frames, low_res_format, stream_frames, video_frames_from_url
 from config import ALLOWED_API_KEYS, RATE_LIMIT_PER_MIN
 from config import PERPLEXITY_API_KEY, PERPLEXITY_BASE_URL, PERPLEXITY_MODEL, PERPLEXITY_TIMEOUT
+from config import INFERENCE_MAX_BATCH_SIZE, INFERENCE_MAX_WAIT_MS
+from config import INFERENCE_WORKERS, INFERENCE_THREADS_PER_WORKER
+from config import DETECTOR_BACKEND, MODEL_REPOSITORY, ONNX_MODEL_NAME, ONNX_MODEL_VERSION
+from config import ONNX_INTRA_OP_THREADS, ONNX_INTER_OP_THREADS, ONNX_GRAPH_OPTIMIZATION_LEVEL
+from config import TORCH_MODEL_PATH, TORCH_MODEL_NAME, TORCH_MODEL_VERSION
+from config import TORCH_FREEZE, TORCH_CHANNELS_LAST, TORCH_NUM_THREADS
+from config import TRITON_URL, TRITON_MODEL_NAME, TRITON_MODEL_VERSION, TRITON_MAX_BATCH_SIZE
+from config import TRITON_TIMEOUT, TRITON_RETRIES, TRITON_MAX_CONCURRENT_REQUESTS
+from config import MODEL_WEIGHTS_PATH, MODEL_ALLOW_DOWNLOAD, MODEL_PRELOAD, MODEL_WARMUP_BATCH_SIZES
+from config import PHASH_CACHE_ENABLED, PHASH_CACHE_MAX_ENTRIES, PHASH_CACHE_RADIUS, PHASH_CACHE_METHOD
+from config import CONTENT_CACHE_ENABLED, CONTENT_CACHE_PATH, CONTENT_CACHE_MAX_BYTES, CONTENT_CACHE_TTL_SECONDS
+from config import MODEL_VERSION
+from config import CASCADE_ENABLED, CASCADE_TRIAGE_WEIGHTS, CASCADE_LOW, CASCADE_HIGH
+from config import FACE_CROP_ENABLED, FACE_DETECTOR, FACE_DETECTOR_MODEL, FACE_CROP_PADDING
+from config import FACE_CROP_MAX_FACES, FACE_CROP_NO_FACE
+from config import URL_CACHE_ENABLED, URL_CACHE_MAX_ENTRIES, URL_CACHE_TTLS
+from config import SCAM_INDEX_ENABLED, SCAM_INDEX_DIR, SCAM_INDEX_THRESHOLD, SCAM_INDEX_BRUTE_FORCE_MAX, SCAM_INDEX_NPROBE
+from config import VIDEO_FRAME_SAMPLING, ADAPTIVE_SAMPLING_ENABLED, VIDEO_CANDIDATE_FRAMES, VIDEO_MAX_SCORED_FRAMES
+from config import VIDEO_SCENE_THRESHOLD, VIDEO_CONFIDENCE_MARGIN
+from config import VIDEO_DOWNLOAD_MODE, VIDEO_MAX_HEIGHT, VIDEO_STREAM_INTERVAL
+from config import VIDEO_CACHE_ENABLED, VIDEO_CACHE_DIR, VIDEO_CACHE_MAX_BYTES
+from config import AUDIO_MODEL_PATH, AUDIO_WINDOW_SECONDS, AUDIO_BATCH_WINDOWS, AUDIO_MAX_SECONDS, AUDIO_MAX_ABR
+from config import HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE_CONNECTIONS, HTTP_KEEPALIVE_EXPIRY
+from config import HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_TOTAL_TIMEOUT, HTTP2_ENABLED, MEDIA_MAX_BYTES
+from config import MEDIA_FOLLOW_REDIRECTS, HTTP_MAX_REDIRECTS
+from config import SCAN_JOBS_ENABLED, SCAN_JOB_WORKERS, SCAN_JOB_QUEUE_SIZE, SCAN_JOB_TTL_SECONDS
 from app.services.perplexity import create_perplexity_service
 from app.services.api_key_manager import APIKeyManager
 from app.services.webhook_service import WebhookService
-import httpx
+from app.services.inference_scheduler import InferenceScheduler
+from app.services.model_registry import ModelRegistry
+from app.services.inference_pool import InferencePool
+from app.services.phash_cache import PerceptualHashCache
+from app.services.content_cache import ContentResultCache
+from app.services.url_cache import UrlResultCache
+from app.services.embedding_index import ScamEmbeddingIndex, compact_embeddings, pack_embeddings, unpack_embeddings
+from app.services.adaptive_sampler import AdaptiveFrameSampler
+from app.services.video_cache import VideoDownloadCache
+from app.services.scan_jobs import ScanJobQueue, ScanQueueFull
+from app.services.http_client import SharedHttpClient
+from app.services.media_fetch import MediaFetcher
 import numpy as np
 import cv2
 import csv
 from pathlib import Path
 import asyncio
-import tempfile
-import subprocess
 import glob
 import os
+from contextlib import asynccontextmanager
 from typing import Optional
 
 
-app = FastAPI(title="DeepfakeGuard API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    http_client.start()
+    if MODEL_PRELOAD:
+        # load + warm up in the background; /ready reports when done
+        model_registry.start()
+    if scan_jobs:
+        scan_jobs.start()
+    yield
+    if scan_jobs:
+        await scan_jobs.stop()
+    await inference_scheduler.stop()
+    await http_client.aclose()
+    model_registry.close()
+    if content_cache:
+        content_cache.close()
+
+
+app = FastAPI(title="DeepfakeGuard API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -42,6 +101,8 @@ app.add_middleware(
 class DetectRequest(BaseModel):
     url: str
     source: str | None = None
+    # video scans are queued as jobs unless the client asks to wait
+    wait: bool = False
 
 
 class DetectResponse(BaseModel):
@@ -50,7 +111,207 @@ class DetectResponse(BaseModel):
     details: dict | None = None
 
 
-detector = BaselineDetector()
+detector_options = {"max_batch_size": INFERENCE_MAX_BATCH_SIZE}
+if DETECTOR_BACKEND == "onnx":
+    detector_options.update(
+        model_repository=MODEL_REPOSITORY,
+        model_name=ONNX_MODEL_NAME,
+        version=ONNX_MODEL_VERSION,
+        intra_op_threads=ONNX_INTRA_OP_THREADS,
+        inter_op_threads=ONNX_INTER_OP_THREADS,
+        graph_optimization_level=ONNX_GRAPH_OPTIMIZATION_LEVEL,
+    )
+elif DETECTOR_BACKEND == "triton":
+    detector_options.update(
+        url=TRITON_URL,
+        model_name=TRITON_MODEL_NAME,
+        version=TRITON_MODEL_VERSION,
+        max_batch_size=min(INFERENCE_MAX_BATCH_SIZE, TRITON_MAX_BATCH_SIZE),
+        timeout=TRITON_TIMEOUT,
+        retries=TRITON_RETRIES,
+        max_connections=TRITON_MAX_CONCURRENT_REQUESTS,
+    )
+else:
+    detector_options["channels_last"] = TORCH_CHANNELS_LAST
+    if INFERENCE_WORKERS == 0 and TORCH_NUM_THREADS:
+        # worker processes use INFERENCE_THREADS_PER_WORKER instead
+        detector_options["num_threads"] = TORCH_NUM_THREADS
+    if TORCH_MODEL_PATH:
+        detector_options.update(model_path=TORCH_MODEL_PATH, freeze=TORCH_FREEZE)
+    elif TORCH_MODEL_NAME:
+        detector_options.update(
+            model_repository=MODEL_REPOSITORY,
+            model_name=TORCH_MODEL_NAME,
+            version=TORCH_MODEL_VERSION,
+            freeze=TORCH_FREEZE,
+        )
+    else:
+        detector_options.update(weights_path=MODEL_WEIGHTS_PATH, allow_download=MODEL_ALLOW_DOWNLOAD)
+
+
+# Repository model whose versions can be hot-swapped (None: fixed model)
+if DETECTOR_BACKEND == "onnx":
+    registry_model_name, registry_version = ONNX_MODEL_NAME, ONNX_MODEL_VERSION
+elif TORCH_MODEL_NAME and not TORCH_MODEL_PATH:
+    registry_model_name, registry_version = TORCH_MODEL_NAME, TORCH_MODEL_VERSION
+else:
+    registry_model_name, registry_version = None, None
+
+
+def _build_detector(version: int | None = None):
+    options = dict(detector_options)
+    if version is not None:
+        options["version"] = version
+    if INFERENCE_WORKERS > 0:
+        # one detector per worker process; frames travel via shared memory
+        detector = InferencePool(
+            create_detector,
+            {"backend": DETECTOR_BACKEND, **options},
+            workers=INFERENCE_WORKERS,
+            warmup_batch_sizes=MODEL_WARMUP_BATCH_SIZES,
+            threads_per_worker=INFERENCE_THREADS_PER_WORKER,
+        )
+    else:
+        detector = create_detector(DETECTOR_BACKEND, **options)
+    if FACE_CROP_ENABLED:
+        # the model sees padded face crops (batched) instead of whole frames
+        detector = FaceCropDetector(
+            detector,
+            no_face=FACE_CROP_NO_FACE,
+            method=FACE_DETECTOR,
+            model_path=FACE_DETECTOR_MODEL,
+            padding=FACE_CROP_PADDING,
+            max_faces=FACE_CROP_MAX_FACES,
+        )
+    if CASCADE_ENABLED:
+        # cheap triage in the API process; only uncertain frames reach the model
+        detector = CascadeDetector(
+            detector, low=CASCADE_LOW, high=CASCADE_HIGH, triage_weights_path=CASCADE_TRIAGE_WEIGHTS
+        )
+    return detector
+
+
+# The detector is built lazily (never at import time) and warmed up before
+# use; new versions are loaded next to it and swapped in without downtime
+model_registry = ModelRegistry(
+    _build_detector,
+    model_repository=MODEL_REPOSITORY if registry_model_name else None,
+    model_name=registry_model_name,
+    version=registry_version,
+    warmup_batch_sizes=MODEL_WARMUP_BATCH_SIZES,
+)
+
+
+def _cache_model_version(version: int | None) -> str:
+    """Result-cache tag for the served model version."""
+    return MODEL_VERSION if version is None else f"{MODEL_VERSION}@{version}"
+
+
+# Groups frames from concurrent scans into shared forward passes
+inference_scheduler = InferenceScheduler(
+    model_registry.predict_frames_with_embeddings,
+    max_batch_size=INFERENCE_MAX_BATCH_SIZE,
+    max_wait_ms=INFERENCE_MAX_WAIT_MS,
+    # remote inference only waits on I/O, so keep several batches in flight
+    max_concurrent_batches=TRITON_MAX_CONCURRENT_REQUESTS if DETECTOR_BACKEND == "triton" else max(1, INFERENCE_WORKERS),
+)
+
+# Perceptual-hash index of scored images: near-duplicates skip inference
+phash_cache = None
+if PHASH_CACHE_ENABLED:
+    phash_cache = PerceptualHashCache(
+        max_entries=PHASH_CACHE_MAX_ENTRIES,
+        radius=PHASH_CACHE_RADIUS,
+        method=PHASH_CACHE_METHOD,
+    )
+
+# Results by SHA-256 of fetched bytes, persisted across restarts
+content_cache = None
+if CONTENT_CACHE_ENABLED:
+    content_cache = ContentResultCache(
+        CONTENT_CACHE_PATH,
+        model_version=_cache_model_version(model_registry.version),
+        max_bytes=CONTENT_CACHE_MAX_BYTES,
+        ttl_seconds=CONTENT_CACHE_TTL_SECONDS,
+    )
+
+# Scan results by normalized URL, with per-media-type TTLs and negative caching
+url_cache = UrlResultCache(URL_CACHE_TTLS, max_entries=URL_CACHE_MAX_ENTRIES) if URL_CACHE_ENABLED else None
+
+# Frame embeddings of reviewer-confirmed scams, matched against every scan
+scam_index = None
+if SCAM_INDEX_ENABLED:
+    scam_index = ScamEmbeddingIndex(
+        SCAM_INDEX_DIR,
+        brute_force_max=SCAM_INDEX_BRUTE_FORCE_MAX,
+        nprobe=SCAM_INDEX_NPROBE,
+    )
+
+# Video frames are scored scene by scene until the verdict is clear
+frame_sampler = None
+if ADAPTIVE_SAMPLING_ENABLED:
+    frame_sampler = AdaptiveFrameSampler(
+        threshold=0.6,
+        margin=VIDEO_CONFIDENCE_MARGIN,
+        scene_threshold=VIDEO_SCENE_THRESHOLD,
+        max_frames=VIDEO_MAX_SCORED_FRAMES,
+    )
+
+# Voice-clone scoring of the audio track of videos, alongside the frames
+audio_scorer = None
+if AUDIO_MODEL_PATH:
+    audio_scorer = AudioScorer(
+        TorchScriptAudioModel(AUDIO_MODEL_PATH),
+        window_seconds=AUDIO_WINDOW_SECONDS,
+        batch_windows=AUDIO_BATCH_WINDOWS,
+        max_seconds=AUDIO_MAX_SECONDS,
+    )
+
+# Pooled keep-alive connections for media fetches and webhooks
+http_client = SharedHttpClient(
+    max_connections=HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    connect_timeout=HTTP_CONNECT_TIMEOUT,
+    read_timeout=HTTP_READ_TIMEOUT,
+    total_timeout=HTTP_TOTAL_TIMEOUT,
+    http2=HTTP2_ENABLED,
+    max_redirects=HTTP_MAX_REDIRECTS,
+    headers={"User-Agent": "DeepfakeGuard/1.0"},
+)
+WebhookService.http_client = http_client
+
+# Streams media URLs, sniffs their type and gives up early on non-media
+media_fetcher = MediaFetcher(http_client, max_bytes=MEDIA_MAX_BYTES, follow_redirects=MEDIA_FOLLOW_REDIRECTS)
+
+# Downloaded videos shared across scans of any link to the same video
+video_cache = None
+if VIDEO_CACHE_ENABLED and VIDEO_DOWNLOAD_MODE == "file":
+    video_cache = VideoDownloadCache(
+        VIDEO_CACHE_DIR,
+        download_fn=lambda url, out_path: download_video(
+            url, out_path, low_res_format(VIDEO_MAX_HEIGHT), max_bytes=MEDIA_MAX_BYTES
+        ),
+        max_bytes=VIDEO_CACHE_MAX_BYTES,
+    )
+
+
+def _cached_video_frames(url: str, n_frames: int) -> list:
+    with video_cache.fetch(url) as path:
+        return list(iter_frames(path, n_frames, VIDEO_FRAME_SAMPLING))
+
+
+def _on_model_swap(version: int | None):
+    # results of the previous model must not be served for the new one
+    if phash_cache:
+        phash_cache.clear()
+    if url_cache:
+        url_cache.clear()
+    if content_cache:
+        content_cache.set_model_version(_cache_model_version(version))
+
+
+model_registry.on_swap.append(_on_model_swap)
 
 # Initialize Perplexity service if API key is available
 perplexity_service = None
@@ -98,130 +359,315 @@ async def health():
     return {"status": "ok"}
 
 
-@app.post("/v1/scan", response_model=DetectResponse)
-async def scan_media(
-    req: DetectRequest,
-    x_api_key: Optional[str] = Header(None, alias="X-API-Key")
-):
-    """
-    Scan media for deepfake detection.
-    
-    This is the primary API endpoint for customers. Requires API key authentication.
-    Supports images and videos via URL.
-    
-    **Authentication**: Include your API key in the `X-API-Key` header.
-    
-    **Free tier**: 10 scans/month
-    **Pro tier**: 500 scans/month with manual review
-    **Enterprise tier**: Unlimited scans with dedicated review team
-    """
-    if not req.url:
-        raise HTTPException(status_code=400, detail="url is required")
-    
-    # Validate API key and check usage limits
-    is_valid, user_data, error_msg = APIKeyManager.validate_api_key(x_api_key)
-    if not is_valid:
-        raise HTTPException(status_code=401, detail=error_msg or "Invalid API key")
-    
-    scan_id = str(uuid.uuid4())
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 200 once the model is loaded and warmed up; 503 before, or
+    when loading failed or the detector is serving fallback scores (`degraded`)."""
+    status = model_registry.get_status()
+    if not model_registry.is_ready:
+        raise HTTPException(status_code=503, detail=status)
+    return status
+
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+
+def _is_video_url(url: str) -> bool:
+    url_lower = url.lower()
+    return any(x in url_lower for x in ("youtube.com", "youtu.be")) or ".mp4" in url_lower
+
 
-    url_lower = req.url.lower()
+async def _match_confirmed_scam(embeddings, flags: list, details: dict):
+    """Flag frames close to ones reviewers confirmed as scams (updates `flags`/`details`)."""
+    if scam_index is None or embeddings is None or "matches_confirmed_scam" in flags:
+        return
+    match = await asyncio.to_thread(scam_index.best_match, embeddings, SCAM_INDEX_THRESHOLD)
+    if match is not None:
+        flags.append("matches_confirmed_scam")
+        details["scam_match"] = {"scan_id": match[0], "similarity": round(match[1], 4)}
+
+
+class VideoScanDeferred(Exception):
+    """Raised by `analyze_media(defer_video=True)` once `url` turns out to be a video."""
+
+
+async def analyze_media(url: str, defer_video: bool = False) -> dict:
+    """Run URL heuristics and the detector on the media behind `url`.
+
+    Returns `score`, `flags`, `details`, the `media_type` that was analysed
+    (`image`, `video` or `other`), `error` when fetching/decoding failed
+    (the heuristic score is still returned in that case) and the frame
+    `embeddings` from the detector or a cached result (None otherwise).
+
+    With `defer_video`, a URL routed to the video pipeline raises
+    `VideoScanDeferred` instead of being downloaded, so the caller can
+    queue it as a scan job.
+    """
+    url_lower = url.lower()
     score = 0.05
     flags: list[str] = []
+    scan_details: dict = {}
+    media_type = "other"
+    embeddings = None
+
+    def result(error: str | None = None) -> dict:
+        return {
+            "score": score,
+            "flags": flags,
+            "details": scan_details,
+            "media_type": media_type,
+            "error": error,
+            "embeddings": embeddings,
+        }
+
+    def note_degraded_model():
+        # fallback scores are reported but never cached
+        if model_registry.degraded:
+            scan_details["model_degraded"] = True
 
     # Fast heuristic checks
     if "giveaway" in url_lower or "airdrop" in url_lower:
         score = 0.7
         flags.append("contains_giveaway_keyword")
 
-    # If URL points to an image, attempt to fetch and run baseline model
-    if any(req.url.lower().endswith(ext) for ext in (".jpg", ".jpeg", ".png", ".webp")):
+    # Anything else over HTTP is streamed just far enough to tell what it is
+    route = "video" if _is_video_url(url) else None
+    fetched = None
+    if route is None and url_lower.startswith(("http://", "https://")):
+        looks_like_image = any(url_lower.split("?")[0].endswith(ext) for ext in IMAGE_EXTENSIONS)
         try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                r = await client.get(req.url)
-                r.raise_for_status()
-                data = np.frombuffer(r.content, dtype=np.uint8)
+            fetched = await media_fetcher.fetch(url)
+            route = fetched["media_type"]
+        except Exception as e:
+            if looks_like_image:
+                # non-fatal: return heuristic result and note the error
+                media_type = "image"
+                return result(error=str(e))
+            # pages and other non-media links are simply not model-scored
+            scan_details["fetch"] = str(e)
+
+    if route == "image":
+        media_type = "image"
+        try:
+            # byte-identical content scored before skips decode and inference
+            content_key = ContentResultCache.content_key(fetched["data"]) if content_cache else None
+            # SQLite lookups and writes run off the event loop
+            cached = await asyncio.to_thread(content_cache.get, content_key) if content_cache else None
+            if cached is not None:
+                img_score = cached["score"]
+                model_flags = list(cached["flags"])
+                embeddings = unpack_embeddings(cached.get("embeddings"))
+                scan_details["content_match"] = True
+            else:
+                data = np.frombuffer(fetched["data"], dtype=np.uint8)
                 img = cv2.imdecode(data, cv2.IMREAD_COLOR)
                 if img is None:
                     raise ValueError("could not decode image")
                 # convert BGR -> RGB
                 img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                probs = detector.predict_frames([img])
-                img_score = float(np.mean(probs))
-                # blend heuristic and model score
-                score = max(score, img_score * 0.95)
-                if img_score > 0.6:
-                    flags.append("model_suspect_frame")
+                # near-duplicates of an already scored image reuse its result
+                img_hash = phash_cache.hash_image(img) if phash_cache else None
+                cached = phash_cache.lookup(img_hash) if phash_cache else None
+                if cached is not None:
+                    img_score = cached["score"]
+                    model_flags = list(cached["flags"])
+                    embeddings = cached.get("embeddings")
+                    scan_details["phash_match"] = {"distance": cached["distance"]}
+                else:
+                    probs, embeddings = await inference_scheduler.predict_frames_with_embeddings([img])
+                    img_score = float(np.mean(probs))
+                    model_flags = ["model_suspect_frame"] if img_score > 0.6 else []
+                    note_degraded_model()
+                    if phash_cache and not scan_details.get("model_degraded"):
+                        # embeddings are kept so cached copies are still matched against new confirmations
+                        phash_cache.store(
+                            img_hash, {"score": img_score, "flags": model_flags, "embeddings": compact_embeddings(embeddings)}
+                        )
+                if content_cache and not scan_details.get("model_degraded"):
+                    await asyncio.to_thread(
+                        content_cache.put,
+                        content_key,
+                        {"score": img_score, "flags": model_flags, "embeddings": pack_embeddings(embeddings)},
+                    )
+            # blend heuristic and model score
+            score = max(score, img_score * 0.95)
+            flags.extend(model_flags)
+            await _match_confirmed_scam(embeddings, flags, scan_details)
         except Exception as e:
             # non-fatal: return heuristic result and note the error
-            return {"score": score, "flags": flags, "details": {"source": req.source, "error": str(e)}}
+            return result(error=str(e))
 
-    # If URL looks like a video (YouTube) try to download and extract frames
-    if any(x in url_lower for x in ("youtube.com", "youtu.be")) or ".mp4" in url_lower:
+    # Video links (YouTube, .mp4, or sniffed as video): download and extract frames
+    if route == "video" and defer_video:
+        raise VideoScanDeferred(url)
+    if route == "video":
+        media_type = "video"
         try:
-            async def run_extract_and_score(url: str) -> float | None:
-                with tempfile.TemporaryDirectory() as tmpdir:
-                    out_dir = Path(tmpdir) / "frames"
-                    cmd = [sys.executable, str(ROOT / "scripts" / "extract_frames.py"), url, str(out_dir), "4"]
-
-                    def run_cmd():
-                        subprocess.check_call(cmd)
-
-                    await asyncio.to_thread(run_cmd)
-
-                    frames = []
-                    for p in sorted(out_dir.glob("*.jpg")):
-                        im = cv2.imread(str(p))
-                        if im is None:
-                            continue
-                        im = cv2.cvtColor(im, cv2.COLOR_BGR2RGB)
-                        frames.append(im)
-                    if not frames:
-                        return None
-                    probs = detector.predict_frames(frames)
-                    return float(np.mean(probs))
-
-            vid_score = await run_extract_and_score(req.url)
+            async def run_extract_and_score(url: str) -> tuple[float | None, np.ndarray | None]:
+                # download + decode in a worker thread; frames stay in memory as RGB arrays
+                n_frames = VIDEO_CANDIDATE_FRAMES if frame_sampler else 4
+                if VIDEO_DOWNLOAD_MODE == "stream":
+                    frames = await asyncio.to_thread(
+                        lambda: list(stream_frames(url, n_frames, VIDEO_STREAM_INTERVAL, VIDEO_MAX_HEIGHT))
+                    )
+                elif video_cache:
+                    frames = await asyncio.to_thread(_cached_video_frames, url, n_frames)
+                else:
+                    frames = await asyncio.to_thread(
+                        video_frames_from_url, url, n_frames, VIDEO_FRAME_SAMPLING, MEDIA_MAX_BYTES
+                    )
+                if not frames:
+                    return None, None
+                if frame_sampler is None:
+                    probs, frame_embeddings = await inference_scheduler.predict_frames_with_embeddings(frames)
+                    note_degraded_model()
+                    return float(np.mean(probs)), frame_embeddings
+                sampled = await frame_sampler.score(frames, inference_scheduler.predict_frames_with_embeddings)
+                note_degraded_model()
+                scan_details["frame_sampling"] = {
+                    "candidates": len(frames),
+                    "scenes": sampled["scenes"],
+                    "scored": len(sampled["scores"]),
+                    "stopped_early": sampled["stopped_early"],
+                }
+                return sampled["score"], sampled["embeddings"]
+
+            async def run_audio_score(url: str) -> dict | None:
+                # the audio track streams and scores in parallel with the frames
+                if audio_scorer is None:
+                    return None
+                try:
+                    return await asyncio.to_thread(audio_scorer.score_url, url, AUDIO_MAX_ABR)
+                except Exception as e:
+                    return {"error": str(e)}
+
+            (vid_score, embeddings), audio = await asyncio.gather(run_extract_and_score(url), run_audio_score(url))
             if vid_score is not None:
                 score = max(score, vid_score * 0.95)
                 if vid_score > 0.6:
                     flags.append("model_suspect_video_frames")
+            if audio is not None:
+                scan_details["audio"] = audio
+                if audio.get("score") is not None:
+                    score = max(score, audio["score"] * 0.95)
+                    if audio["score"] > 0.6:
+                        flags.append("model_suspect_audio")
+            await _match_confirmed_scam(embeddings, flags, scan_details)
         except Exception as e:
             # non-fatal; return heuristic result with error
-            return {"score": score, "flags": flags, "details": {"source": req.source, "error": str(e)}}
+            return result(error=str(e))
 
-    return {"score": score, "flags": flags, "details": {"source": req.source}}
+    return result()
 
 
-LABELS_FILE = ROOT / "data" / "labels.csv"
-SEED_FILE = ROOT / "data" / "seed_urls.txt"
-LABELS_FILE.parent.mkdir(parents=True, exist_ok=True)
+@app.post("/v1/scan", response_model=DetectResponse)
+async def scan_media(
+    req: DetectRequest,
+    x_api_key: Optional[str] = Header(None, alias="X-API-Key")
+):
+    """
+    Scan media for deepfake detection.
+    
+    This is the primary API endpoint for customers. Requires API key authentication.
+    Supports images and videos via URL.
+    
+    **Authentication**: Include your API key in the `X-API-Key` header.
+    
+    **Free tier**: 10 scans/month
+    **Pro tier**: 500 scans/month with manual review
+    **Enterprise tier**: Unlimited scans with dedicated review team
+    """
+    if not req.url:
+        raise HTTPException(status_code=400, detail="url is required")
+    
+    # Validate API key and check usage limits
+    is_valid, user_data, error_msg = APIKeyManager.validate_api_key(x_api_key)
+    if not is_valid:
+        raise HTTPException(status_code=401, detail=error_msg or "Invalid API key")
+    
+    # Long video scans run in the background; the client polls or gets a webhook
+    queue_videos = scan_jobs is not None and not req.wait
+    if queue_videos and _is_video_url(req.url) and not (url_cache and req.url in url_cache):
+        return _queue_scan(req, x_api_key)
 
+    try:
+        # links that only turn out to be videos once sniffed are queued too
+        return await _run_scan(req.url, req.source, x_api_key, user_data, defer_video=queue_videos)
+    except VideoScanDeferred:
+        return _queue_scan(req, x_api_key)
 
-@app.get("/seed")
-async def seed_urls():
-    """Return seed URLs for labeling (reads backend/data/seed_urls.txt)."""
-    if not SEED_FILE.exists():
-        return {"urls": []}
-    with SEED_FILE.open("r", encoding="utf-8") as f:
-        urls = [l.strip() for l in f.readlines() if l.strip()]
-    return {"urls": urls}
 
+def _queue_scan(req: DetectRequest, x_api_key: str) -> JSONResponse:
+    # the scan is charged now so queued jobs cannot overrun the monthly limit;
+    # it is refunded if the job fails
+    APIKeyManager.reserve_scan(x_api_key)
+    try:
+        job = scan_jobs.submit({"url": req.url, "source": req.source, "api_key": x_api_key})
+    except ScanQueueFull as e:
+        APIKeyManager.release_scan(x_api_key)
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    return JSONResponse(status_code=202, content=_job_status(job))
 
-class LabelRequest(BaseModel):
-    url: str
-    label: str
-    reporter: str | None = None
 
+async def _run_scan(
+    url: str, source: str | None, x_api_key: str, user_data: dict, job_id: str | None = None, defer_video: bool = False
+) -> dict:
+    """Analyse `url`, record usage and send webhooks; the `/v1/scan` response body.
+
+    With `defer_video`, `VideoScanDeferred` propagates before anything is charged.
+    """
+    scan_id = str(uuid.uuid4())
 
-@app# Record scan usage
+    # Hot URLs (and recently failing ones) are answered from the URL cache
+    cached = url_cache.get(url) if url_cache else None
+    if cached is not None:
+        analysis = {
+            **cached["result"],
+            "flags": list(cached["result"]["flags"]),
+            "details": dict(cached["result"]["details"]),
+        }
+        cache_details = {"cached": True, "cache_age_seconds": cached["age_seconds"]}
+        # scams confirmed since the entry was cached still match
+        await _match_confirmed_scam(analysis["embeddings"], analysis["flags"], analysis["details"])
+    else:
+        analysis = await analyze_media(url, defer_video=defer_video)
+        cache_details = {}
+        if url_cache and not analysis["details"].get("model_degraded"):
+            url_cache.put(url, {**analysis, "embeddings": compact_embeddings(analysis["embeddings"])}, analysis["media_type"])
+    # kept so a reviewer can confirm this scan, cached or not
+    if scam_index and analysis["embeddings"] is not None:
+        await asyncio.to_thread(scam_index.remember, scan_id, analysis["embeddings"])
+    analysis = {k: v for k, v in analysis.items() if k != "embeddings"}
+
+    score = analysis["score"]
+    flags = list(analysis["flags"])
+    if analysis["error"]:
+        if job_id:
+            # failed scans are not charged
+            APIKeyManager.release_scan(x_api_key)
+        if job_id and user_data.get("webhook_url"):
+            # queued clients rely on the webhook to learn the job is finished
+            asyncio.create_task(WebhookService.notify_scan_failed(
+                webhook_url=user_data["webhook_url"],
+                job_id=job_id,
+                url=url,
+                error=analysis["error"],
+                result={"scan_id": scan_id, "score": score, "flags": flags},
+            ))
+        # non-fatal: return heuristic result and note the error
+        return {"score": score, "flags": flags, "details": {"source": source, "error": analysis["error"], **cache_details}}
+
+    # Record scan usage
     scan_data = {
-        'url': req.url,
+        'url': url,
         'score': score,
         'flags': flags,
         'scan_id': scan_id,
     }
-    scan_record = APIKeyManager.increment_usage(x_api_key, scan_data)
+    if job_id:
+        scan_data['job_id'] = job_id
+    # queued jobs were charged when they were submitted
+    scan_record = APIKeyManager.increment_usage(x_api_key, scan_data, reserved=bool(job_id))
     
     # Send webhooks if configured
     webhook_url = user_data.get('webhook_url')
@@ -248,14 +694,73 @@ class LabelRequest(BaseModel):
         "score": score,
         "flags": flags,
         "details": {
-            "source": req.source,
+            **analysis["details"],
+            **cache_details,
+            "source": source,
             "scan_id": scan_id,
+            **({"job_id": job_id} if job_id else {}),
             "manual_review_pending": scan_record.get('manual_review_pending', False),
             "scans_remaining": stats.get('scans_remaining'),
         }
     }
 
 
+async def _run_scan_job(job: dict) -> dict:
+    payload = job["payload"]
+    try:
+        # the scan was reserved at submit, so only the key itself is rechecked
+        is_valid, user_data, error_msg = APIKeyManager.validate_api_key(payload["api_key"], check_limit=False)
+        if not is_valid:
+            raise RuntimeError(error_msg or "Invalid API key")
+        return await _run_scan(payload["url"], payload["source"], payload["api_key"], user_data, job_id=job["job_id"])
+    except Exception as e:
+        APIKeyManager.release_scan(payload["api_key"])
+        webhook_url = APIKeyManager.get_webhook_url(payload["api_key"])
+        if webhook_url:
+            asyncio.create_task(WebhookService.notify_scan_failed(
+                webhook_url=webhook_url, job_id=job["job_id"], url=payload["url"], error=str(e)
+            ))
+        raise
+
+
+def _job_status(job: dict) -> dict:
+    status = {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "status_url": f"/v1/scan/jobs/{job['job_id']}",
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+    }
+    if job["status"] == "queued":
+        status["queue_position"] = scan_jobs.queue_position(job["job_id"])
+    if job["status"] == "done":
+        status["result"] = job["result"]
+    if job["status"] == "failed":
+        status["error"] = job["error"]
+    return status
+
+
+scan_jobs = None
+if SCAN_JOBS_ENABLED:
+    scan_jobs = ScanJobQueue(
+        _run_scan_job,
+        workers=SCAN_JOB_WORKERS,
+        max_queue=SCAN_JOB_QUEUE_SIZE,
+        ttl_seconds=SCAN_JOB_TTL_SECONDS,
+    )
+
+
+@app.get("/v1/scan/jobs/{job_id}")
+async def get_scan_job(job_id: str, x_api_key: Optional[str] = Header(None, alias="X-API-Key")):
+    """Status of a queued video scan; includes the scan result once done."""
+    job = scan_jobs.get(job_id) if scan_jobs else None
+    # jobs are only visible to the key that submitted them
+    if job is None or job["payload"]["api_key"] != x_api_key:
+        raise HTTPException(status_code=404, detail="Scan job not found")
+    return _job_status(job)
+
+
 # ========== API Key & Account Management ==========
 
 
@@ -337,6 +842,98 @@ async def get_pending_reviews(admin_key: Optional[str] = Header(None, alias="X-A
     return {"pending_reviews": pending, "count": len(pending)}
 
 
+@app.get("/admin/inference-stats")
+async def get_inference_stats(admin_key: Optional[str] = Header(None, alias="X-Admin-Key")):
+    """Get model batch size and queue-wait statistics (admin only)."""
+    if admin_key != "admin_secret_key_change_me":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    stats = inference_scheduler.get_stats()
+    detector = model_registry.detector
+    if isinstance(detector, CascadeDetector):
+        stats['cascade'] = detector.get_stats()
+        detector = detector.detector
+    if isinstance(detector, FaceCropDetector):
+        stats['face_crop'] = detector.get_stats()
+        detector = detector.detector
+    if isinstance(detector, InferencePool):
+        stats['worker_pool'] = detector.get_stats()
+    if scan_jobs:
+        stats['scan_jobs'] = scan_jobs.get_stats()
+    return stats
+
+
+class ModelDeployRequest(BaseModel):
+    version: int
+
+
+class ShadowModelRequest(BaseModel):
+    version: int
+    fraction: float = 0.1
+
+
+@app.get("/admin/models")
+async def get_models(admin_key: Optional[str] = Header(None, alias="X-Admin-Key")):
+    """Get the served model version, available versions, deployment and shadow status (admin only)."""
+    if admin_key != "admin_secret_key_change_me":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    return model_registry.get_registry_status()
+
+
+@app.post("/admin/models/deploy", status_code=202)
+async def deploy_model(req: ModelDeployRequest, admin_key: Optional[str] = Header(None, alias="X-Admin-Key")):
+    """Load a model version in the background and hot-swap to it (admin only)."""
+    if admin_key != "admin_secret_key_change_me":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    try:
+        model_registry.deploy(req.version)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return model_registry.get_registry_status()
+
+
+@app.post("/admin/models/shadow", status_code=202)
+async def start_shadow_model(req: ShadowModelRequest, admin_key: Optional[str] = Header(None, alias="X-Admin-Key")):
+    """Score a sampled fraction of traffic with a candidate version as well (admin only)."""
+    if admin_key != "admin_secret_key_change_me":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    try:
+        model_registry.start_shadow(req.version, req.fraction)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return model_registry.get_registry_status()
+
+
+@app.delete("/admin/models/shadow")
+async def stop_shadow_model(admin_key: Optional[str] = Header(None, alias="X-Admin-Key")):
+    """Stop shadow scoring and unload the candidate (admin only)."""
+    if admin_key != "admin_secret_key_change_me":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    model_registry.stop_shadow()
+    return model_registry.get_registry_status()
+
+
+@app.get("/admin/cache-stats")
+async def get_cache_stats(admin_key: Optional[str] = Header(None, alias="X-Admin-Key")):
+    """Get scan result cache hit/miss statistics (admin only)."""
+    if admin_key != "admin_secret_key_change_me":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    return {
+        "phash": phash_cache.get_stats() if phash_cache else None,
+        "content": content_cache.get_stats() if content_cache else None,
+        "url": url_cache.get_stats() if url_cache else None,
+        "scam_index": scam_index.get_stats() if scam_index else None,
+        "video": video_cache.get_stats() if video_cache else None,
+    }
+
+
 @app.post("/admin/review-decision")
 async def submit_review_decision(
     req: ReviewDecisionRequest,
@@ -348,11 +945,21 @@ async def submit_review_decision(
     
     # TODO: Update scan record with review decision
     # TODO: Send webhook notification to customer
-    
+
+    # confirmed scams join the similarity index so look-alike frames get flagged
+    indexed = False
+    index_error = None
+    if req.verdict == "confirmed" and scam_index:
+        indexed = await asyncio.to_thread(scam_index.confirm, req.scan_id)
+        if not indexed:
+            index_error = "no stored frame embeddings for this scan (expired, or scanned without the embedding model)"
+
     return {
         "success": True,
         "scan_id": req.scan_id,
         "verdict": req.verdict,
+        "indexed": indexed,
+        **({"index_error": index_error} if index_error else {}),
     }
 
 
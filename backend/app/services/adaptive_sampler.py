@@ -0,0 +1,124 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+ScoreFn = Callable[[List[np.ndarray]], Awaitable[Tuple[List[float], Optional[np.ndarray]]]]
+
+
+class AdaptiveFrameSampler:
+    """Scores as few of a video's candidate frames as it takes to decide.
+
+    Candidate frames (evenly spaced, in time order) are first grouped into
+    scenes: a new scene starts when a frame's 32x32 grayscale thumbnail
+    differs from the scene's first frame by more than `scene_threshold`
+    (mean absolute difference, 0..1). Only the middle frame of a scene is
+    ever scored, so a static slideshow costs a single inference.
+
+    Scoring starts with `min_frames` scenes spread over the video. After
+    each round it stops once the mean score is at least `margin` away from
+    `threshold` with every scored frame on the same side; otherwise up to
+    `step` more scenes are scored, taken from the middle of the gaps whose
+    neighbouring scores disagree most, until `max_frames` have been scored.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.6,
+        margin: float = 0.15,
+        scene_threshold: float = 0.05,
+        min_frames: int = 2,
+        max_frames: int = 8,
+        step: int = 2,
+    ):
+        self.threshold = threshold
+        self.margin = margin
+        self.scene_threshold = scene_threshold
+        self.min_frames = max(1, int(min_frames))
+        self.max_frames = max(self.min_frames, int(max_frames))
+        self.step = max(1, int(step))
+
+    @staticmethod
+    def _thumbnail(frame: np.ndarray) -> np.ndarray:
+        import cv2
+
+        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY) if frame.ndim == 3 else frame
+        return cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32) / 255.0
+
+    def scenes(self, frames: Sequence[np.ndarray]) -> List[Tuple[int, int]]:
+        """`(start, end)` frame index ranges (end exclusive) of near-identical runs."""
+        scenes: List[Tuple[int, int]] = []
+        start, anchor = 0, None
+        for i, frame in enumerate(frames):
+            thumb = self._thumbnail(frame)
+            if anchor is not None and float(np.abs(thumb - anchor).mean()) > self.scene_threshold:
+                scenes.append((start, i))
+                start, anchor = i, thumb
+            elif anchor is None:
+                anchor = thumb
+        if frames:
+            scenes.append((start, len(frames)))
+        return scenes
+
+    def _confident(self, scores: List[float]) -> bool:
+        mean = sum(scores) / len(scores)
+        if mean >= self.threshold + self.margin:
+            return all(s > self.threshold for s in scores)
+        if mean <= self.threshold - self.margin:
+            return all(s < self.threshold for s in scores)
+        return False
+
+    def _next_scenes(self, n_scenes: int, scored: Dict[int, float]) -> List[int]:
+        """Unscored scenes in the middle of the most disputed gaps between scored ones."""
+        done = sorted(scored)
+        gaps = []
+        # (priority, size, pick) per gap; the ends of the video count as undisputed gaps
+        bounds = [(-1, None)] + [(i, scored[i]) for i in done] + [(n_scenes, None)]
+        for (a, sa), (b, sb) in zip(bounds, bounds[1:]):
+            if b - a < 2:
+                continue
+            if sa is None or sb is None:
+                disagreement = 0.0
+            else:
+                disagreement = abs(sa - sb) + (1.0 if (sa > self.threshold) != (sb > self.threshold) else 0.0)
+            gaps.append((disagreement, b - a, (a + b) // 2))
+        gaps.sort(reverse=True)
+        return sorted(pick for _, _, pick in gaps[:self.step])
+
+    async def score(self, frames: Sequence[np.ndarray], score_fn: ScoreFn) -> Dict[str, Any]:
+        """Aggregate score of `frames` (mean over scored scenes) plus what was scored.
+
+        `embeddings` holds one row per entry of `scored_frames` (or is None).
+        """
+        scenes = self.scenes(frames)
+        if not scenes:
+            return {'score': None, 'scores': [], 'scored_frames': [], 'embeddings': None,
+                    'scenes': 0, 'stopped_early': False}
+        reps = [(start + end - 1) // 2 for start, end in scenes]
+        n = min(self.min_frames, len(scenes))
+        batch = sorted({round(i * (len(scenes) - 1) / max(1, n - 1)) for i in range(n)})
+
+        scored: Dict[int, float] = {}
+        embedding_rows: Dict[int, np.ndarray] = {}
+        stopped_early = False
+        while batch:
+            scores, embeddings = await score_fn([frames[reps[i]] for i in batch])
+            for j, i in enumerate(batch):
+                scored[i] = float(scores[j])
+                if embeddings is not None:
+                    embedding_rows[i] = embeddings[j]
+            if len(scored) == len(scenes) or len(scored) >= self.max_frames:
+                break
+            if self._confident(list(scored.values())):
+                stopped_early = True
+                break
+            batch = self._next_scenes(len(scenes), scored)[:self.max_frames - len(scored)]
+
+        order = sorted(scored)
+        return {
+            'score': sum(scored.values()) / len(scored),
+            'scores': [scored[i] for i in order],
+            'scored_frames': [reps[i] for i in order],
+            'embeddings': np.stack([embedding_rows[i] for i in order]) if len(embedding_rows) == len(order) else None,
+            'scenes': len(scenes),
+            'stopped_early': stopped_early,
+        }
@@ -46,9 +46,10 @@ class APIKeyManager:
         return user_data
     
     @staticmethod
-    def validate_api_key(api_key: str) -> tuple[bool, Optional[dict], Optional[str]]:
+    def validate_api_key(api_key: str, check_limit: bool = True) -> tuple[bool, Optional[dict], Optional[str]]:
         """
         Validate API key and check usage limits.
+        `check_limit=False` only checks the key (for scans already reserved).
         Returns: (is_valid, user_data, error_message)
         """
         if not api_key or not api_key.startswith('dfg_'):
@@ -61,6 +62,9 @@ class APIKeyManager:
         if not user_data['active']:
             return False, None, "API key has been deactivated"
         
+        if not check_limit:
+            return True, user_data, None
+        
         # Check usage limits
         tier = user_data['tier']
         tier_config = APIKeyManager.TIERS[tier]
@@ -72,13 +76,28 @@ class APIKeyManager:
         return True, user_data, None
     
     @staticmethod
-    def increment_usage(api_key: str, scan_data: dict):
-        """Increment usage counter and record scan."""
+    def reserve_scan(api_key: str):
+        """Count a queued scan against the monthly limit before it runs."""
+        user_data = _api_keys_db.get(api_key)
+        if user_data:
+            user_data['scans_used_this_month'] += 1
+    
+    @staticmethod
+    def release_scan(api_key: str):
+        """Refund a reserved scan that failed."""
+        user_data = _api_keys_db.get(api_key)
+        if user_data:
+            user_data['scans_used_this_month'] = max(0, user_data['scans_used_this_month'] - 1)
+    
+    @staticmethod
+    def increment_usage(api_key: str, scan_data: dict, reserved: bool = False):
+        """Increment usage counter and record scan (`reserved`: already counted by `reserve_scan`)."""
         user_data = _api_keys_db.get(api_key)
         if not user_data:
             return
         
-        user_data['scans_used_this_month'] += 1
+        if not reserved:
+            user_data['scans_used_this_month'] += 1
         user_data['total_scans'] += 1
         
         # Record scan in history
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+
+class ContentResultCache:
+    """Persistent scan-result cache keyed by SHA-256 of the fetched media bytes.
+
+    Results are stored in a local SQLite database so they survive restarts.
+    Every row is tagged with the model version that produced it; rows from
+    other versions are never returned and are purged when the cache opens, so
+    swapping the model invalidates the cache. Entries expire after
+    `ttl_seconds`, and the least recently used ones are evicted once the stored
+    results exceed `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        model_version: str,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 7 * 24 * 3600,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.db_path = Path(db_path)
+        self.model_version = model_version
+        self.max_bytes = int(max_bytes)
+        self.ttl_seconds = float(ttl_seconds)
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            '''CREATE TABLE IF NOT EXISTS results (
+                content_hash TEXT NOT NULL,
+                model_version TEXT NOT NULL,
+                result TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (content_hash, model_version)
+            )'''
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)')
+        self.set_model_version(model_version)
+
+    @staticmethod
+    def content_key(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def set_model_version(self, model_version: str):
+        """Switch to `model_version`, dropping results produced by any other model."""
+        with self._lock:
+            self.model_version = model_version
+            self._conn.execute('DELETE FROM results WHERE model_version != ?', (model_version,))
+
+    def get(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT result, created_at FROM results WHERE content_hash = ? AND model_version = ?',
+                (content_hash, self.model_version),
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                'UPDATE results SET last_access = ? WHERE content_hash = ? AND model_version = ?',
+                (now, content_hash, self.model_version),
+            )
+            self.hits += 1
+        result = json.loads(row[0])
+        result['cached_at'] = row[1]
+        return result
+
+    def put(self, content_hash: str, result: Dict[str, Any]):
+        payload = json.dumps(result)
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)',
+                (content_hash, self.model_version, payload, len(payload), now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float):
+        cur = self._conn.execute('DELETE FROM results WHERE created_at < ?', (now - self.ttl_seconds,))
+        self.evictions += max(0, cur.rowcount)
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # drop least recently used rows until back under the byte budget
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        cur = self._conn.execute('SELECT content_hash, model_version, size FROM results ORDER BY last_access ASC')
+        for content_hash, model_version, size in cur:
+            victims.append((content_hash, model_version))
+            freed += size
+            if freed >= excess:
+                break
+        cur.close()
+        self._conn.executemany('DELETE FROM results WHERE content_hash = ? AND model_version = ?', victims)
+        self.evictions += len(victims)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, total = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results').fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'model_version': self.model_version,
+            'entries': entries,
+            'bytes': total,
+            'max_bytes': self.max_bytes,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            'evictions': self.evictions,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
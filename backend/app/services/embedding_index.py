@@ -0,0 +1,421 @@
+import base64
+import json
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# rows scored per matrix product when scanning the memory-mapped vectors
+_SCAN_CHUNK = 65536
+# scan ids double as file names under recent/
+_SCAN_ID = re.compile(r'^[A-Za-z0-9_-]{1,128}$')
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _top_k(sims: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Indices and values of the k largest entries of each row, best first."""
+    k = min(k, sims.shape[1])
+    idx = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    vals = np.take_along_axis(sims, idx, axis=1)
+    order = np.argsort(-vals, axis=1)
+    return np.take_along_axis(idx, order, axis=1), np.take_along_axis(vals, order, axis=1)
+
+
+def _spherical_kmeans(sample: np.ndarray, n_lists: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        counts = np.bincount(assign, minlength=n_lists)
+        empty = counts == 0
+        # re-seed empty lists from random sample points
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids
+
+
+def compact_embeddings(vectors: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    """Half-precision copy of `vectors` for keeping alongside cached results."""
+    return None if vectors is None else np.asarray(vectors, dtype=np.float16)
+
+
+def pack_embeddings(vectors: Optional[np.ndarray]) -> Optional[Dict[str, Any]]:
+    """JSON-safe form of `vectors` (float16, base64) for persistent caches."""
+    if vectors is None:
+        return None
+    vectors = compact_embeddings(vectors)
+    return {'shape': list(vectors.shape), 'data': base64.b64encode(vectors.tobytes()).decode('ascii')}
+
+
+def unpack_embeddings(packed: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+    if not packed:
+        return None
+    data = np.frombuffer(base64.b64decode(packed['data']), dtype=np.float16)
+    return data.reshape(packed['shape']).astype(np.float32)
+
+
+def _atomic_save(path: Path, array: np.ndarray):
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+class ScamEmbeddingIndex:
+    """Cosine top-k index over frame embeddings of reviewer-confirmed scams.
+
+    Vectors are L2-normalized and stored on disk as `.npy` files that are
+    memory-mapped on load, so the index costs page cache rather than heap.
+    Up to `brute_force_max` vectors are searched exhaustively with one matrix
+    product per chunk; larger sets are rebuilt into an IVF layout (spherical
+    k-means centroids, vectors stored contiguously per list) and a query only
+    scans its `nprobe` nearest lists.
+
+    New confirmations land in a small in-memory delta that is searched by
+    brute force and persisted alongside the main files; once it reaches
+    `merge_threshold` vectors it is merged into the main index by a
+    background thread. The merge streams the old memmap and the delta into a
+    new generation directory (`main-<n>/`) chunk by chunk, while searches
+    keep using the old files; only the final swap takes the lock.
+
+    Embeddings of the last `recent_scans` scans are kept on disk under
+    `recent/<scan_id>.npy` (oldest dropped first), so that a reviewer's
+    `confirm(scan_id)` can add the frames of that scan to the index even
+    after a restart.
+    """
+
+    def __init__(
+        self,
+        index_dir: Path,
+        brute_force_max: int = 50000,
+        nprobe: int = 8,
+        merge_threshold: int = 10000,
+        recent_scans: int = 10000,
+    ):
+        self.index_dir = Path(index_dir)
+        self.brute_force_max = max(1, int(brute_force_max))
+        self.nprobe = max(1, int(nprobe))
+        self.merge_threshold = max(1, int(merge_threshold))
+        self.recent_scans = max(0, int(recent_scans))
+        self._lock = threading.RLock()
+        # one merge at a time; searches never wait on it
+        self._rebuild_lock = threading.Lock()
+        self._rebuild_thread: Optional[threading.Thread] = None
+        self._generation = 0
+
+        self._vectors: Optional[np.ndarray] = None
+        self._ids: Optional[np.ndarray] = None
+        self._centroids: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._delta_vectors: List[np.ndarray] = []
+        self._delta_ids: List[str] = []
+        # scan ids with stored embeddings, least recently stored first
+        self._recent: 'OrderedDict[str, None]' = OrderedDict()
+
+        self.searches = 0
+        self.matches = 0
+
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self._recent_dir.mkdir(exist_ok=True)
+        for path in sorted(self._recent_dir.glob('*.npy'), key=lambda p: p.stat().st_mtime):
+            self._recent[path.stem] = None
+        self._trim_recent()
+        self._load()
+
+    @property
+    def _recent_dir(self) -> Path:
+        return self.index_dir / 'recent'
+
+    def _path(self, name: str) -> Path:
+        return self.index_dir / name
+
+    def _main_dir(self, generation: int) -> Path:
+        # generation 0 is the index directory itself (indexes never merged into a generation)
+        return self._path(f'main-{generation}') if generation else self.index_dir
+
+    def _load(self):
+        current = self._path('current.json')
+        if current.exists():
+            self._generation = int(json.loads(current.read_text())['generation'])
+        main_dir = self._main_dir(self._generation)
+        vectors_path = main_dir / 'vectors.npy'
+        self._vectors = self._ids = self._centroids = self._offsets = None
+        if vectors_path.exists():
+            self._vectors = np.load(vectors_path, mmap_mode='r')
+            self._ids = np.load(main_dir / 'ids.npy', mmap_mode='r')
+            if (main_dir / 'centroids.npy').exists():
+                self._centroids = np.load(main_dir / 'centroids.npy')
+                self._offsets = np.load(main_dir / 'offsets.npy')
+        delta_path = self._path('delta.npy')
+        if delta_path.exists():
+            delta = np.load(delta_path)
+            self._delta_vectors = list(delta)
+            self._delta_ids = json.loads(self._path('delta_ids.json').read_text())
+
+    def __len__(self) -> int:
+        main = len(self._vectors) if self._vectors is not None else 0
+        return main + len(self._delta_ids)
+
+    @property
+    def dim(self) -> Optional[int]:
+        if self._vectors is not None:
+            return int(self._vectors.shape[1])
+        if self._delta_vectors:
+            return int(self._delta_vectors[0].shape[0])
+        return None
+
+    def search(self, queries: np.ndarray, k: int = 1) -> List[List[Tuple[str, float]]]:
+        """Top-`k` `(scan_id, cosine similarity)` pairs for each query row."""
+        queries = _normalize(queries)
+        k = max(1, int(k))
+        n = len(queries)
+        best_idx = np.full((n, 0), -1, dtype=np.int64)
+        best_sim = np.full((n, 0), -np.inf, dtype=np.float32)
+        with self._lock:
+            if len(self) == 0 or queries.shape[1] != self.dim:
+                return [[] for _ in range(n)]
+            self.searches += n
+            candidates = []
+            if self._vectors is not None:
+                candidates.append(self._search_main(queries, k))
+            if self._delta_vectors:
+                delta = np.stack(self._delta_vectors)
+                idx, sims = _top_k(queries @ delta.T, k)
+                # delta rows are numbered after the main rows
+                candidates.append((idx + (len(self._vectors) if self._vectors is not None else 0), sims))
+            for idx, sims in candidates:
+                best_idx = np.concatenate([best_idx, idx], axis=1)
+                best_sim = np.concatenate([best_sim, sims], axis=1)
+            order, _ = _top_k(best_sim, k)
+            best_idx = np.take_along_axis(best_idx, order, axis=1)
+            best_sim = np.take_along_axis(best_sim, order, axis=1)
+            return [
+                [(self._id_at(int(i)), float(s)) for i, s in zip(row_idx, row_sim) if i >= 0]
+                for row_idx, row_sim in zip(best_idx, best_sim)
+            ]
+
+    def best_match(self, queries: np.ndarray, threshold: float) -> Optional[Tuple[str, float]]:
+        """`(scan_id, similarity)` of the closest indexed frame to any query, if >= `threshold`."""
+        hits = [row[0] for row in self.search(queries, k=1) if row]
+        if not hits:
+            return None
+        scan_id, similarity = max(hits, key=lambda h: h[1])
+        if similarity < threshold:
+            return None
+        self.matches += 1
+        return scan_id, similarity
+
+    def _id_at(self, row: int) -> str:
+        n_main = len(self._vectors) if self._vectors is not None else 0
+        return str(self._ids[row]) if row < n_main else self._delta_ids[row - n_main]
+
+    def _search_main(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        if self._centroids is None:
+            # brute force, chunked so huge memmaps never materialize at once
+            best_idx = np.zeros((len(queries), 0), dtype=np.int64)
+            best_sim = np.zeros((len(queries), 0), dtype=np.float32)
+            for start in range(0, len(self._vectors), _SCAN_CHUNK):
+                idx, sims = _top_k(queries @ self._vectors[start:start + _SCAN_CHUNK].T, k)
+                best_idx = np.concatenate([best_idx, idx + start], axis=1)
+                best_sim = np.concatenate([best_sim, sims], axis=1)
+                order, _ = _top_k(best_sim, k)
+                best_idx = np.take_along_axis(best_idx, order, axis=1)
+                best_sim = np.take_along_axis(best_sim, order, axis=1)
+            return best_idx, best_sim
+
+        probes, _ = _top_k(queries @ self._centroids.T, self.nprobe)
+        best_idx = np.full((len(queries), k), -1, dtype=np.int64)
+        best_sim = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for q, lists in enumerate(probes):
+            rows = np.concatenate([
+                np.arange(self._offsets[l], self._offsets[l + 1]) for l in lists
+            ])
+            if len(rows) == 0:
+                continue
+            # rows of one list are contiguous on disk, so this reads sequentially
+            sims = self._vectors[rows] @ queries[q]
+            idx, vals = _top_k(sims[None, :], k)
+            best_idx[q, :idx.shape[1]] = rows[idx[0]]
+            best_sim[q, :vals.shape[1]] = vals[0]
+        return best_idx, best_sim
+
+    def add(self, vectors: np.ndarray, scan_id: str):
+        """Add the frame embeddings of a confirmed scam scan."""
+        vectors = _normalize(vectors)
+        # all-zero rows are frames that never reached the embedding model
+        vectors = vectors[np.any(vectors != 0, axis=1)]
+        if not len(vectors):
+            return
+        with self._lock:
+            if self.dim is not None and vectors.shape[1] != self.dim:
+                raise ValueError(f"embedding dimension {vectors.shape[1]} != index dimension {self.dim}")
+            self._delta_vectors.extend(vectors)
+            self._delta_ids.extend([scan_id] * len(vectors))
+            self._save_delta()
+            if len(self._delta_ids) >= self.merge_threshold:
+                self._rebuild_in_background()
+
+    def _rebuild_in_background(self):
+        if self._rebuild_thread is not None and self._rebuild_thread.is_alive():
+            return  # the running merge leaves newer rows in the delta; they merge next time
+        self._rebuild_thread = threading.Thread(target=self._background_rebuild, name='scam-index-merge', daemon=True)
+        self._rebuild_thread.start()
+
+    def _background_rebuild(self):
+        try:
+            self.rebuild()
+        except Exception as e:
+            print(f"❌ Scam index merge failed: {e}")
+
+    def wait_for_rebuild(self, timeout: Optional[float] = None) -> bool:
+        """Block until a background merge (if any) has finished; False on timeout."""
+        thread = self._rebuild_thread
+        if thread is not None:
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+    def _save_delta(self):
+        if self._delta_vectors:
+            _atomic_save(self._path('delta.npy'), np.stack(self._delta_vectors))
+            tmp = self._path('delta_ids.json.tmp')
+            tmp.write_text(json.dumps(self._delta_ids))
+            os.replace(tmp, self._path('delta_ids.json'))
+        else:
+            for name in ('delta.npy', 'delta_ids.json'):
+                self._path(name).unlink(missing_ok=True)
+
+    def rebuild(self, n_lists: Optional[int] = None):
+        """Merge the delta into a new generation of main files, switching to IVF once large.
+
+        Runs without holding the search lock: the current memmap and a
+        snapshot of the delta are streamed into new files, and only the swap
+        to them is done under the lock. Rows added meanwhile stay in the delta.
+        """
+        with self._rebuild_lock:
+            with self._lock:
+                old_vectors, old_ids, generation = self._vectors, self._ids, self._generation
+                n_delta = len(self._delta_ids)
+                delta = np.stack(self._delta_vectors[:n_delta]) if n_delta else None
+                delta_ids = np.asarray(self._delta_ids[:n_delta]) if n_delta else None
+            n_main = len(old_vectors) if old_vectors is not None else 0
+            total = n_main + n_delta
+            if total == 0:
+                return
+            dim = int(old_vectors.shape[1]) if old_vectors is not None else int(delta.shape[1])
+            id_dtype = np.result_type(*[a.dtype for a in (old_ids, delta_ids) if a is not None])
+
+            def take(rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+                # rows of the old memmap and the delta, without concatenating them
+                vectors = np.empty((len(rows), dim), dtype=np.float32)
+                ids = np.empty(len(rows), dtype=id_dtype)
+                in_main = rows < n_main
+                if in_main.any():
+                    vectors[in_main] = old_vectors[rows[in_main]]
+                    ids[in_main] = old_ids[rows[in_main]]
+                if not in_main.all():
+                    vectors[~in_main] = delta[rows[~in_main] - n_main]
+                    ids[~in_main] = delta_ids[rows[~in_main] - n_main]
+                return vectors, ids
+
+            new_generation = generation + 1
+            out_dir = self._main_dir(new_generation)
+            shutil.rmtree(out_dir, ignore_errors=True)  # leftover of an interrupted merge
+            out_dir.mkdir()
+
+            order = np.arange(total)
+            if total > self.brute_force_max:
+                n_lists = n_lists or max(1, int(4 * np.sqrt(total)))
+                rng = np.random.default_rng(0)
+                sample_rows = np.sort(rng.choice(total, min(total, 64 * n_lists, 100000), replace=False))
+                centroids = _spherical_kmeans(take(sample_rows)[0], min(n_lists, len(sample_rows)))
+                assign = np.concatenate([
+                    np.argmax(take(order[s:s + _SCAN_CHUNK])[0] @ centroids.T, axis=1)
+                    for s in range(0, total, _SCAN_CHUNK)
+                ])
+                order = np.argsort(assign, kind='stable')
+                offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=len(centroids)))])
+                _atomic_save(out_dir / 'centroids.npy', centroids)
+                _atomic_save(out_dir / 'offsets.npy', offsets.astype(np.int64))
+
+            out_vectors = np.lib.format.open_memmap(out_dir / 'vectors.npy', mode='w+', dtype=np.float32, shape=(total, dim))
+            out_ids = np.lib.format.open_memmap(out_dir / 'ids.npy', mode='w+', dtype=id_dtype, shape=(total,))
+            for s in range(0, total, _SCAN_CHUNK):
+                out_vectors[s:s + _SCAN_CHUNK], out_ids[s:s + _SCAN_CHUNK] = take(order[s:s + _SCAN_CHUNK])
+            out_vectors.flush()
+            out_ids.flush()
+            del out_vectors, out_ids
+
+            with self._lock:
+                tmp = self._path('current.json.tmp')
+                tmp.write_text(json.dumps({'generation': new_generation}))
+                os.replace(tmp, self._path('current.json'))
+                del self._delta_vectors[:n_delta]
+                del self._delta_ids[:n_delta]
+                self._save_delta()
+                self._load()
+            # searches hold the lock while they use the old arrays, so they are done with them
+            del old_vectors, old_ids
+            if generation:
+                shutil.rmtree(self._main_dir(generation), ignore_errors=True)
+            else:
+                for name in ('vectors.npy', 'ids.npy', 'centroids.npy', 'offsets.npy'):
+                    self._path(name).unlink(missing_ok=True)
+
+    def remember(self, scan_id: str, vectors: Optional[np.ndarray]):
+        """Store a recent scan's embeddings in case a reviewer confirms it."""
+        if vectors is None or self.recent_scans == 0 or not _SCAN_ID.match(scan_id):
+            return
+        with self._lock:
+            _atomic_save(self._recent_dir / f'{scan_id}.npy', np.asarray(vectors, dtype=np.float32))
+            self._recent[scan_id] = None
+            self._recent.move_to_end(scan_id)
+            self._trim_recent()
+
+    def _trim_recent(self):
+        while len(self._recent) > self.recent_scans:
+            scan_id, _ = self._recent.popitem(last=False)
+            (self._recent_dir / f'{scan_id}.npy').unlink(missing_ok=True)
+
+    def confirm(self, scan_id: str) -> bool:
+        """Index the stored frames of `scan_id`; False if there are none (expired or never embedded)."""
+        with self._lock:
+            if scan_id not in self._recent:
+                return False
+            path = self._recent_dir / f'{scan_id}.npy'
+            try:
+                vectors = np.load(path)
+            except FileNotFoundError:
+                del self._recent[scan_id]
+                return False
+            self.add(vectors, scan_id)
+            del self._recent[scan_id]
+            path.unlink(missing_ok=True)
+            return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'vectors': len(self),
+            'delta_vectors': len(self._delta_ids),
+            'layout': 'ivf' if self._centroids is not None else 'brute_force',
+            'merging': self._rebuild_thread is not None and self._rebuild_thread.is_alive(),
+            'lists': len(self._centroids) if self._centroids is not None else None,
+            'nprobe': self.nprobe,
+            'recent_scans': len(self._recent),
+            'searches': self.searches,
+            'matches': self.matches,
+        }
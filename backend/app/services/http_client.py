@@ -0,0 +1,95 @@
+import asyncio
+from typing import Dict, Optional
+
+import httpx
+
+
+class SharedHttpClient:
+    """One pooled `httpx.AsyncClient` for the whole application.
+
+    Media fetches and webhooks mostly go to a handful of CDNs and customer
+    endpoints, so keeping connections (and their TLS sessions) alive across
+    requests saves a handshake per fetch. The client is created in `start`
+    and closed in `aclose` (the FastAPI lifespan); `client` also creates it
+    on first use, e.g. when the app runs without its lifespan.
+
+    `connect_timeout`, `read_timeout` and `pool_timeout` bound each phase of
+    a request. `total_timeout` is the wall-clock budget for a whole fetch
+    (including a slow trickle of bytes that never trips the read timeout);
+    `MediaFetcher` enforces it around its streamed reads.
+    HTTP/2 is used when requested and the `h2` package is installed.
+
+    Redirects are not followed unless a request passes
+    `follow_redirects=True`; such requests stop after `max_redirects` hops.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 15.0,
+        pool_timeout: float = 5.0,
+        total_timeout: float = 30.0,
+        http2: bool = True,
+        max_redirects: int = 5,
+        headers: Optional[Dict[str, str]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(connect=connect_timeout, read=read_timeout, write=read_timeout, pool=pool_timeout)
+        self.total_timeout = total_timeout
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                print("Warning: h2 is not installed; the shared HTTP client falls back to HTTP/1.1")
+                http2 = False
+        self.http2 = http2
+        self.max_redirects = max_redirects
+        self.headers = dict(headers or {})
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2,
+                headers=self.headers,
+                follow_redirects=False,
+                max_redirects=self.max_redirects,
+                transport=self.transport,
+            )
+            try:
+                self._loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self._loop = None
+        return self._client
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if self._client is not None and self._loop is not None and loop is not None and loop is not self._loop:
+            # pooled connections belong to the loop that opened them and can
+            # only be closed there; drop the client and let the old loop's GC
+            # reclaim its sockets
+            print("⚠️ Shared HTTP client was opened on another event loop; "
+                  "dropping it without closing and opening a new one")
+            self._client = None
+        return self.start()
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -0,0 +1,283 @@
+import itertools
+import multiprocessing as mp
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def _limit_threads(threads: Optional[int]):
+    """Keep each worker's intra-op pool small so N workers don't oversubscribe cores."""
+    if not threads:
+        return
+    try:
+        import torch
+
+        torch.set_num_threads(int(threads))
+    except ImportError:
+        pass
+
+
+def _worker_main(
+    worker_id: int,
+    factory: Callable[..., Any],
+    factory_kwargs: Dict[str, Any],
+    warmup_batch_sizes: Sequence[int],
+    threads: Optional[int],
+    tasks: mp.Queue,
+    results: mp.Queue,
+):
+    """Worker process: own one detector, score frames read from shared memory."""
+    try:
+        _limit_threads(threads)
+        detector = factory(**factory_kwargs)
+        if warmup_batch_sizes and hasattr(detector, 'warmup'):
+            detector.warmup(warmup_batch_sizes)
+    except Exception as e:
+        results.put(('error', None, f"worker {worker_id} failed to start: {e}"))
+        return
+    results.put(('ready', None, bool(getattr(detector, 'degraded', False))))
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        job_id, shm_name, layout = task
+        # lets the pool fail this job at once if the process dies on it
+        results.put(('started', job_id, worker_id))
+        shm = None
+        frames = None
+        try:
+            shm = shared_memory.SharedMemory(name=shm_name)
+            frames = [
+                np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=offset)
+                for shape, offset in layout
+            ]
+            if hasattr(detector, 'predict_frames_with_embeddings'):
+                scores, embeddings = detector.predict_frames_with_embeddings(frames)
+            else:
+                scores, embeddings = detector.predict_frames(frames), None
+            results.put(('ok', job_id, ([float(s) for s in scores], embeddings)))
+        except Exception as e:
+            results.put(('error', job_id, str(e)))
+        finally:
+            # views must be gone before the segment can be closed
+            frames = None
+            if shm is not None:
+                shm.close()
+
+
+class InferencePool:
+    """Runs detectors in separate processes so inference never holds the API's GIL.
+
+    Each worker process builds its own detector with `factory(**factory_kwargs)`
+    (both must be picklable, e.g. `models.factory.create_detector`). Frames are
+    copied once into a shared-memory segment per job; workers map them as
+    numpy views instead of unpickling pixel data, and only the scores (plus
+    embeddings, when the detector produces them) travel back over a queue.
+    Jobs go to whichever worker is free.
+
+    `predict_frames` blocks the calling thread until the job's scores arrive,
+    so it can be used anywhere a detector's `predict_frames` is.
+
+    The result listener doubles as a watchdog: every `watchdog_interval`
+    seconds it checks that the workers are alive. When one has died (OOM
+    kill, segfault), the jobs it was running fail immediately instead of
+    waiting out `job_timeout`, and the process is restarted (at most once
+    per `restart_backoff` seconds per worker).
+    """
+
+    def __init__(
+        self,
+        factory: Callable[..., Any],
+        factory_kwargs: Optional[Dict[str, Any]] = None,
+        workers: int = 2,
+        warmup_batch_sizes: Sequence[int] = (1,),
+        threads_per_worker: Optional[int] = 1,
+        start_timeout: float = 300.0,
+        job_timeout: float = 120.0,
+        watchdog_interval: float = 1.0,
+        restart_backoff: float = 5.0,
+    ):
+        self.workers = max(1, int(workers))
+        self.job_timeout = job_timeout
+        self.watchdog_interval = watchdog_interval
+        self.restart_backoff = restart_backoff
+
+        self._ctx = mp.get_context('spawn')
+        self._tasks = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        self._worker_args = (factory, factory_kwargs or {}, list(warmup_batch_sizes), threads_per_worker)
+        self._job_ids = itertools.count()
+        self._pending: Dict[int, Future] = {}
+        # job id -> worker running it
+        self._running: Dict[int, int] = {}
+        self._pending_lock = threading.Lock()
+        self._closing = False
+        self._last_check = time.monotonic()
+        self._last_restart: Dict[int, float] = {}
+        self.restarts = 0
+        # any worker serving the constant fallback instead of a model
+        self.degraded = False
+
+        self._processes = [self._spawn(i) for i in range(self.workers)]
+
+        try:
+            self._wait_for_workers(start_timeout)
+        except Exception:
+            self.close()
+            raise
+
+        self._listener = threading.Thread(target=self._collect_results, name='inference-results', daemon=True)
+        self._listener.start()
+
+    def _spawn(self, worker_id: int):
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, *self._worker_args, self._tasks, self._results),
+            name=f'inference-worker-{worker_id}',
+            daemon=True,
+        )
+        process.start()
+        return process
+
+    def _wait_for_workers(self, timeout: float):
+        ready = 0
+        while ready < self.workers:
+            try:
+                status, _, payload = self._results.get(timeout=timeout)
+            except queue.Empty:
+                raise TimeoutError(f"inference workers not ready after {timeout}s")
+            if status == 'error':
+                raise RuntimeError(payload)
+            self.degraded = self.degraded or payload
+            ready += 1
+
+    def _collect_results(self):
+        while True:
+            try:
+                message = self._results.get(timeout=self.watchdog_interval)
+            except queue.Empty:
+                message = ()
+            if message is None:
+                break
+            if message:
+                self._handle(message)
+            if time.monotonic() - self._last_check >= self.watchdog_interval:
+                self._check_workers()
+
+    def _handle(self, message):
+        status, job_id, payload = message
+        if status == 'started':
+            with self._pending_lock:
+                if job_id in self._pending:
+                    self._running[job_id] = payload
+            return
+        if job_id is None:
+            # startup message of a restarted worker
+            if status == 'error':
+                print(f"❌ {payload}")
+            else:
+                self.degraded = self.degraded or payload
+            return
+        with self._pending_lock:
+            future = self._pending.pop(job_id, None)
+            self._running.pop(job_id, None)
+        if future is None:
+            return
+        if status == 'ok':
+            future.set_result(payload)
+        else:
+            future.set_exception(RuntimeError(payload))
+
+    def _check_workers(self):
+        """Fail the jobs of dead workers and restart them."""
+        self._last_check = time.monotonic()
+        if self._closing:
+            return
+        dead = [i for i, p in enumerate(self._processes) if not p.is_alive()]
+        if not dead:
+            return
+        # results and 'started' notices the workers sent before dying
+        while True:
+            try:
+                message = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if message is None:
+                self._results.put(None)
+                return
+            self._handle(message)
+        for i in dead:
+            exitcode = self._processes[i].exitcode
+            with self._pending_lock:
+                lost = [job_id for job_id, worker in self._running.items() if worker == i]
+                futures = [self._pending.pop(job_id, None) for job_id in lost]
+                for job_id in lost:
+                    del self._running[job_id]
+            for future in futures:
+                if future is not None:
+                    future.set_exception(RuntimeError(f"inference worker {i} died (exit code {exitcode})"))
+            now = time.monotonic()
+            if now - self._last_restart.get(i, float('-inf')) < self.restart_backoff:
+                continue
+            print(f"❌ Inference worker {i} died (exit code {exitcode}); restarting")
+            self._last_restart[i] = now
+            self._processes[i] = self._spawn(i)
+            self.restarts += 1
+
+    def predict_frames(self, frames: List[np.ndarray]) -> List[float]:
+        return self.predict_frames_with_embeddings(frames)[0]
+
+    def predict_frames_with_embeddings(self, frames: List[np.ndarray]) -> Tuple[List[float], Optional[np.ndarray]]:
+        if not frames:
+            return [], None
+        arrays = [np.ascontiguousarray(f, dtype=np.uint8) for f in frames]
+        layout = []
+        offset = 0
+        for arr in arrays:
+            layout.append((arr.shape, offset))
+            offset += arr.nbytes
+
+        shm = shared_memory.SharedMemory(create=True, size=max(1, offset))
+        try:
+            for arr, (shape, start) in zip(arrays, layout):
+                np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=start)[...] = arr
+
+            job_id = next(self._job_ids)
+            future: Future = Future()
+            with self._pending_lock:
+                self._pending[job_id] = future
+            self._tasks.put((job_id, shm.name, layout))
+            try:
+                return future.result(timeout=self.job_timeout)
+            finally:
+                with self._pending_lock:
+                    self._pending.pop(job_id, None)
+                    self._running.pop(job_id, None)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'workers': self.workers,
+            'alive': sum(p.is_alive() for p in self._processes),
+            'in_flight': len(self._pending),
+            'restarts': self.restarts,
+        }
+
+    def close(self):
+        """Stop the worker processes and the result listener."""
+        self._closing = True
+        for _ in self._processes:
+            self._tasks.put(None)
+        for p in self._processes:
+            p.join(timeout=10)
+            if p.is_alive():
+                p.terminate()
+        self._results.put(None)
@@ -0,0 +1,183 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+class InferenceScheduler:
+    """Dynamic micro-batching in front of a detector's `predict_frames`.
+
+    Concurrent callers submit their frames with `predict_frames`; the scheduler
+    groups frames from several requests into one model batch (bounded by
+    `max_batch_size` frames and `max_wait_ms` of queueing) and hands each
+    caller back only its own scores. `predict_fn` may also return a
+    `(scores, embeddings)` tuple, in which case callers of
+    `predict_frames_with_embeddings` get their rows of the embedding matrix.
+    Up to `max_concurrent_batches` batches run at once (one per inference
+    worker process when a pool is used).
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[List[Any]], Sequence[float]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+        stats_window: int = 1000,
+        max_concurrent_batches: int = 1,
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.max_concurrent_batches = max(1, int(max_concurrent_batches))
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # request that did not fit into the previous batch
+        self._carry: Optional[tuple] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight: set = set()
+
+        self._batch_sizes: deque = deque(maxlen=stats_window)
+        self._queue_waits_ms: deque = deque(maxlen=stats_window)
+        self._batches = 0
+        self._requests = 0
+        self._frames = 0
+
+    def _ensure_worker(self):
+        """Start the batching loop on the running event loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._worker is not None and not self._worker.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._carry = None
+        self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+        self._in_flight = set()
+        self._worker = loop.create_task(self._run())
+
+    async def predict_frames(self, frames: List[Any]) -> List[float]:
+        """Queue `frames` for the next batch and wait for their scores."""
+        return (await self.predict_frames_with_embeddings(frames))[0]
+
+    async def predict_frames_with_embeddings(self, frames: List[Any]) -> Tuple[List[float], Any]:
+        """Like `predict_frames`, also returning this caller's embeddings (or None)."""
+        if not frames:
+            return [], None
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((list(frames), future, time.perf_counter()))
+        return await future
+
+    async def stop(self):
+        """Cancel the batching loop (pending callers get CancelledError)."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        for task in list(self._in_flight):
+            task.cancel()
+        self._worker = None
+
+    async def _next_batch(self) -> list:
+        item = self._carry or await self._queue.get()
+        self._carry = None
+        batch = [item]
+        n_frames = len(item[0])
+        deadline = time.perf_counter() + self.max_wait
+
+        while n_frames < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    item = self._queue.get_nowait()
+                else:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+            if n_frames + len(item[0]) > self.max_batch_size:
+                # keep it for the next batch rather than overshooting this one
+                self._carry = item
+                break
+            batch.append(item)
+            n_frames += len(item[0])
+        return batch
+
+    async def _run(self):
+        while True:
+            # wait for a free slot first so the next batch keeps filling meanwhile
+            await self._slots.acquire()
+            batch = await self._next_batch()
+            task = asyncio.get_running_loop().create_task(self._process(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _process(self, batch: list):
+        try:
+            started = time.perf_counter()
+            frames: List[Any] = []
+            for item_frames, _, enqueued_at in batch:
+                frames.extend(item_frames)
+                self._queue_waits_ms.append((started - enqueued_at) * 1000.0)
+
+            try:
+                output = await asyncio.to_thread(self.predict_fn, frames)
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            self._batches += 1
+            self._requests += len(batch)
+            self._frames += len(frames)
+            self._batch_sizes.append(len(frames))
+
+            scores, embeddings = output if isinstance(output, tuple) else (output, None)
+            offset = 0
+            for item_frames, future, _ in batch:
+                n = len(item_frames)
+                if not future.done():
+                    future.set_result((
+                        [float(s) for s in scores[offset:offset + n]],
+                        embeddings[offset:offset + n] if embeddings is not None else None,
+                    ))
+                offset += n
+        finally:
+            self._slots.release()
+
+    @staticmethod
+    def _percentile(values: Sequence[float], q: float) -> Optional[float]:
+        if not values:
+            return None
+        ordered = sorted(values)
+        idx = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+        return round(ordered[idx], 3)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Batch size and queue-wait statistics over the recent window."""
+        sizes = list(self._batch_sizes)
+        waits = list(self._queue_waits_ms)
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000.0,
+            'max_concurrent_batches': self.max_concurrent_batches,
+            'batches_in_flight': len(self._in_flight),
+            'batches': self._batches,
+            'requests': self._requests,
+            'frames': self._frames,
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'batch_size': {
+                'mean': round(sum(sizes) / len(sizes), 3) if sizes else None,
+                'p50': self._percentile(sizes, 0.5),
+                'max': max(sizes) if sizes else None,
+            },
+            'queue_wait_ms': {
+                'mean': round(sum(waits) / len(waits), 3) if waits else None,
+                'p50': self._percentile(waits, 0.5),
+                'p95': self._percentile(waits, 0.95),
+                'max': round(max(waits), 3) if waits else None,
+            },
+        }
@@ -0,0 +1,117 @@
+import asyncio
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.services.http_client import SharedHttpClient
+
+# (offset, signature, media type), checked against the first bytes of the body
+MAGIC_SIGNATURES = (
+    (0, b'\xff\xd8\xff', 'image'),  # JPEG
+    (0, b'\x89PNG\r\n\x1a\n', 'image'),
+    (0, b'GIF87a', 'image'),
+    (0, b'GIF89a', 'image'),
+    (0, b'BM', 'image'),
+    (4, b'ftyp', 'video'),  # MP4 / MOV / 3GP (ftypavif/heic are excluded below)
+    (0, b'\x1a\x45\xdf\xa3', 'video'),  # Matroska / WebM
+)
+# ISO-BMFF brands that are still images, not video
+_IMAGE_BRANDS = (b'avif', b'avis', b'heic', b'heix', b'mif1', b'msf1')
+# Content-Types that are never media; the body is not read at all
+_NON_MEDIA_TYPES = ('text/', 'application/json', 'application/xml', 'application/javascript')
+
+SNIFF_BYTES = 32
+
+
+class MediaFetchError(Exception):
+    """The URL did not yield scannable media."""
+
+
+class MediaTooLarge(MediaFetchError):
+    pass
+
+
+class UnsupportedMedia(MediaFetchError):
+    pass
+
+
+def sniff_media_type(head: bytes, content_type: Optional[str] = None) -> Optional[str]:
+    """'image', 'video' or None from the leading bytes, falling back to the Content-Type."""
+    if head[:4] == b'RIFF' and len(head) >= 12:
+        return {b'WEBP': 'image', b'AVI ': 'video'}.get(head[8:12])
+    for offset, signature, media_type in MAGIC_SIGNATURES:
+        if head[offset:offset + len(signature)] == signature:
+            if signature == b'ftyp' and head[8:12] in _IMAGE_BRANDS:
+                return None  # not decodable by OpenCV
+            return media_type
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    if content_type.startswith('image/'):
+        return 'image'
+    if content_type.startswith('video/'):
+        return 'video'
+    return None
+
+
+class MediaFetcher:
+    """Streams a URL's body and classifies it before committing to download it.
+
+    The response is read in chunks over the shared HTTP client. Requests are
+    abandoned as soon as they are known not to be scannable: a non-media
+    `Content-Type`, a declared `Content-Length` above `max_bytes`, leading
+    bytes that match no image or video signature, or a body that grows past
+    `max_bytes`. Image bodies are returned in full; video bodies are not
+    read beyond the sniffed prefix, since the video pipeline fetches the URL
+    itself.
+    """
+
+    def __init__(
+        self,
+        http_client: SharedHttpClient,
+        max_bytes: int = 20 * 1024 * 1024,
+        follow_redirects: bool = False,
+    ):
+        self.http_client = http_client
+        self.max_bytes = int(max_bytes)
+        self.follow_redirects = follow_redirects
+
+    async def fetch(self, url: str) -> Dict[str, Any]:
+        """`{'media_type', 'content_type', 'data', 'size'}`; raises `MediaFetchError` subclasses."""
+        try:
+            return await asyncio.wait_for(self._fetch(url), self.http_client.total_timeout)
+        except asyncio.TimeoutError:
+            raise httpx.TimeoutException(f"fetching {url} took longer than {self.http_client.total_timeout}s")
+
+    async def _fetch(self, url: str) -> Dict[str, Any]:
+        async with self.http_client.client.stream('GET', url, follow_redirects=self.follow_redirects) as response:
+            response.raise_for_status()
+            content_type = response.headers.get('content-type')
+            if content_type and content_type.lower().startswith(_NON_MEDIA_TYPES):
+                raise UnsupportedMedia(f"not an image or video ({content_type})")
+            declared = response.headers.get('content-length')
+            if declared and declared.isdigit() and int(declared) > self.max_bytes:
+                raise MediaTooLarge(f"media is {declared} bytes, over the {self.max_bytes} byte limit")
+
+            body = bytearray()
+            media_type = None
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if media_type is None and len(body) >= SNIFF_BYTES:
+                    media_type = sniff_media_type(bytes(body[:SNIFF_BYTES]), content_type)
+                    if media_type is None:
+                        raise UnsupportedMedia(f"not an image or video ({content_type or 'unknown type'})")
+                    if media_type == 'video':
+                        break
+                if len(body) > self.max_bytes:
+                    raise MediaTooLarge(f"media exceeds the {self.max_bytes} byte limit")
+            if media_type is None:
+                # body shorter than the sniff window
+                media_type = sniff_media_type(bytes(body), content_type)
+                if media_type is None:
+                    raise UnsupportedMedia(f"not an image or video ({content_type or 'unknown type'})")
+
+        return {
+            'media_type': media_type,
+            'content_type': content_type,
+            'data': bytes(body) if media_type == 'image' else None,
+            'size': len(body),
+        }
@@ -0,0 +1,115 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+class ModelLoader:
+    """Loads and warms up the detector off the request path.
+
+    `start()` builds the detector in a background thread and runs warmup
+    batches through it; it is idempotent and is also triggered lazily by the
+    first `predict_frames` call. Callers that arrive before the model is warm
+    block (in their worker thread) until it is ready or loading failed.
+
+    A detector that loaded but reports `degraded` (no weights, constant
+    fallback scores) still serves requests, but the loader's state is
+    `degraded` rather than `ready`, so readiness checks fail.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        warmup_batch_sizes: Sequence[int] = (1,),
+        load_timeout: Optional[float] = None,
+    ):
+        self.factory = factory
+        self.warmup_batch_sizes = [int(n) for n in warmup_batch_sizes if int(n) > 0]
+        self.load_timeout = load_timeout
+
+        self.detector = None
+        self.state = 'cold'  # cold -> loading -> ready | degraded | failed
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Begin loading in the background (no-op if already started)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.state = 'loading'
+            self._thread = threading.Thread(target=self._load, name='model-loader', daemon=True)
+            self._thread.start()
+
+    def _load(self):
+        try:
+            started = time.perf_counter()
+            detector = self.factory()
+            loaded = time.perf_counter()
+            if self.warmup_batch_sizes and hasattr(detector, 'warmup'):
+                detector.warmup(self.warmup_batch_sizes)
+            self.load_seconds = round(loaded - started, 3)
+            self.warmup_seconds = round(time.perf_counter() - loaded, 3)
+            self.detector = detector
+            self._set_serving_state(detector)
+            if self.state == 'ready':
+                print(f"✅ Model ready (load {self.load_seconds}s, warmup {self.warmup_seconds}s)")
+        except Exception as e:
+            self.error = str(e)
+            self.state = 'failed'
+            print(f"❌ Model loading failed: {e}")
+        finally:
+            self._done.set()
+
+    def _set_serving_state(self, detector):
+        if getattr(detector, 'degraded', False):
+            self.state = 'degraded'
+            self.error = "detector is serving fallback scores (model weights unavailable)"
+            print(f"⚠️ Model degraded: {self.error}")
+        else:
+            self.state, self.error = 'ready', None
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == 'ready'
+
+    @property
+    def degraded(self) -> bool:
+        """True while the served detector only produces fallback scores."""
+        return self.state == 'degraded'
+
+    def wait_ready(self, timeout: Optional[float] = None):
+        """Start loading if needed and block until the detector is usable."""
+        self.start()
+        if not self._done.wait(timeout if timeout is not None else self.load_timeout):
+            raise TimeoutError("model is still loading")
+        if self.detector is None:
+            raise RuntimeError(f"model failed to load: {self.error}")
+        return self.detector
+
+    def predict_frames(self, frames: List[Any]) -> List[float]:
+        return self.wait_ready().predict_frames(frames)
+
+    def predict_frames_with_embeddings(self, frames: List[Any]) -> Tuple[List[float], Any]:
+        """Scores and per-frame embeddings (None if the detector has none)."""
+        detector = self.wait_ready()
+        if hasattr(detector, 'predict_frames_with_embeddings'):
+            return detector.predict_frames_with_embeddings(frames)
+        return detector.predict_frames(frames), None
+
+    def close(self):
+        """Release the detector's resources (e.g. worker processes) if it has any."""
+        if self.detector is not None and hasattr(self.detector, 'close'):
+            self.detector.close()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'status': self.state,
+            'load_seconds': self.load_seconds,
+            'warmup_seconds': self.warmup_seconds,
+            'error': self.error,
+        }
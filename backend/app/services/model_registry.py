@@ -0,0 +1,313 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.services.model_loader import ModelLoader
+from models.repository import list_versions
+
+
+def _predict(detector, frames: List[Any]) -> Tuple[List[float], Any]:
+    if hasattr(detector, 'predict_frames_with_embeddings'):
+        return detector.predict_frames_with_embeddings(frames)
+    return detector.predict_frames(frames), None
+
+
+def _close(detector):
+    if detector is not None and hasattr(detector, 'close'):
+        detector.close()
+
+
+class ModelRegistry(ModelLoader):
+    """Serves one version of a model from `model_repository/<model_name>/<version>/`
+    and swaps to another without downtime.
+
+    `factory(version)` builds a detector for a version (None = the backend's
+    default model). `deploy(version)` loads and warms the new version in a
+    background thread while the current one keeps serving, then swaps the
+    active detector atomically; the old detector is closed once the batches
+    it is still running have drained (or after `drain_timeout`). Functions in
+    `on_swap` are called with the new version right after the swap.
+
+    `start_shadow(version, fraction)` loads a candidate next to the active
+    model; that fraction of batches is re-scored by the candidate on a side
+    thread (adding no latency) and both mean scores are logged. Only one
+    comparison runs at a time; batches sampled while it is busy are dropped
+    (and counted) rather than queued with their frames.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[Optional[int]], Any],
+        model_repository: Optional[Path] = None,
+        model_name: Optional[str] = None,
+        version: Optional[int] = None,
+        warmup_batch_sizes: Sequence[int] = (1,),
+        load_timeout: Optional[float] = None,
+        drain_timeout: float = 60.0,
+        shadow_log_size: int = 1000,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.model_repository = Path(model_repository) if model_repository else None
+        self.model_name = model_name
+        if version is None and self.versioned:
+            versions = self.available_versions()
+            version = versions[-1] if versions else None
+        self.version = version
+        self.version_factory = factory
+        super().__init__(lambda: factory(self.version), warmup_batch_sizes, load_timeout)
+
+        self.drain_timeout = drain_timeout
+        self.on_swap: List[Callable[[Optional[int]], None]] = []
+        self._rng = rng
+        # detector -> batches currently running on it (keyed by the object
+        # itself, which also keeps it alive, so keys are never reused)
+        self._in_flight: Dict[Any, int] = {}
+        self._cond = threading.Condition()
+        self._deploy_lock = threading.Lock()
+        self.deployment: Optional[Dict[str, Any]] = None
+        self.swaps = 0
+
+        self.shadow = None
+        self.shadow_version: Optional[int] = None
+        self.shadow_fraction = 0.0
+        self.shadow_state: Optional[str] = None
+        self.shadow_log: deque = deque(maxlen=shadow_log_size)
+        # bumped by every start/stop; a loader only installs its model if
+        # the generation it was started for is still current
+        self._shadow_generation = 0
+        self._shadow_lock = threading.Lock()
+        self._shadow_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shadow-model')
+        # held by the comparison in flight, so frames never pile up in the executor queue
+        self._shadow_slot = threading.Semaphore(1)
+        self.shadow_dropped = 0
+
+    @property
+    def versioned(self) -> bool:
+        return self.model_repository is not None and self.model_name is not None
+
+    def available_versions(self) -> List[int]:
+        if not self.versioned:
+            return []
+        return list_versions(self.model_repository, self.model_name)
+
+    def _check_version(self, version: int):
+        if not self.versioned:
+            raise ValueError("no model repository configured for this backend")
+        if version not in self.available_versions():
+            raise ValueError(f"version {version} of {self.model_name!r} not found in {self.model_repository}")
+
+    def _build(self, version: Optional[int]):
+        detector = self.version_factory(version)
+        if self.warmup_batch_sizes and hasattr(detector, 'warmup'):
+            detector.warmup(self.warmup_batch_sizes)
+        return detector
+
+    # ---- serving ----
+
+    def _acquire(self):
+        self.wait_ready()
+        with self._cond:
+            detector = self.detector
+            self._in_flight[detector] = self._in_flight.get(detector, 0) + 1
+            return detector, self.version
+
+    def _release(self, detector):
+        with self._cond:
+            self._in_flight[detector] -= 1
+            if self._in_flight[detector] == 0:
+                del self._in_flight[detector]
+            self._cond.notify_all()
+
+    def predict_frames(self, frames: List[Any]) -> List[float]:
+        return self.predict_frames_with_embeddings(frames)[0]
+
+    def predict_frames_with_embeddings(self, frames: List[Any]) -> Tuple[List[float], Any]:
+        detector, version = self._acquire()
+        try:
+            result = _predict(detector, frames)
+        finally:
+            self._release(detector)
+        self._maybe_shadow(frames, result[0], version)
+        return result
+
+    # ---- hot swap ----
+
+    def deploy(self, version: int):
+        """Load `version` in the background and swap to it once warm."""
+        self._check_version(version)
+        with self._deploy_lock:
+            if self.deployment and self.deployment['state'] in ('loading', 'draining'):
+                raise RuntimeError(f"deployment of version {self.deployment['version']} already in progress")
+            self.deployment = {'version': version, 'state': 'loading', 'error': None, 'started_at': time.time()}
+        threading.Thread(target=self._deploy, args=(version,), name='model-deploy', daemon=True).start()
+
+    def _deploy(self, version: int):
+        deployment = self.deployment
+        with self._lock:
+            # never loaded (no preload, no request yet): this version becomes the
+            # first one served instead of loading the outgoing one just to close it
+            first_load = self._thread is None
+            if first_load:
+                self._thread = threading.current_thread()
+                self.state = 'loading'
+        try:
+            started = time.perf_counter()
+            new = self._build(version)
+            if not first_load:
+                try:
+                    self.wait_ready()  # only waits for a load that is already running
+                except Exception:
+                    pass  # a failed initial load is simply replaced by this version
+            with self._cond:
+                old, old_version = self.detector, self.version
+                self.detector, self.version = new, version
+                self._set_serving_state(new)
+                self.swaps += 1
+            if first_load:
+                self._done.set()
+            deployment['load_seconds'] = round(time.perf_counter() - started, 3)
+            print(f"🔁 Swapped model {self.model_name} v{old_version} -> v{version}")
+            for callback in self.on_swap:
+                try:
+                    callback(version)
+                except Exception as e:
+                    print(f"Warning: on_swap callback failed: {e}")
+
+            deployment['state'] = 'draining'
+            drained = self._drain(old)
+            deployment['drained'] = drained
+            _close(old)
+            deployment['state'] = 'done'
+        except Exception as e:
+            if first_load and not self._done.is_set():
+                with self._lock:
+                    # let the first request load the current version as usual
+                    self._thread, self.state = None, 'cold'
+            deployment['state'] = 'failed'
+            deployment['error'] = str(e)
+            print(f"❌ Deploying model version {version} failed: {e}")
+
+    def _drain(self, detector) -> bool:
+        """Wait for batches still running on `detector`; False on timeout."""
+        deadline = time.monotonic() + self.drain_timeout
+        with self._cond:
+            while self._in_flight.get(detector, 0) > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    # ---- shadow mode ----
+
+    def start_shadow(self, version: int, fraction: float):
+        """Score `fraction` of batches with `version` as well, for comparison."""
+        self._check_version(version)
+        self.stop_shadow()
+        with self._shadow_lock:
+            generation = self._shadow_generation
+            self.shadow_version = version
+            self.shadow_fraction = min(1.0, max(0.0, float(fraction)))
+            self.shadow_state = 'loading'
+
+        def load():
+            try:
+                model = self._build(version)
+            except Exception as e:
+                with self._shadow_lock:
+                    if generation == self._shadow_generation:
+                        self.shadow_state = 'failed'
+                print(f"❌ Loading shadow model version {version} failed: {e}")
+                return
+            with self._shadow_lock:
+                stale = generation != self._shadow_generation
+                if not stale:
+                    self.shadow = model
+                    self.shadow_state = 'active'
+            if stale:
+                # shadow mode was stopped or restarted while this one loaded
+                _close(model)
+
+        threading.Thread(target=load, name='shadow-loader', daemon=True).start()
+
+    def stop_shadow(self):
+        with self._shadow_lock:
+            self._shadow_generation += 1
+            shadow, self.shadow = self.shadow, None
+            self.shadow_version = None
+            self.shadow_fraction = 0.0
+            self.shadow_state = None
+        if shadow is not None:
+            # let queued comparisons finish before releasing the model
+            self._shadow_executor.submit(_close, shadow)
+
+    def _maybe_shadow(self, frames: List[Any], scores: List[float], version: Optional[int]):
+        shadow, shadow_version = self.shadow, self.shadow_version
+        if shadow is None or not scores or self._rng() >= self.shadow_fraction:
+            return
+        if not self._shadow_slot.acquire(blocking=False):
+            self.shadow_dropped += 1
+            return
+
+        def compare():
+            try:
+                shadow_scores = shadow.predict_frames(frames)
+            except Exception as e:
+                print(f"Warning: shadow model v{shadow_version} failed: {e}")
+                return
+            finally:
+                self._shadow_slot.release()
+            entry = {
+                'time': time.time(),
+                'frames': len(frames),
+                'primary_version': version,
+                'primary_score': round(sum(scores) / len(scores), 4),
+                'shadow_version': shadow_version,
+                'shadow_score': round(sum(shadow_scores) / len(shadow_scores), 4),
+            }
+            self.shadow_log.append(entry)
+            print(
+                f"👥 shadow v{shadow_version}: {entry['shadow_score']} vs v{version}: {entry['primary_score']}"
+                f" ({len(frames)} frames)"
+            )
+
+        try:
+            self._shadow_executor.submit(compare)
+        except RuntimeError:
+            self._shadow_slot.release()  # executor shut down
+
+    # ---- status ----
+
+    def close(self):
+        self.stop_shadow()
+        self._shadow_executor.shutdown(wait=True)
+        super().close()
+
+    def get_status(self) -> Dict[str, Any]:
+        status = super().get_status()
+        status['model'] = self.model_name
+        status['version'] = self.version
+        return status
+
+    def get_registry_status(self) -> Dict[str, Any]:
+        log = list(self.shadow_log)
+        diffs = [abs(e['shadow_score'] - e['primary_score']) for e in log]
+        return {
+            **self.get_status(),
+            'available_versions': self.available_versions(),
+            'swaps': self.swaps,
+            'deployment': self.deployment,
+            'shadow': {
+                'version': self.shadow_version,
+                'state': self.shadow_state,
+                'fraction': self.shadow_fraction,
+                'comparisons': len(log),
+                'dropped': self.shadow_dropped,
+                'mean_abs_diff': round(sum(diffs) / len(diffs), 4) if diffs else None,
+                'recent': log[-20:],
+            },
+        }
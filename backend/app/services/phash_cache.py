@@ -0,0 +1,124 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+HASH_METHODS = ('dhash', 'phash')
+
+# popcount of every byte value, for numpy versions without np.bitwise_count
+_BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def _popcount64(values: np.ndarray) -> np.ndarray:
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+    return _BYTE_POPCOUNT[values.view(np.uint8).reshape(-1, 8)].sum(axis=1)
+
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    return int(np.packbits(bits.astype(np.uint8).ravel()).view('>u8')[0])
+
+
+def dhash(img: np.ndarray) -> int:
+    """64-bit difference hash: sign of horizontal gradients on a 9x8 thumbnail."""
+    import cv2
+
+    gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY) if img.ndim == 3 else img
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA).astype(np.int16)
+    return _bits_to_int(small[:, 1:] > small[:, :-1])
+
+
+def phash(img: np.ndarray) -> int:
+    """64-bit DCT hash: low-frequency 8x8 DCT coefficients against their median."""
+    import cv2
+
+    gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY) if img.ndim == 3 else img
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8]
+    return _bits_to_int(low > np.median(low))
+
+
+class PerceptualHashCache:
+    """Near-duplicate score cache keyed by perceptual hash of the decoded image.
+
+    Re-encoded, resized or lightly recompressed copies of an image hash to
+    nearby 64-bit values, so a lookup returns the cached result of any entry
+    within `radius` bits (Hamming distance). Hashes live in a fixed-size numpy
+    array scanned with one vectorized XOR + popcount per lookup; the least
+    recently used entry is evicted once `max_entries` is reached.
+    """
+
+    def __init__(self, max_entries: int = 50000, radius: int = 6, method: str = 'dhash'):
+        if method not in HASH_METHODS:
+            raise ValueError(f"Invalid hash method: {method}")
+        self.max_entries = max(1, int(max_entries))
+        self.radius = max(0, int(radius))
+        self.method = method
+        self._hash_fn = dhash if method == 'dhash' else phash
+
+        self._hashes = np.zeros(self.max_entries, dtype=np.uint64)
+        self._used = np.zeros(self.max_entries, dtype=bool)
+        # slot -> cached result, in least- to most-recently-used order
+        self._entries: 'OrderedDict[int, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def hash_image(self, img: np.ndarray) -> int:
+        return self._hash_fn(img)
+
+    def _nearest(self, h: int) -> tuple[Optional[int], int]:
+        if not self._entries:
+            return None, 64
+        distances = _popcount64(self._hashes ^ np.uint64(h)).astype(np.int16)
+        distances[~self._used] = 64 + 1
+        slot = int(np.argmin(distances))
+        return slot, int(distances[slot])
+
+    def lookup(self, h: int) -> Optional[Dict[str, Any]]:
+        """Return the cached result nearest to `h` within `radius`, or None."""
+        with self._lock:
+            slot, distance = self._nearest(h)
+            if slot is None or distance > self.radius:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(slot)
+            return {**self._entries[slot], 'distance': distance}
+
+    def store(self, h: int, result: Dict[str, Any]):
+        """Cache `result` for hash `h` (replacing an exact-hash entry if present)."""
+        with self._lock:
+            slot, distance = self._nearest(h)
+            if slot is None or distance != 0:
+                if len(self._entries) >= self.max_entries:
+                    slot, _ = self._entries.popitem(last=False)
+                    self.evictions += 1
+                else:
+                    slot = int(np.argmin(self._used))
+                self._hashes[slot] = np.uint64(h)
+                self._used[slot] = True
+            self._entries[slot] = dict(result)
+            self._entries.move_to_end(slot)
+
+    def clear(self):
+        """Drop every entry (e.g. after the model changes)."""
+        with self._lock:
+            self._entries.clear()
+            self._used[:] = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'method': self.method,
+            'radius': self.radius,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            'evictions': self.evictions,
+        }
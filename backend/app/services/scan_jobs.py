@@ -0,0 +1,133 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class ScanQueueFull(Exception):
+    """Raised by `ScanJobQueue.submit` when the queue is at capacity."""
+
+
+class ScanJobQueue:
+    """Background queue for scans too slow to hold an HTTP request open.
+
+    `submit` records a job and returns it at once; `workers` asyncio tasks
+    take jobs off a queue of at most `max_queue` entries and run
+    `process_fn(job)`, whose return value becomes the job's `result` (an
+    exception marks it `failed`). Jobs move through `queued` -> `running` ->
+    `done`/`failed`; finished jobs are kept for `ttl_seconds` so clients can
+    poll them, and at most `max_jobs` are retained overall.
+    """
+
+    def __init__(
+        self,
+        process_fn: Callable[[Dict[str, Any]], Awaitable[Any]],
+        workers: int = 2,
+        max_queue: int = 100,
+        ttl_seconds: float = 3600.0,
+        max_jobs: int = 10000,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.process_fn = process_fn
+        self.workers = max(1, int(workers))
+        self.max_queue = max(1, int(max_queue))
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_jobs = max(1, int(max_jobs))
+        self._clock = clock
+        self._jobs: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks: List[asyncio.Task] = []
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def start(self):
+        """Start the workers on the running event loop (idempotent)."""
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker(), name=f'scan-job-{i}') for i in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a job for `payload`; raises `ScanQueueFull` when the queue is full."""
+        self._prune()
+        now = self._clock()
+        job = {
+            'job_id': str(uuid.uuid4()),
+            'status': 'queued',
+            'created_at': now,
+            'started_at': None,
+            'finished_at': None,
+            'result': None,
+            'error': None,
+            'payload': payload,
+        }
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise ScanQueueFull(f"scan queue is full ({self.max_queue} jobs waiting)")
+        self._jobs[job['job_id']] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self._prune()
+        return self._jobs.get(job_id)
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """1-based position among queued jobs, or None if not queued."""
+        position = 0
+        for job in self._jobs.values():
+            if job['status'] == 'queued':
+                position += 1
+                if job['job_id'] == job_id:
+                    return position
+        return None
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            job['status'] = 'running'
+            job['started_at'] = self._clock()
+            self.running += 1
+            try:
+                job['result'] = await self.process_fn(job)
+                job['status'] = 'done'
+                self.completed += 1
+            except asyncio.CancelledError:
+                job['status'], job['error'] = 'failed', 'cancelled'
+                raise
+            except Exception as e:
+                job['status'], job['error'] = 'failed', str(e)
+                self.failed += 1
+                print(f"❌ Scan job {job['job_id']} failed: {e}")
+            finally:
+                job['finished_at'] = self._clock()
+                self.running -= 1
+                self._queue.task_done()
+
+    def _prune(self):
+        cutoff = self._clock() - self.ttl_seconds
+        for job_id, job in list(self._jobs.items()):
+            finished = job['finished_at'] is not None
+            if (finished and job['finished_at'] < cutoff) or (finished and len(self._jobs) > self.max_jobs):
+                del self._jobs[job_id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'workers': self.workers,
+            'queue_depth': self._queue.qsize(),
+            'max_queue': self.max_queue,
+            'running': self.running,
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'retained_jobs': len(self._jobs),
+        }
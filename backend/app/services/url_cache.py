@@ -0,0 +1,160 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# click-ID parameters (plus `utm_*`) that never change the media on any host
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'igshid', 'mc_cid', 'mc_eid', '_ga',
+}
+# generic names that are only known to be tracking on these hosts; elsewhere
+# (CDNs, apps) they may select content and are kept
+HOST_TRACKING_PARAMS = {
+    'youtube.com': {'si', 'feature', 'pp', 'ref', 'ref_src'},
+    'youtu.be': {'si', 'feature', 'pp', 'ref', 'ref_src'},
+    'twitter.com': {'ref_src', 'ref_url'},
+    'x.com': {'ref_src', 'ref_url'},
+}
+
+_YOUTUBE_ID = re.compile(r'^[A-Za-z0-9_-]{11}$')
+_YOUTUBE_HOSTS = ('youtube.com', 'youtube-nocookie.com')
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def youtube_video_id(url: str) -> Optional[str]:
+    """Return the 11-character video ID of a YouTube URL, or None."""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or '').lower()
+    path = [p for p in parts.path.split('/') if p]
+    candidate = None
+    if host == 'youtu.be' and path:
+        candidate = path[0]
+    elif any(host == h or host.endswith('.' + h) for h in _YOUTUBE_HOSTS):
+        if path[:1] == ['watch']:
+            candidate = dict(parse_qsl(parts.query)).get('v')
+        elif len(path) >= 2 and path[0] in ('shorts', 'embed', 'live', 'v'):
+            candidate = path[1]
+    if candidate and _YOUTUBE_ID.match(candidate):
+        return candidate
+    return None
+
+
+def _tracking_params(host: str) -> set:
+    for domain, params in HOST_TRACKING_PARAMS.items():
+        if host == domain or host.endswith('.' + domain):
+            return TRACKING_PARAMS | params
+    return TRACKING_PARAMS
+
+
+def normalize_url(url: str) -> str:
+    """Canonical cache key for `url`.
+
+    YouTube links collapse to `youtube:<video id>`. Other URLs get a lowercased
+    scheme and host (without `www.` and default ports), no fragment, no
+    trailing slash, no tracking parameters (click IDs and `utm_*` everywhere,
+    plus host-specific ones such as YouTube's `si`) and sorted query
+    parameters.
+    """
+    video_id = youtube_video_id(url)
+    if video_id:
+        return f'youtube:{video_id}'
+
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f'{host}:{parts.port}'
+    path = parts.path.rstrip('/') or '/'
+    tracking = _tracking_params(host)
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in tracking and not k.lower().startswith('utm_')
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+
+class UrlResultCache:
+    """In-memory scan-result cache keyed by normalized URL.
+
+    Successful results live for the TTL of their media type (`image`,
+    `video`, `other`); failed fetches/decodes are cached too (negative
+    caching) under the shorter `error` TTL so a broken or hostile URL is not
+    refetched on every scan. Bounded to `max_entries` with LRU eviction.
+    """
+
+    def __init__(
+        self,
+        ttls: Dict[str, float],
+        max_entries: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttls = dict(ttls)
+        self.max_entries = max(1, int(max_entries))
+        self._clock = clock
+        # key -> (stored_at, expires_at, result)
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return `{'result': ..., 'age_seconds': ...}` for a live entry, or None."""
+        key = normalize_url(url)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            stored_at, _, result = entry
+            if result.get('error'):
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+        return {'result': result, 'age_seconds': round(now - stored_at, 3)}
+
+    def __contains__(self, url: str) -> bool:
+        """Whether `url` has a live entry; unlike `get`, not counted as a lookup."""
+        entry = self._entries.get(normalize_url(url))
+        return entry is not None and entry[1] > self._clock()
+
+    def put(self, url: str, result: Dict[str, Any], media_type: str):
+        """Cache `result`; results carrying an `error` use the negative TTL."""
+        ttl = self.ttls.get('error' if result.get('error') else media_type, 0)
+        if ttl <= 0:
+            return
+        key = normalize_url(url)
+        now = self._clock()
+        with self._lock:
+            self._entries[key] = (now, now + ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttls': self.ttls,
+            'hits': self.hits,
+            'negative_hits': self.negative_hits,
+            'misses': self.misses,
+            'hit_rate': round((self.hits + self.negative_hits) / lookups, 4) if lookups else None,
+            'evictions': self.evictions,
+        }
@@ -0,0 +1,168 @@
+import hashlib
+import os
+import re
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator
+
+from app.services.url_cache import normalize_url
+
+_CACHE_FILE = re.compile(r'^[0-9a-f]{32}\.mp4$')
+# `<key>.<uuid>.part` from `_download`, plus whatever the downloader derives
+# from it (e.g. `download_video`'s `.tmp.mp4`, yt-dlp's own `.part`)
+_TEMP_FILE = re.compile(r'^[0-9a-f]{32}\.[0-9a-f]{32}\.(part|tmp\.mp4)(\.part|\.ytdl)?$')
+
+
+class VideoDownloadCache:
+    """On-disk cache of downloaded videos keyed by canonical URL.
+
+    Every link variant of a video (`youtu.be/X`, `watch?v=X&si=...`, shorts,
+    embeds) maps through `normalize_url` to the same file, so a video that
+    keeps getting scanned is downloaded once. Downloads go to a temporary
+    `.part` file that is renamed into place, so a crash never leaves a
+    truncated entry. Concurrent scans of a video that is still downloading
+    wait for that one download instead of starting their own. Files are
+    evicted least recently used first once they exceed `max_bytes`; a file
+    is never deleted while a `fetch` block is using it. Temporary files left
+    by an interrupted download are removed on startup; other files in
+    `cache_dir` are ignored.
+
+    `download_fn(url, out_path)` writes the video to `out_path`.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        download_fn: Callable[[str, Path], Any],
+        max_bytes: int = 2 * 1024 ** 3,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.download_fn = download_fn
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        # file name -> size in bytes, least recently used first
+        self._entries: 'OrderedDict[str, int]' = OrderedDict()
+        self._pins: Counter = Counter()
+        self._in_flight: Dict[str, Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.shared_downloads = 0
+        self.evictions = 0
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        files = []
+        for path in self.cache_dir.iterdir():
+            if _CACHE_FILE.match(path.name):
+                files.append(path)
+            elif _TEMP_FILE.match(path.name) and path.is_file():
+                path.unlink(missing_ok=True)  # partial download from a previous run
+        # pick up files from previous runs in last-used order
+        files.sort(key=lambda p: p.stat().st_mtime)
+        for path in files:
+            self._entries[path.name] = path.stat().st_size
+        with self._lock:
+            self._evict()
+
+    @staticmethod
+    def file_name(url: str) -> str:
+        return hashlib.sha256(normalize_url(url).encode()).hexdigest()[:32] + '.mp4'
+
+    def _download(self, name: str, url: str):
+        tmp = self.cache_dir / f'{name[:-4]}.{uuid.uuid4().hex}.part'
+        try:
+            self.download_fn(url, tmp)
+            size = tmp.stat().st_size
+            os.replace(tmp, self.cache_dir / name)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return size
+
+    def _acquire(self, url: str) -> Path:
+        """Path of the cached video, downloading it if needed; pinned until `_release`."""
+        name = self.file_name(url)
+        while True:
+            with self._lock:
+                if name in self._entries:
+                    self._entries.move_to_end(name)
+                    self._pins[name] += 1
+                    self.hits += 1
+                    return self.cache_dir / name
+                future = self._in_flight.get(name)
+                owner = future is None
+                if owner:
+                    future = self._in_flight[name] = Future()
+                    self.misses += 1
+                else:
+                    self.shared_downloads += 1
+
+            if not owner:
+                future.result()  # re-raises the download error
+                continue  # normally a hit now; re-download if it was already evicted
+
+            try:
+                size = self._download(name, url)
+            except BaseException as e:
+                with self._lock:
+                    del self._in_flight[name]
+                future.set_exception(e)
+                raise
+            with self._lock:
+                self._entries[name] = size
+                self._pins[name] += 1
+                del self._in_flight[name]
+                self._evict()
+            future.set_result(None)
+            return self.cache_dir / name
+
+    def _release(self, path: Path):
+        with self._lock:
+            self._pins[path.name] -= 1
+            if self._pins[path.name] <= 0:
+                del self._pins[path.name]
+            self._evict()
+
+    @contextmanager
+    def fetch(self, url: str) -> Iterator[Path]:
+        """Local path of the video at `url`, valid for the duration of the block."""
+        path = self._acquire(url)
+        try:
+            try:
+                os.utime(path)  # last-use order survives restarts
+            except OSError:
+                pass
+            yield path
+        finally:
+            self._release(path)
+
+    def _evict(self):
+        total = sum(self._entries.values())
+        for name in list(self._entries):
+            if total <= self.max_bytes:
+                break
+            if self._pins.get(name):
+                continue
+            total -= self._entries.pop(name)
+            (self.cache_dir / name).unlink(missing_ok=True)
+            self.evictions += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, total = len(self._entries), sum(self._entries.values())
+            downloading = len(self._in_flight)
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'bytes': total,
+            'max_bytes': self.max_bytes,
+            'downloading': downloading,
+            'hits': self.hits,
+            'misses': self.misses,
+            'shared_downloads': self.shared_downloads,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            'evictions': self.evictions,
+        }
@@ -3,8 +3,13 @@ import asyncio
 from typing import Optional, Dict, Any
 from datetime import datetime
 
+from app.services.http_client import SharedHttpClient
+
 class WebhookService:
     """Service for sending webhook notifications to customers."""
+
+    # the application's pooled client (set at startup); None = one client per webhook
+    http_client: Optional[SharedHttpClient] = None
     
     @staticmethod
     async def send_webhook(
@@ -18,7 +23,7 @@ class WebhookService:
         
         Args:
             webhook_url: Customer's webhook endpoint URL
-            event_type: Type of event (e.g., 'scan.completed', 'scan.flagged', 'review.completed')
+            event_type: Type of event (e.g., 'scan.completed', 'scan.flagged', 'scan.failed', 'review.completed')
             data: Event data to send
             retry_count: Number of retry attempts
             
@@ -38,18 +43,28 @@ class WebhookService:
         
         for attempt in range(retry_count):
             try:
-                async with httpx.AsyncClient(timeout=10.0) as client:
-                    response = await client.post(
+                if WebhookService.http_client is not None:
+                    response = await WebhookService.http_client.client.post(
                         webhook_url,
                         json=payload,
-                        headers=headers
+                        headers=headers,
+                        timeout=10.0,
+                        # a 3xx is a delivery failure, not a hop to follow
+                        follow_redirects=False,
                     )
-                    
-                    if response.status_code in [200, 201, 202, 204]:
-                        print(f"✅ Webhook delivered successfully: {event_type} to {webhook_url}")
-                        return True
-                    else:
-                        print(f"⚠️ Webhook failed with status {response.status_code}: {webhook_url}")
+                else:
+                    async with httpx.AsyncClient(timeout=10.0, follow_redirects=False) as client:
+                        response = await client.post(
+                            webhook_url,
+                            json=payload,
+                            headers=headers
+                        )
+
+                if response.status_code in [200, 201, 202, 204]:
+                    print(f"✅ Webhook delivered successfully: {event_type} to {webhook_url}")
+                    return True
+                else:
+                    print(f"⚠️ Webhook failed with status {response.status_code}: {webhook_url}")
                         
             except httpx.TimeoutException:
                 print(f"⏱️ Webhook timeout (attempt {attempt + 1}/{retry_count}): {webhook_url}")
@@ -77,9 +92,29 @@ class WebhookService:
                 'score': result.get('score'),
                 'flags': result.get('flags', []),
                 'is_flagged': result.get('score', 0) > 0.6,
+                # set when the scan ran as a queued job
+                'job_id': result.get('job_id'),
             }
         )
     
+    @staticmethod
+    async def notify_scan_failed(webhook_url: str, job_id: str, url: str, error: str, result: Optional[Dict[Any, Any]] = None) -> bool:
+        """Send notification when a queued scan job could not analyse its media."""
+        result = result or {}
+        return await WebhookService.send_webhook(
+            webhook_url=webhook_url,
+            event_type='scan.failed',
+            data={
+                'job_id': job_id,
+                'scan_id': result.get('scan_id'),
+                'url': url,
+                'error': error,
+                # heuristic score, when the URL checks still ran
+                'score': result.get('score'),
+                'flags': result.get('flags', []),
+            }
+        )
+
     @staticmethod
     async def notify_scan_flagged(webhook_url: str, scan_id: str, result: Dict[Any, Any]) -> bool:
         """Send notification when deepfake is detected (high score)."""
@@ -24,3 +24,197 @@ PERPLEXITY_API_KEY = os.environ.get("PERPLEXITY_API_KEY")
 PERPLEXITY_BASE_URL = "https://api.perplexity.ai"
 PERPLEXITY_MODEL = os.environ.get("PERPLEXITY_MODEL", "llama-3.1-sonar-small-128k-online")
 PERPLEXITY_TIMEOUT = int(os.environ.get("PERPLEXITY_TIMEOUT", "30"))
+
+
+# Model inference batching
+INFERENCE_MAX_BATCH_SIZE = int(os.environ.get("INFERENCE_MAX_BATCH_SIZE", "16"))
+INFERENCE_MAX_WAIT_MS = float(os.environ.get("INFERENCE_MAX_WAIT_MS", "5"))
+# >0 runs inference in that many worker processes (one detector each)
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", "0"))
+INFERENCE_THREADS_PER_WORKER = int(os.environ.get("INFERENCE_THREADS_PER_WORKER", "1"))
+
+# Detector backend: "torch" (eager torchvision ResNet), "onnx" (ONNX Runtime)
+# or "triton" (remote KServe v2 / Triton inference server)
+DETECTOR_BACKEND = os.environ.get("DETECTOR_BACKEND", "torch")
+MODEL_REPOSITORY = os.environ.get(
+    "MODEL_REPOSITORY", os.path.join(os.path.dirname(os.path.abspath(__file__)), "model_repository")
+)
+ONNX_MODEL_NAME = os.environ.get("ONNX_MODEL_NAME", "deepfake_detector_onnx")
+ONNX_MODEL_VERSION = int(os.environ["ONNX_MODEL_VERSION"]) if os.environ.get("ONNX_MODEL_VERSION") else None
+ONNX_INTRA_OP_THREADS = int(os.environ.get("ONNX_INTRA_OP_THREADS", "0"))
+ONNX_INTER_OP_THREADS = int(os.environ.get("ONNX_INTER_OP_THREADS", "0"))
+ONNX_GRAPH_OPTIMIZATION_LEVEL = os.environ.get("ONNX_GRAPH_OPTIMIZATION_LEVEL", "all")
+# Remote inference server for the "triton" backend
+TRITON_URL = os.environ.get("TRITON_URL", "http://localhost:8080")
+TRITON_MODEL_NAME = os.environ.get("TRITON_MODEL_NAME", "deepfake_detector_onnx")
+TRITON_MODEL_VERSION = int(os.environ["TRITON_MODEL_VERSION"]) if os.environ.get("TRITON_MODEL_VERSION") else None
+# must not exceed max_batch_size in the model's config.pbtxt
+TRITON_MAX_BATCH_SIZE = int(os.environ.get("TRITON_MAX_BATCH_SIZE", "8"))
+TRITON_TIMEOUT = float(os.environ.get("TRITON_TIMEOUT", "30"))
+TRITON_RETRIES = int(os.environ.get("TRITON_RETRIES", "2"))
+# batches in flight to the server at once (the API process only waits on I/O)
+TRITON_MAX_CONCURRENT_REQUESTS = int(os.environ.get("TRITON_MAX_CONCURRENT_REQUESTS", "4"))
+# Optional TorchScript classifier for the torch backend (e.g. an INT8 export)
+TORCH_MODEL_PATH = os.environ.get("TORCH_MODEL_PATH")
+# ...or a TorchScript model.pt resolved from MODEL_REPOSITORY (latest version if unset)
+TORCH_MODEL_NAME = os.environ.get("TORCH_MODEL_NAME")
+TORCH_MODEL_VERSION = int(os.environ["TORCH_MODEL_VERSION"]) if os.environ.get("TORCH_MODEL_VERSION") else None
+# freeze + optimize_for_inference the TorchScript graph, channels-last inputs
+TORCH_FREEZE = os.environ.get("TORCH_FREEZE", "true").lower() in ("1", "true", "yes")
+TORCH_CHANNELS_LAST = os.environ.get("TORCH_CHANNELS_LAST", "true").lower() in ("1", "true", "yes")
+# intra-op threads for in-process torch inference (0 = torch default)
+TORCH_NUM_THREADS = int(os.environ.get("TORCH_NUM_THREADS", "0"))
+
+# Face-region crops: score detected faces instead of the whole frame
+FACE_CROP_ENABLED = os.environ.get("FACE_CROP_ENABLED", "false").lower() in ("1", "true", "yes")
+# "haar" (OpenCV 4.x cascade), "yunet" (cv2.FaceDetectorYN, needs FACE_DETECTOR_MODEL) or "auto"
+FACE_DETECTOR = os.environ.get("FACE_DETECTOR", "auto")
+FACE_DETECTOR_MODEL = os.environ.get("FACE_DETECTOR_MODEL")
+FACE_CROP_PADDING = float(os.environ.get("FACE_CROP_PADDING", "0.3"))
+FACE_CROP_MAX_FACES = int(os.environ.get("FACE_CROP_MAX_FACES", "4"))
+# frames without a face: "downsample" (score the whole frame) or "skip"
+FACE_CROP_NO_FACE = os.environ.get("FACE_CROP_NO_FACE", "downsample")
+
+# Two-stage cascade: a cheap triage score lets clearly benign/suspicious
+# frames skip the full detector; only scores in [CASCADE_LOW, CASCADE_HIGH] go on
+CASCADE_ENABLED = os.environ.get("CASCADE_ENABLED", "false").lower() in ("1", "true", "yes")
+CASCADE_TRIAGE_WEIGHTS = os.environ.get("CASCADE_TRIAGE_WEIGHTS")
+CASCADE_LOW = float(os.environ.get("CASCADE_LOW", "0.2"))
+CASCADE_HIGH = float(os.environ.get("CASCADE_HIGH", "0.9"))
+
+# Audio track scoring for videos: TorchScript classifier over log-mel windows
+# (unset = video audio is not scored)
+AUDIO_MODEL_PATH = os.environ.get("AUDIO_MODEL_PATH")
+AUDIO_WINDOW_SECONDS = float(os.environ.get("AUDIO_WINDOW_SECONDS", "4"))
+# windows decoded and scored per model call
+AUDIO_BATCH_WINDOWS = int(os.environ.get("AUDIO_BATCH_WINDOWS", "8"))
+AUDIO_MAX_SECONDS = float(os.environ.get("AUDIO_MAX_SECONDS", "300"))
+# highest audio bitrate (kbps) fetched for scoring
+AUDIO_MAX_ABR = int(os.environ.get("AUDIO_MAX_ABR", "64"))
+
+# Model loading: local resnet18 weights avoid any download at startup
+MODEL_WEIGHTS_PATH = os.environ.get("MODEL_WEIGHTS_PATH")
+MODEL_ALLOW_DOWNLOAD = os.environ.get("MODEL_ALLOW_DOWNLOAD", "true").lower() in ("1", "true", "yes")
+# Start loading in the background at startup (otherwise on first scan)
+MODEL_PRELOAD = os.environ.get("MODEL_PRELOAD", "true").lower() in ("1", "true", "yes")
+MODEL_WARMUP_BATCH_SIZES = [
+    int(n) for n in os.environ.get("MODEL_WARMUP_BATCH_SIZES", "1,4").split(",") if n.strip()
+]
+
+# Perceptual-hash near-duplicate cache for scanned images
+PHASH_CACHE_ENABLED = os.environ.get("PHASH_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+PHASH_CACHE_MAX_ENTRIES = int(os.environ.get("PHASH_CACHE_MAX_ENTRIES", "50000"))
+# maximum Hamming distance (of 64 bits) still treated as the same image
+PHASH_CACHE_RADIUS = int(os.environ.get("PHASH_CACHE_RADIUS", "6"))
+PHASH_CACHE_METHOD = os.environ.get("PHASH_CACHE_METHOD", "dhash")
+
+# Persistent result cache keyed by SHA-256 of fetched media bytes
+CONTENT_CACHE_ENABLED = os.environ.get("CONTENT_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+CONTENT_CACHE_PATH = os.environ.get(
+    "CONTENT_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "content_cache.sqlite3")
+)
+CONTENT_CACHE_MAX_BYTES = int(os.environ.get("CONTENT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CONTENT_CACHE_TTL_SECONDS = float(os.environ.get("CONTENT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# Identifies the scoring model in result caches; changing the model settings
+# (or setting MODEL_VERSION explicitly) invalidates cached results
+MODEL_VERSION = os.environ.get("MODEL_VERSION") or "|".join(
+    str(v)
+    for v in (
+        DETECTOR_BACKEND,
+        TORCH_MODEL_PATH,
+        TORCH_MODEL_NAME,
+        TORCH_MODEL_VERSION,
+        MODEL_WEIGHTS_PATH,
+        ONNX_MODEL_NAME,
+        ONNX_MODEL_VERSION,
+        TRITON_URL if DETECTOR_BACKEND == "triton" else None,
+        TRITON_MODEL_NAME if DETECTOR_BACKEND == "triton" else None,
+        TRITON_MODEL_VERSION,
+        CASCADE_TRIAGE_WEIGHTS if CASCADE_ENABLED else None,
+        f"faces:{FACE_DETECTOR}" if FACE_CROP_ENABLED else None,
+    )
+)
+
+# Scan results by normalized URL; TTLs in seconds per media type, "error" is
+# the negative-cache TTL for failed fetches/decodes (0 disables that type)
+URL_CACHE_ENABLED = os.environ.get("URL_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+URL_CACHE_MAX_ENTRIES = int(os.environ.get("URL_CACHE_MAX_ENTRIES", "10000"))
+URL_CACHE_TTLS = {
+    "image": float(os.environ.get("URL_CACHE_TTL_IMAGE", "3600")),
+    "video": float(os.environ.get("URL_CACHE_TTL_VIDEO", "21600")),
+    "other": float(os.environ.get("URL_CACHE_TTL_OTHER", "600")),
+    "error": float(os.environ.get("URL_CACHE_TTL_ERROR", "60")),
+}
+
+# Similarity index of frame embeddings from reviewer-confirmed scams
+SCAM_INDEX_ENABLED = os.environ.get("SCAM_INDEX_ENABLED", "true").lower() in ("1", "true", "yes")
+SCAM_INDEX_DIR = os.environ.get(
+    "SCAM_INDEX_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "scam_index")
+)
+# cosine similarity at or above which a frame counts as a known scam frame
+SCAM_INDEX_THRESHOLD = float(os.environ.get("SCAM_INDEX_THRESHOLD", "0.92"))
+# exhaustive search up to this many vectors, IVF lists beyond it
+SCAM_INDEX_BRUTE_FORCE_MAX = int(os.environ.get("SCAM_INDEX_BRUTE_FORCE_MAX", "50000"))
+SCAM_INDEX_NPROBE = int(os.environ.get("SCAM_INDEX_NPROBE", "8"))
+
+# How video frames are sampled: "seek" per sample, "sequential" decode, or
+# "auto" (sequential for short videos, seeking for long ones)
+# (same modes as scripts.extract_frames.SAMPLING_MODES)
+VIDEO_FRAME_SAMPLING_MODES = ("auto", "seek", "sequential")
+VIDEO_FRAME_SAMPLING = os.environ.get("VIDEO_FRAME_SAMPLING", "auto").strip().lower()
+if VIDEO_FRAME_SAMPLING not in VIDEO_FRAME_SAMPLING_MODES:
+    raise ValueError(
+        f"VIDEO_FRAME_SAMPLING must be one of {', '.join(VIDEO_FRAME_SAMPLING_MODES)}, got {VIDEO_FRAME_SAMPLING!r}"
+    )
+
+# Adaptive video sampling: decode this many candidate frames, skip repeated
+# scenes and stop scoring once the verdict is clear (false = score 4 frames)
+ADAPTIVE_SAMPLING_ENABLED = os.environ.get("ADAPTIVE_SAMPLING_ENABLED", "true").lower() in ("1", "true", "yes")
+VIDEO_CANDIDATE_FRAMES = int(os.environ.get("VIDEO_CANDIDATE_FRAMES", "16"))
+VIDEO_MAX_SCORED_FRAMES = int(os.environ.get("VIDEO_MAX_SCORED_FRAMES", "8"))
+# mean absolute difference of 32x32 thumbnails (0..1) that starts a new scene
+VIDEO_SCENE_THRESHOLD = float(os.environ.get("VIDEO_SCENE_THRESHOLD", "0.05"))
+# stop once the mean score is this far from the flag threshold
+VIDEO_CONFIDENCE_MARGIN = float(os.environ.get("VIDEO_CONFIDENCE_MARGIN", "0.15"))
+
+# "file": download the full video and sample across its length; "stream": pipe
+# a low-res video-only download into the decoder and stop once enough frames
+# are sampled (only the opening frames x interval seconds are seen)
+VIDEO_DOWNLOAD_MODE = os.environ.get("VIDEO_DOWNLOAD_MODE", "file")
+# highest resolution fetched for streamed and cached downloads
+VIDEO_MAX_HEIGHT = int(os.environ.get("VIDEO_MAX_HEIGHT", "360"))
+# seconds between frames sampled from a stream
+VIDEO_STREAM_INTERVAL = float(os.environ.get("VIDEO_STREAM_INTERVAL", "2.0"))
+
+# Downloaded videos kept on disk by canonical URL ("file" download mode)
+VIDEO_CACHE_ENABLED = os.environ.get("VIDEO_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+VIDEO_CACHE_DIR = os.environ.get(
+    "VIDEO_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "video_cache")
+)
+VIDEO_CACHE_MAX_BYTES = int(os.environ.get("VIDEO_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+
+# Video scans answered with a job ID and processed by a background worker pool
+SCAN_JOBS_ENABLED = os.environ.get("SCAN_JOBS_ENABLED", "true").lower() in ("1", "true", "yes")
+SCAN_JOB_WORKERS = int(os.environ.get("SCAN_JOB_WORKERS", "2"))
+# jobs waiting beyond this are rejected with 503
+SCAN_JOB_QUEUE_SIZE = int(os.environ.get("SCAN_JOB_QUEUE_SIZE", "100"))
+# finished jobs stay pollable this long
+SCAN_JOB_TTL_SECONDS = float(os.environ.get("SCAN_JOB_TTL_SECONDS", "3600"))
+
+# Shared HTTP client for media fetches and webhooks
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", "15"))
+# wall-clock cap on a whole media fetch
+HTTP_TOTAL_TIMEOUT = float(os.environ.get("HTTP_TOTAL_TIMEOUT", "30"))
+# needs the h2 package (httpx[http2]); falls back to HTTP/1.1 without it
+HTTP2_ENABLED = os.environ.get("HTTP2_ENABLED", "true").lower() in ("1", "true", "yes")
+# fetched images larger than this are rejected without buffering the rest;
+# downloaded videos are capped at the same size
+MEDIA_MAX_BYTES = int(os.environ.get("MEDIA_MAX_BYTES", str(20 * 1024 * 1024)))
+# follow 3xx responses when fetching media (off: a redirect fails the fetch)
+MEDIA_FOLLOW_REDIRECTS = os.environ.get("MEDIA_FOLLOW_REDIRECTS", "false").lower() in ("1", "true", "yes")
+HTTP_MAX_REDIRECTS = int(os.environ.get("HTTP_MAX_REDIRECTS", "5"))
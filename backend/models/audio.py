@@ -0,0 +1,210 @@
+"""Streaming audio deepfake scoring in fixed-size windows.
+
+The audio track is decoded by `ffmpeg` to 16 kHz mono PCM on a pipe (for
+URLs, `yt-dlp` fetches a low-bitrate audio-only format into it) and read
+`batch_windows` windows at a time, so memory stays at one batch of samples
+however long the clip is. Each batch becomes log-mel spectrograms in one
+call (`LogMelFrontend`, torchaudio) and is scored by a pluggable audio model:
+anything with `predict(mels) -> list[float]`, e.g. `TorchScriptAudioModel`
+for a TorchScript classifier taking `(N, 1, n_mels, T)` log-mels and
+returning `(N, 1)` sigmoid probabilities.
+
+`AudioScorer` aggregates window scores by their mean and stops reading once
+at least `min_windows` windows have been scored and the mean is `margin`
+clear of `threshold` with every window agreeing, or after `max_seconds`.
+"""
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+from typing import BinaryIO, Iterator, List
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def audio_format(max_abr: int = 64) -> str:
+    """yt-dlp format selector: smallest adequate audio-only stream.
+
+    Direct video files have no audio-only format, so fall back to the best
+    combined one (`b`); ffmpeg drops its video stream when decoding.
+    """
+    return f"ba[abr<={max_abr}]/wa/ba/b"
+
+
+def fetch_command(url: str, max_abr: int = 64) -> List[str]:
+    """yt-dlp command writing the audio stream of `url` to stdout."""
+    return ["yt-dlp", "-q", "--no-playlist", "--socket-timeout", "30", "-f", audio_format(max_abr), "-o", "-", url]
+
+
+def decode_command(source: str = "pipe:0", sample_rate: int = SAMPLE_RATE) -> List[str]:
+    """ffmpeg command writing the audio of `source` as mono s16le PCM to stdout."""
+    return [
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-nostdin",
+        "-i", source, "-vn", "-ac", "1", "-ar", str(sample_rate), "-f", "s16le", "pipe:1",
+    ]
+
+
+def pcm_windows(stream: BinaryIO, window_samples: int, batch_windows: int = 1) -> Iterator[np.ndarray]:
+    """Read s16le PCM from `stream` as `(n, window_samples)` float32 batches of up to `batch_windows`.
+
+    A trailing partial window is zero-padded if it holds at least half a
+    window, and dropped otherwise.
+    """
+    batch_bytes = window_samples * batch_windows * 2
+    pending = b""
+    while True:
+        chunk = stream.read(batch_bytes - len(pending))
+        if chunk:
+            pending += chunk
+            if len(pending) < batch_bytes:
+                continue
+        samples = np.frombuffer(pending[:len(pending) - len(pending) % 2], dtype="<i2").astype(np.float32) / 32768.0
+        pending = b""
+        n_full = len(samples) // window_samples
+        rest = samples[n_full * window_samples:]
+        windows = samples[:n_full * window_samples].reshape(n_full, window_samples)
+        if not chunk and len(rest) >= window_samples // 2:
+            windows = np.concatenate([windows, np.pad(rest, (0, window_samples - len(rest)))[None]])
+        if len(windows):
+            yield windows
+        if not chunk:
+            return
+
+
+class LogMelFrontend:
+    """Batched log-mel spectrograms: `(N, samples)` float32 -> `(N, 1, n_mels, T)` tensor."""
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, n_mels: int = 64, n_fft: int = 400, hop_length: int = 160):
+        import torchaudio
+
+        self.melspec = torchaudio.transforms.MelSpectrogram(
+            sample_rate=sample_rate, n_fft=n_fft, hop_length=hop_length, n_mels=n_mels
+        )
+        self.to_db = torchaudio.transforms.AmplitudeToDB(stype="power", top_db=80.0)
+
+    def __call__(self, windows: np.ndarray):
+        import torch
+
+        with torch.inference_mode():
+            mels = self.to_db(self.melspec(torch.from_numpy(np.ascontiguousarray(windows))))
+            # per-window standardisation, so loudness does not drive the score
+            mean = mels.mean(dim=(1, 2), keepdim=True)
+            std = mels.std(dim=(1, 2), keepdim=True).clamp_min(1e-5)
+            return ((mels - mean) / std).unsqueeze(1)
+
+
+class TorchScriptAudioModel:
+    def __init__(self, model_path: str | Path, num_threads: int | None = None):
+        import torch
+
+        if num_threads:
+            torch.set_num_threads(int(num_threads))
+        self.torch = torch
+        self.model = torch.jit.load(str(model_path), map_location="cpu").eval()
+
+    def predict(self, mels) -> List[float]:
+        with self.torch.inference_mode():
+            out = self.model(mels)
+        return [float(p) for p in out.reshape(len(mels), -1)[:, 0]]
+
+
+class AudioScorer:
+    def __init__(
+        self,
+        model,
+        frontend=None,
+        window_seconds: float = 4.0,
+        batch_windows: int = 8,
+        max_seconds: float = 300.0,
+        threshold: float = 0.6,
+        margin: float = 0.15,
+        min_windows: int = 4,
+        sample_rate: int = SAMPLE_RATE,
+    ):
+        self.model = model
+        self.frontend = frontend if frontend is not None else LogMelFrontend(sample_rate)
+        self.sample_rate = sample_rate
+        self.window_samples = int(window_seconds * sample_rate)
+        self.batch_windows = max(1, int(batch_windows))
+        self.max_windows = max(1, int(max_seconds / window_seconds))
+        self.threshold = threshold
+        self.margin = margin
+        self.min_windows = max(1, int(min_windows))
+
+    def _confident(self, scores: List[float]) -> bool:
+        if len(scores) < self.min_windows:
+            return False
+        mean = sum(scores) / len(scores)
+        if mean >= self.threshold + self.margin:
+            return min(scores) > self.threshold
+        if mean <= self.threshold - self.margin:
+            return max(scores) < self.threshold
+        return False
+
+    def score_stream(self, stream: BinaryIO) -> dict:
+        """Score s16le mono PCM read from `stream` until confident, capped or exhausted."""
+        scores: List[float] = []
+        stopped_early = False
+        for windows in pcm_windows(stream, self.window_samples, self.batch_windows):
+            windows = windows[:self.max_windows - len(scores)]
+            scores.extend(float(s) for s in self.model.predict(self.frontend(windows)))
+            if self._confident(scores):
+                stopped_early = True
+                break
+            if len(scores) >= self.max_windows:
+                break
+        return {
+            "score": sum(scores) / len(scores) if scores else None,
+            "max_window_score": max(scores) if scores else None,
+            "windows": len(scores),
+            "seconds": round(len(scores) * self.window_samples / self.sample_rate, 2),
+            "stopped_early": stopped_early,
+        }
+
+    @staticmethod
+    def _check_exit(result: dict, procs: List[tuple]):
+        """Raise if nothing was scored because one of the processes failed."""
+        if result["windows"]:
+            return
+        for name, proc in procs:
+            try:
+                code = proc.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                continue
+            if code:
+                raise RuntimeError(f"{name} exited with code {code} before any audio was decoded")
+
+    def score_file(self, path: str | Path) -> dict:
+        proc = subprocess.Popen(
+            decode_command(str(path), self.sample_rate), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        try:
+            result = self.score_stream(proc.stdout)
+            self._check_exit(result, [("ffmpeg", proc)])
+            return result
+        finally:
+            proc.kill()
+            proc.wait()
+            proc.stdout.close()
+
+    def score_url(self, url: str, max_abr: int = 64) -> dict:
+        """Fetch the audio-only stream of `url` with yt-dlp and score it as it downloads."""
+        fetch = subprocess.Popen(fetch_command(url, max_abr), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        decode = subprocess.Popen(
+            decode_command("pipe:0", self.sample_rate),
+            stdin=fetch.stdout,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        fetch.stdout.close()  # ffmpeg holds the read end now
+        try:
+            result = self.score_stream(decode.stdout)
+            self._check_exit(result, [("yt-dlp", fetch), ("ffmpeg", decode)])
+            return result
+        finally:
+            for proc in (fetch, decode):
+                proc.kill()
+                proc.wait()
+            decode.stdout.close()
@@ -3,69 +3,169 @@
 Uses a torchvision `resnet18` pretrained on ImageNet as a feature extractor.
 For demo purposes we compute a simple score from the feature vector magnitude.
 Replace with a trained deepfake classifier for production.
+
+Pass `weights_path` (a local copy of the torchvision resnet18 checkpoint) to
+start without network access. Passing `model_path` (or `model_name`, resolved
+in `model_repository` like the ONNX backend) instead loads a TorchScript
+classifier exported by `export_and_triton.py` (FP32 or INT8, output `(N, 1)`
+sigmoid probabilities) and uses its output directly as the score.
+
+TorchScript models are frozen (weights folded into the graph as constants)
+and passed through `torch.jit.optimize_for_inference`, and inputs are fed in
+channels-last layout, which the CPU convolution kernels prefer. `num_threads`
+sets torch's intra-op thread count for the process.
 """
-from typing import List
+from pathlib import Path
+from typing import List, Tuple
 import torch
 import numpy as np
 
+from models.preprocessing import DetectorWarmupMixin, FramePreprocessor
+from models.repository import resolve_model_file
+
 
-class BaselineDetector:
-    def __init__(self, device: str | None = None):
+class BaselineDetector(DetectorWarmupMixin):
+    def __init__(
+        self,
+        device: str | None = None,
+        max_batch_size: int = 16,
+        model_path: str | Path | None = None,
+        weights_path: str | Path | None = None,
+        allow_download: bool = True,
+        model_repository: str | Path = "model_repository",
+        model_name: str | None = None,
+        version: int | None = None,
+        freeze: bool = True,
+        channels_last: bool = True,
+        num_threads: int | None = None,
+    ):
+        if num_threads:
+            torch.set_num_threads(int(num_threads))
+        if model_path is None and model_name is not None:
+            model_path = resolve_model_file(Path(model_repository), model_name, "model.pt", version)
         if device is None:
-            device = "cuda" if torch.cuda.is_available() else "cpu"
+            device = "cuda" if torch.cuda.is_available() and model_path is None else "cpu"
         self.device = torch.device(device)
+        # frames are stacked into (N, 3, 224, 224) chunks of at most this size
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.channels_last = channels_last
+        self.model = None
+        if model_path is not None:
+            self.model = self._load_torchscript(Path(model_path), freeze)
+        # resize + normalize + NCHW for a whole chunk at once
+        self.preprocessor = FramePreprocessor(size=224)
+        self.feature_extractor = None
+        if self.model is None:
+            self.feature_extractor = self._build_feature_extractor(weights_path, allow_download)
+            if self.feature_extractor is None:
+                print("Warning: no detector weights available; every frame scores a constant 0.1")
+
+    @property
+    def degraded(self) -> bool:
+        """True when no model could be loaded and scores are the constant fallback."""
+        return self.model is None and self.feature_extractor is None
+
+    def _build_feature_extractor(self, weights_path: str | Path | None, allow_download: bool):
         try:
             import torchvision.models as models
-            import torchvision.transforms as T
-
-            self.transforms = T.Compose([
-                T.ToPILImage(),
-                T.Resize((224, 224)),
-                T.ToTensor(),
-                T.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
-            ])
-            # load pretrained resnet18 and take features before final fc
-            resnet = models.resnet18(pretrained=True)
-            modules = list(resnet.children())[:-1]
-            self.feature_extractor = torch.nn.Sequential(*modules).to(self.device)
-            self.feature_extractor.eval()
-        except Exception:
+        except ImportError:
             # fallback to a tiny random model if torchvision not available
-            self.transforms = None
-            self.feature_extractor = None
+            return None
+
+        if weights_path is not None:
+            # local ImageNet resnet18 checkpoint; never touches the network
+            resnet = models.resnet18(weights=None)
+            state = torch.load(str(weights_path), map_location="cpu")
+            if isinstance(state, dict) and "state_dict" in state:
+                state = state["state_dict"]
+            resnet.load_state_dict(state)
+        elif allow_download:
+            try:
+                resnet = models.resnet18(pretrained=True)
+            except Exception:
+                # weights could not be fetched (offline); use fallback scores
+                return None
+        else:
+            return None
+
+        # take features before final fc
+        modules = list(resnet.children())[:-1]
+        feature_extractor = torch.nn.Sequential(*modules).to(self.device)
+        if self.channels_last:
+            feature_extractor = feature_extractor.to(memory_format=torch.channels_last)
+        feature_extractor.eval()
+        return feature_extractor
+
+    def _load_torchscript(self, model_path: Path, freeze: bool = True) -> torch.jit.ScriptModule:
+        if not model_path.exists():
+            raise FileNotFoundError(f"model file not found: {model_path}")
+        engines = torch.backends.quantized.supported_engines
+        # INT8 exports need a quantized CPU engine; harmless for FP32 models
+        for engine in ("x86", "fbgemm", "qnnpack"):
+            if engine in engines:
+                torch.backends.quantized.engine = engine
+                break
+        model = torch.jit.load(str(model_path), map_location=self.device)
+        model.eval()
+        if self.channels_last:
+            model = model.to(memory_format=torch.channels_last)
+        if not freeze:
+            return model
+        try:
+            model = torch.jit.freeze(model)
+        except Exception as e:
+            print(f"Warning: could not freeze {model_path}: {e}")
+            return model
+        try:
+            model = torch.jit.optimize_for_inference(model)
+        except Exception as e:
+            # e.g. quantized graphs the optimizer cannot rewrite; frozen is still fine
+            print(f"Warning: optimize_for_inference failed for {model_path}: {e}")
+        return model
 
     def _score_from_feature(self, feat: torch.Tensor) -> float:
+        return float(self._scores_from_features(feat)[0])
+
+    def _scores_from_features(self, feats: torch.Tensor) -> np.ndarray:
         # simple scoring heuristic: normalized L2 magnitude mapped to [0,1]
-        v = feat.detach().cpu().numpy().ravel()
-        mag = float(np.linalg.norm(v))
+        # feats shape: (N, C, 1, 1) -> one score per row
+        v = feats.detach().cpu().numpy().reshape(feats.shape[0], -1).astype(np.float64)
+        mag = np.linalg.norm(v, axis=1)
         # heuristic mapping
-        score = 1.0 / (1.0 + np.exp(-0.01 * (mag - 10.0)))
-        return float(score)
+        return 1.0 / (1.0 + np.exp(-0.01 * (mag - 10.0)))
+
+    def predict_frames(self, frames: List[np.ndarray], max_batch_size: int | None = None) -> List[float]:
+        return self.predict_frames_with_embeddings(frames, max_batch_size)[0]
 
-    def predict_frames(self, frames: List[np.ndarray]) -> List[float]:
+    def predict_frames_with_embeddings(
+        self, frames: List[np.ndarray], max_batch_size: int | None = None
+    ) -> Tuple[List[float], np.ndarray | None]:
+        """Scores plus the (N, 512) ResNet feature vectors (None for exported classifiers)."""
         out = []
-        if self.feature_extractor is None:
-            # fallback: return small random scores
+        if self.degraded:
+            # fallback: constant low scores
             for _ in frames:
                 out.append(0.1)
-            return out
+            return out, None
 
+        batch_size = max(1, int(max_batch_size or self.max_batch_size))
+        embeddings = []
         with torch.no_grad():
-            for f in frames:
-                arr = f.astype(np.uint8)
-                if self.transforms is not None:
-                    x = self.transforms(arr).unsqueeze(0).to(self.device)
-                else:
-                    # naive resize & normalize
-                    import cv2
-
-                    arr = cv2.resize(arr, (224, 224)).astype(np.float32) / 255.0
-                    x = torch.from_numpy(arr).permute(2, 0, 1).unsqueeze(0).to(self.device)
-                feat = self.feature_extractor(x)
-                # feat shape: (1, C, 1, 1)
-                s = self._score_from_feature(feat)
-                out.append(s)
-        return out
+            for start in range(0, len(frames), batch_size):
+                chunk = frames[start:start + batch_size]
+                x = torch.from_numpy(self.preprocessor(chunk)).to(self.device)
+                if self.channels_last:
+                    x = x.contiguous(memory_format=torch.channels_last)
+                if self.model is not None:
+                    # exported classifier: (N, 1) probabilities
+                    probs = self.model(x).reshape(len(chunk), -1)[:, 0]
+                    out.extend(float(p) for p in probs.cpu().numpy())
+                    continue
+                # one forward pass per chunk; feats shape: (N, C, 1, 1)
+                feats = self.feature_extractor(x)
+                out.extend(float(s) for s in self._scores_from_features(feats))
+                embeddings.append(feats.reshape(len(chunk), -1).cpu().numpy().astype(np.float32))
+        return out, (np.concatenate(embeddings) if embeddings else None)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,284 @@
+"""Two-stage cascade: a cheap triage score decides which frames need the full detector.
+
+`TriageScorer` computes a handful of colour and frequency statistics on a
+64x64 thumbnail (a few milliseconds for a 720p frame, mostly the resize) and
+maps them to a score with a logistic model. The model is distilled from the
+full detector: `fit` learns the weights from frames and the full detector's
+scores, `save`/`load` keep them as JSON. An unfitted scorer returns 0.5 for
+every frame.
+
+`CascadeDetector` wraps any detector. Frames whose triage score is below
+`low` (clearly benign) or above `high` (clearly suspicious) exit early with
+the triage score; only frames inside the `[low, high]` uncertainty band are
+sent to the wrapped detector, in one batch. `get_stats` reports the fraction
+of frames that skipped stage two.
+
+Fit the triage weights against the full detector on a folder of frames:
+  python -m models.cascade --frames-dir ../data/calibration_frames --output triage.json
+which also prints the skip fraction and early-exit error for the thresholds.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+FEATURE_NAMES = (
+    "gray_mean",
+    "gray_std",
+    "saturation_mean",
+    "saturation_std",
+    "colorfulness",
+    "laplacian_log_var",
+    "high_freq_ratio",
+    "edge_density",
+)
+
+
+def triage_features(frame: np.ndarray, size: int = 64) -> np.ndarray:
+    """Cheap colour/frequency statistics of an RGB (or gray) uint8 frame."""
+    import cv2
+
+    if frame.ndim == 2:
+        frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2RGB)
+    elif frame.shape[2] == 4:
+        frame = cv2.cvtColor(frame, cv2.COLOR_RGBA2RGB)
+    small = cv2.resize(frame, (size, size), interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(small, cv2.COLOR_RGB2GRAY).astype(np.float32)
+    sat = cv2.cvtColor(small, cv2.COLOR_RGB2HSV)[:, :, 1].astype(np.float32)
+
+    rgb = small.astype(np.float32)
+    rg = rgb[:, :, 0] - rgb[:, :, 1]
+    yb = 0.5 * (rgb[:, :, 0] + rgb[:, :, 1]) - rgb[:, :, 2]
+    colorfulness = np.hypot(rg.std(), yb.std()) + 0.3 * np.hypot(rg.mean(), yb.mean())
+
+    lap = cv2.Laplacian(gray, cv2.CV_32F)
+    residual = gray - cv2.GaussianBlur(gray, (5, 5), 0)
+    energy = float((gray - gray.mean()).var()) + 1e-6
+    gx = cv2.Sobel(gray, cv2.CV_32F, 1, 0)
+    gy = cv2.Sobel(gray, cv2.CV_32F, 0, 1)
+    edges = float((np.hypot(gx, gy) > 64.0).mean())
+
+    return np.array(
+        [
+            gray.mean() / 255.0,
+            gray.std() / 255.0,
+            sat.mean() / 255.0,
+            sat.std() / 255.0,
+            colorfulness / 255.0,
+            np.log1p(lap.var()),
+            float(residual.var()) / energy,
+            edges,
+        ],
+        dtype=np.float64,
+    )
+
+
+class TriageScorer:
+    def __init__(
+        self,
+        weights: Sequence[float] | None = None,
+        bias: float = 0.0,
+        mean: Sequence[float] | None = None,
+        std: Sequence[float] | None = None,
+    ):
+        n = len(FEATURE_NAMES)
+        self.weights = np.asarray(weights if weights is not None else np.zeros(n), dtype=np.float64)
+        self.bias = float(bias)
+        self.mean = np.asarray(mean if mean is not None else np.zeros(n), dtype=np.float64)
+        self.std = np.asarray(std if std is not None else np.ones(n), dtype=np.float64)
+
+    @property
+    def fitted(self) -> bool:
+        return bool(np.any(self.weights)) or self.bias != 0.0
+
+    def score_features(self, features: np.ndarray) -> np.ndarray:
+        z = ((features - self.mean) / self.std) @ self.weights + self.bias
+        return 1.0 / (1.0 + np.exp(-z))
+
+    def score(self, frames: Sequence[np.ndarray]) -> np.ndarray:
+        if not frames:
+            return np.zeros(0)
+        return self.score_features(np.stack([triage_features(f) for f in frames]))
+
+    @classmethod
+    def fit(
+        cls,
+        frames: Sequence[np.ndarray],
+        teacher_scores: Sequence[float],
+        l2: float = 1e-3,
+        iterations: int = 500,
+        learning_rate: float = 0.5,
+    ) -> "TriageScorer":
+        """Distill the full detector: logistic regression on its (soft) scores."""
+        x = np.stack([triage_features(f) for f in frames])
+        y = np.clip(np.asarray(teacher_scores, dtype=np.float64), 0.0, 1.0)
+        mean, std = x.mean(axis=0), x.std(axis=0) + 1e-6
+        xs = (x - mean) / std
+        w = np.zeros(xs.shape[1])
+        b = 0.0
+        for _ in range(iterations):
+            p = 1.0 / (1.0 + np.exp(-(xs @ w + b)))
+            err = p - y
+            w -= learning_rate * (xs.T @ err / len(y) + l2 * w)
+            b -= learning_rate * err.mean()
+        return cls(w, b, mean, std)
+
+    def save(self, path: Path | str):
+        Path(path).write_text(json.dumps({
+            "features": list(FEATURE_NAMES),
+            "weights": self.weights.tolist(),
+            "bias": self.bias,
+            "mean": self.mean.tolist(),
+            "std": self.std.tolist(),
+        }, indent=2))
+
+    @classmethod
+    def load(cls, path: Path | str) -> "TriageScorer":
+        data = json.loads(Path(path).read_text())
+        if data.get("features") != list(FEATURE_NAMES):
+            raise ValueError(f"triage weights in {path} were fitted on different features")
+        return cls(data["weights"], data["bias"], data["mean"], data["std"])
+
+
+class CascadeDetector:
+    def __init__(
+        self,
+        detector,
+        triage: TriageScorer | None = None,
+        low: float = 0.2,
+        high: float = 0.9,
+        triage_weights_path: Path | str | None = None,
+    ):
+        if not 0.0 <= low <= high <= 1.0:
+            raise ValueError(f"cascade thresholds must satisfy 0 <= low <= high <= 1, got {low}, {high}")
+        if triage is None:
+            triage = TriageScorer.load(triage_weights_path) if triage_weights_path else TriageScorer()
+        self.detector = detector
+        self.triage = triage
+        self.low = low
+        self.high = high
+        self._lock = threading.Lock()
+        self.frames = 0
+        self.exited_low = 0
+        self.exited_high = 0
+        self.stage2_frames = 0
+
+    @property
+    def degraded(self) -> bool:
+        return bool(getattr(self.detector, "degraded", False))
+
+    def warmup(self, batch_sizes: Sequence[int] = (1,)):
+        if hasattr(self.detector, "warmup"):
+            self.detector.warmup(batch_sizes)
+
+    def predict_frames(self, frames: List[np.ndarray], max_batch_size: int | None = None) -> List[float]:
+        return self.predict_frames_with_embeddings(frames, max_batch_size)[0]
+
+    def predict_frames_with_embeddings(
+        self, frames: List[np.ndarray], max_batch_size: int | None = None
+    ) -> Tuple[List[float], np.ndarray | None]:
+        """Scores for all frames; embedding rows of early-exit frames are zero."""
+        if not frames:
+            return [], None
+        scores = self.triage.score(frames)
+        uncertain = np.flatnonzero((scores >= self.low) & (scores <= self.high))
+        with self._lock:
+            self.frames += len(frames)
+            self.exited_low += int((scores < self.low).sum())
+            self.exited_high += int((scores > self.high).sum())
+            self.stage2_frames += len(uncertain)
+
+        out = [float(s) for s in scores]
+        embeddings = None
+        if len(uncertain):
+            subset = [frames[i] for i in uncertain]
+            # worker pools and remote backends take no max_batch_size
+            kwargs = {"max_batch_size": max_batch_size} if max_batch_size else {}
+            if hasattr(self.detector, "predict_frames_with_embeddings"):
+                full, sub_embeddings = self.detector.predict_frames_with_embeddings(subset, **kwargs)
+            else:
+                full, sub_embeddings = self.detector.predict_frames(subset, **kwargs), None
+            for i, s in zip(uncertain, full):
+                out[i] = float(s)
+            if sub_embeddings is not None:
+                embeddings = np.zeros((len(frames), sub_embeddings.shape[1]), dtype=np.float32)
+                embeddings[uncertain] = sub_embeddings
+        return out, embeddings
+
+    def get_stats(self) -> dict:
+        return {
+            "low": self.low,
+            "high": self.high,
+            "triage_fitted": self.triage.fitted,
+            "frames": self.frames,
+            "exited_low": self.exited_low,
+            "exited_high": self.exited_high,
+            "stage2_frames": self.stage2_frames,
+            "skip_fraction": round(1 - self.stage2_frames / self.frames, 4) if self.frames else None,
+        }
+
+    def close(self):
+        if hasattr(self.detector, "close"):
+            self.detector.close()
+
+
+def cascade_report(triage_scores: np.ndarray, full_scores: np.ndarray, low: float, high: float) -> dict:
+    """Skip fraction and early-exit error of a `[low, high]` band on scored frames."""
+    exits = (triage_scores < low) | (triage_scores > high)
+    errors = np.abs(triage_scores - full_scores)[exits]
+    # early exits whose full score lands on the other side of 0.5
+    flipped = ((triage_scores > 0.5) != (full_scores > 0.5))[exits]
+    return {
+        "low": low,
+        "high": high,
+        "frames": int(len(triage_scores)),
+        "skip_fraction": round(float(exits.mean()), 4) if len(exits) else None,
+        "exit_mean_abs_error": round(float(errors.mean()), 4) if len(errors) else None,
+        "exit_max_abs_error": round(float(errors.max()), 4) if len(errors) else None,
+        "exit_decision_flips": int(flipped.sum()),
+    }
+
+
+def main():
+    import cv2
+
+    from models.factory import create_detector
+
+    parser = argparse.ArgumentParser(description="Fit cascade triage weights against the full detector")
+    parser.add_argument("--frames-dir", required=True, help="folder of representative frames (jpg/png)")
+    parser.add_argument("--output", default="triage.json")
+    parser.add_argument("--backend", default="torch", help="full detector backend used as the teacher")
+    parser.add_argument("--model-path", default=None, help="TorchScript/ONNX model for the teacher")
+    parser.add_argument("--limit", type=int, default=2000)
+    parser.add_argument("--low", type=float, default=0.2)
+    parser.add_argument("--high", type=float, default=0.9)
+    args = parser.parse_args()
+
+    frames = []
+    for p in sorted(Path(args.frames_dir).rglob("*")):
+        if p.suffix.lower() not in (".jpg", ".jpeg", ".png", ".webp", ".bmp"):
+            continue
+        im = cv2.imread(str(p))
+        if im is not None:
+            frames.append(cv2.cvtColor(im, cv2.COLOR_BGR2RGB))
+        if len(frames) >= args.limit:
+            break
+    if not frames:
+        raise SystemExit(f"no images found in {args.frames_dir}")
+
+    options = {"model_path": args.model_path} if args.model_path else {}
+    teacher = create_detector(args.backend, **options)
+    full = np.asarray(teacher.predict_frames(frames))
+    triage = TriageScorer.fit(frames, full)
+    triage.save(args.output)
+    print(f"Saved triage weights for {len(frames)} frames to {args.output}")
+    print(json.dumps(cascade_report(triage.score(frames), full, args.low, args.high), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,18 +2,35 @@
 
 Usage examples:
   python export_and_triton.py --model-name deepfake_detector --output-dir model_repository --format both
+  python export_and_triton.py --quantize both --calibration-dir ../data/calibration_frames
 
 You can supply `--weights-url` to download a checkpoint (expects a PyTorch state_dict or checkpoint).
+
+`--quantize` additionally writes INT8 variants next to the FP32 models:
+  <model_name>_int8_<mode>/1/model.pt          (TorchScript, CPU only)
+  <model_name>_onnx_int8_<mode>/1/model.onnx   (ONNX Runtime)
+where <mode> is `dynamic` (weights only) or `static` (weights and activations,
+calibrated on the images in `--calibration-dir`). A `quantization_report.json`
+comparing score drift and per-batch latency against FP32 is written to the
+output directory.
 """
 from __future__ import annotations
 
 import argparse
+import inspect
+import json
 import os
+import statistics
 import tempfile
+import time
 from pathlib import Path
+import numpy as np
 import requests
 import torch
 
+QUANTIZE_MODES = ("dynamic", "static")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+
 
 def build_resnet_detector(device: torch.device = None) -> torch.nn.Module:
     import torchvision.models as models
@@ -44,15 +61,22 @@ def save_torchscript(model: torch.nn.Module, save_path: Path, device: torch.devi
 def save_onnx(model: torch.nn.Module, save_path: Path, device: torch.device):
     model.eval()
     example = torch.randn(1, 3, 224, 224, device=device)
+    kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        # keep the single-file TorchScript-based exporter; the dynamo exporter
+        # writes external data that the ONNX Runtime quantizer cannot read
+        kwargs["dynamo"] = False
     torch.onnx.export(
         model.to(device),
         example,
         str(save_path),
         export_params=True,
-        opset_version=11,
+        # 13 is the minimum for per-channel QDQ quantization
+        opset_version=13,
         input_names=["input"],
         output_names=["output"],
         dynamic_axes={"input": {0: "batch"}, "output": {0: "batch"}},
+        **kwargs,
     )
 
 
@@ -81,15 +105,24 @@ output [
     filename.write_text(cfg.strip() + "\n")
 
 
-def prepare_model_repo(model_name: str, output_dir: Path, save_torch: bool, save_onnx_flag: bool, device: torch.device):
+def prepare_model_repo(
+    model_name: str,
+    output_dir: Path,
+    save_torch: bool,
+    save_onnx_flag: bool,
+    device: torch.device,
+    model: torch.nn.Module | None = None,
+):
+    """Write the FP32 TorchScript and/or ONNX exports of `model` (built once if not given)."""
     output_dir.mkdir(parents=True, exist_ok=True)
+    if model is None:
+        model = build_resnet_detector(device=device)
     if save_torch:
         repo = output_dir / model_name
         model_version_dir = repo / "1"
         model_version_dir.mkdir(parents=True, exist_ok=True)
         pt_path = model_version_dir / "model.pt"
         print("Saving TorchScript to", pt_path)
-        model = build_resnet_detector(device=device)
         save_torchscript(model, pt_path, device)
         make_triton_config(model_name, "pytorch_libtorch", repo / "config.pbtxt")
 
@@ -99,11 +132,224 @@ def prepare_model_repo(model_name: str, output_dir: Path, save_torch: bool, save
         model_version_dir.mkdir(parents=True, exist_ok=True)
         onnx_path = model_version_dir / "model.onnx"
         print("Saving ONNX to", onnx_path)
-        model = build_resnet_detector(device=device)
         save_onnx(model, onnx_path, device)
         make_triton_config(model_name + "_onnx", "onnxruntime_onnx", repo / "config.pbtxt")
 
 
+def load_calibration_frames(calib_dir: Path, limit: int = 64) -> torch.Tensor:
+    """Read up to `limit` images from `calib_dir` as a normalized (N, 3, 224, 224) batch."""
+    import cv2
+
+    mean = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+    std = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+    frames = []
+    for p in sorted(Path(calib_dir).rglob("*")):
+        if p.suffix.lower() not in IMAGE_EXTENSIONS:
+            continue
+        im = cv2.imread(str(p))
+        if im is None:
+            continue
+        im = cv2.cvtColor(cv2.resize(im, (224, 224)), cv2.COLOR_BGR2RGB)
+        frames.append((im.astype(np.float32) / 255.0 - mean) / std)
+        if len(frames) >= limit:
+            break
+    if not frames:
+        raise ValueError(f"no calibration images found in {calib_dir}")
+    return torch.from_numpy(np.stack(frames).transpose(0, 3, 1, 2).copy())
+
+
+def _quantized_engine() -> str:
+    engines = torch.backends.quantized.supported_engines
+    engine = "x86" if "x86" in engines else ("fbgemm" if "fbgemm" in engines else "qnnpack")
+    torch.backends.quantized.engine = engine
+    return engine
+
+
+def quantize_torch_dynamic(model: torch.nn.Module) -> torch.nn.Module:
+    """INT8 dynamic quantization (weights only). Covers Linear layers; convs stay FP32."""
+    from torch.ao.quantization import quantize_dynamic
+
+    _quantized_engine()
+    return quantize_dynamic(model.cpu().eval(), {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def quantize_torch_static(model: torch.nn.Module, calib: torch.Tensor, batch_size: int = 8) -> torch.nn.Module:
+    """INT8 static post-training quantization (FX graph mode) calibrated on `calib`."""
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+    engine = _quantized_engine()
+    model = model.cpu().eval()
+    prepared = prepare_fx(model, get_default_qconfig_mapping(engine), (calib[:1],))
+    with torch.no_grad():
+        for start in range(0, len(calib), batch_size):
+            prepared(calib[start:start + batch_size])
+    return convert_fx(prepared)
+
+
+def quantize_onnx(fp32_path: Path, save_path: Path, mode: str, calib: torch.Tensor | None = None, batch_size: int = 8):
+    """Write an INT8 copy of an exported ONNX model with ONNX Runtime's quantizer."""
+    from onnxruntime.quantization import (
+        CalibrationDataReader,
+        QuantFormat,
+        QuantType,
+        quantize_dynamic,
+        quantize_static,
+    )
+
+    if mode == "dynamic":
+        quantize_dynamic(str(fp32_path), str(save_path), weight_type=QuantType.QInt8)
+        return
+
+    class _Reader(CalibrationDataReader):
+        def __init__(self):
+            arr = calib.numpy().astype(np.float32)
+            self._batches = iter([{"input": arr[i:i + batch_size]} for i in range(0, len(arr), batch_size)])
+
+        def get_next(self):
+            return next(self._batches, None)
+
+    quantize_static(
+        str(fp32_path),
+        str(save_path),
+        _Reader(),
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+    )
+
+
+def _benchmark(run, batch: torch.Tensor, batch_size: int, runs: int) -> tuple[np.ndarray, float]:
+    """Return (scores for `batch`, median latency in ms of one `batch_size` forward pass)."""
+    scores = np.concatenate([
+        np.asarray(run(batch[i:i + batch_size])).reshape(-1)
+        for i in range(0, len(batch), batch_size)
+    ])
+    timed = batch[:batch_size]
+    run(timed)  # warmup
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run(timed)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+    return scores, statistics.median(latencies)
+
+
+def _torch_runner(module):
+    def run(x):
+        with torch.no_grad():
+            return module(x).cpu().numpy()
+    return run
+
+
+def _onnx_runner(path: Path):
+    import onnxruntime as ort
+
+    session = ort.InferenceSession(str(path), providers=["CPUExecutionProvider"])
+    return lambda x: session.run(None, {"input": x.numpy()})[0]
+
+
+def prepare_quantized_repo(
+    model_name: str,
+    output_dir: Path,
+    save_torch: bool,
+    save_onnx_flag: bool,
+    modes: list[str],
+    calib: torch.Tensor | None,
+    model: torch.nn.Module,
+    batch_size: int = 8,
+    bench_runs: int = 10,
+) -> dict:
+    """Export INT8 variants of `model` and write `quantization_report.json` comparing them to FP32.
+
+    `model` must be the instance `prepare_model_repo` exported: the FP32
+    baselines in the report are the saved `model.pt` / `model.onnx` files,
+    loaded back from the repository. Quantized kernels are CPU-only, so all
+    variants are built and timed on CPU.
+    """
+    device = torch.device("cpu")
+    if "static" in modes and calib is None:
+        raise ValueError("static quantization needs --calibration-dir")
+    # evaluate drift on the calibration frames when available, else on a fixed random batch
+    if calib is not None:
+        eval_batch = calib
+    else:
+        eval_batch = torch.randn(2 * batch_size, 3, 224, 224, generator=torch.Generator().manual_seed(0))
+
+    fp32 = model.to(device).eval()
+    variants = []
+
+    def _record(name: str, fmt: str, mode: str, path: Path, run):
+        scores, latency = _benchmark(run, eval_batch, batch_size, bench_runs)
+        variants.append({
+            "name": name,
+            "format": fmt,
+            "quantization": mode,
+            "path": str(path),
+            "scores": scores,
+            "latency_ms_per_batch": round(latency, 3),
+            "frames_per_sec": round(batch_size * 1000.0 / latency, 2),
+        })
+
+    if save_torch:
+        fp32_path = output_dir / model_name / "1" / "model.pt"
+        if not fp32_path.exists():
+            raise FileNotFoundError(f"FP32 TorchScript export not found: {fp32_path}")
+        _record("torchscript_fp32", "torchscript", "none", fp32_path, _torch_runner(torch.jit.load(str(fp32_path))))
+        for mode in modes:
+            qmodel = quantize_torch_dynamic(fp32) if mode == "dynamic" else quantize_torch_static(fp32, calib, batch_size)
+            repo = output_dir / f"{model_name}_int8_{mode}"
+            (repo / "1").mkdir(parents=True, exist_ok=True)
+            pt_path = repo / "1" / "model.pt"
+            print("Saving INT8", mode, "TorchScript to", pt_path)
+            save_torchscript(qmodel, pt_path, device)
+            make_triton_config(repo.name, "pytorch_libtorch", repo / "config.pbtxt")
+            _record(f"torchscript_int8_{mode}", "torchscript", mode, pt_path, _torch_runner(torch.jit.load(str(pt_path))))
+
+    if save_onnx_flag:
+        fp32_path = output_dir / (model_name + "_onnx") / "1" / "model.onnx"
+        if not fp32_path.exists():
+            raise FileNotFoundError(f"FP32 ONNX export not found: {fp32_path}")
+        _record("onnx_fp32", "onnx", "none", fp32_path, _onnx_runner(fp32_path))
+        for mode in modes:
+            repo = output_dir / f"{model_name}_onnx_int8_{mode}"
+            (repo / "1").mkdir(parents=True, exist_ok=True)
+            onnx_path = repo / "1" / "model.onnx"
+            print("Saving INT8", mode, "ONNX to", onnx_path)
+            quantize_onnx(fp32_path, onnx_path, mode, calib, batch_size)
+            make_triton_config(repo.name, "onnxruntime_onnx", repo / "config.pbtxt")
+            _record(f"onnx_int8_{mode}", "onnx", mode, onnx_path, _onnx_runner(onnx_path))
+
+    # compare every variant with the FP32 model of the same format
+    baselines = {v["format"]: v for v in variants if v["quantization"] == "none"}
+    for v in variants:
+        ref = baselines[v["format"]]
+        drift = np.abs(v["scores"] - ref["scores"])
+        v["score_drift"] = {"mean_abs": round(float(drift.mean()), 6), "max_abs": round(float(drift.max()), 6)}
+        v["speedup_vs_fp32"] = round(ref["latency_ms_per_batch"] / v["latency_ms_per_batch"], 3)
+    for v in variants:
+        del v["scores"]
+
+    report = {
+        "model_name": model_name,
+        "eval_frames": len(eval_batch),
+        "eval_source": "calibration" if calib is not None else "random",
+        "batch_size": batch_size,
+        "bench_runs": bench_runs,
+        "threads": torch.get_num_threads(),
+        "variants": variants,
+    }
+    output_dir.mkdir(parents=True, exist_ok=True)
+    report_path = output_dir / "quantization_report.json"
+    report_path.write_text(json.dumps(report, indent=2) + "\n")
+    print("Wrote quantization report to", report_path)
+    for v in variants:
+        print(f"  {v['name']:<24} {v['latency_ms_per_batch']:>9.2f} ms/batch  "
+              f"x{v['speedup_vs_fp32']:<6} drift max {v['score_drift']['max_abs']}")
+    return report
+
+
 def try_load_weights(model: torch.nn.Module, ckpt_path: Path):
     # load a state_dict if possible
     try:
@@ -129,6 +375,13 @@ def main():
     parser.add_argument("--format", choices=["torchscript", "onnx", "both"], default="both")
     parser.add_argument("--device", default=None, help="cpu or cuda")
     parser.add_argument("--weights-url", default=None, help="optional URL to a PyTorch checkpoint (state_dict)")
+    parser.add_argument("--quantize", choices=["none", "dynamic", "static", "both"], default="none",
+                        help="also export INT8 variants and a quantization report")
+    parser.add_argument("--calibration-dir", type=Path, default=None,
+                        help="folder of frames used to calibrate static quantization")
+    parser.add_argument("--calibration-frames", type=int, default=64, help="max calibration images to read")
+    parser.add_argument("--bench-batch-size", type=int, default=8, help="batch size for the latency report")
+    parser.add_argument("--bench-runs", type=int, default=10, help="timed runs per variant")
     args = parser.parse_args()
 
     device = torch.device(args.device if args.device is not None else ("cuda" if torch.cuda.is_available() else "cpu"))
@@ -144,20 +397,29 @@ def main():
     save_torch_flag = args.format in ("torchscript", "both")
     save_onnx_flag = args.format in ("onnx", "both")
 
-    # If a specific weights file was downloaded, pass to loader function
-    # Our simple builder uses torchvision resnet; to apply checkpoint, we build model and then try load weights
+    # One model instance for every export, so FP32 and INT8 variants share weights
+    model = build_resnet_detector(device=device)
     if tmp_ckpt is not None:
-        global build_resnet_detector
-        m = build_resnet_detector(device=device)
-        try_load_weights(m, tmp_ckpt)
-        # save modified model into a temporary place and export from it
-        # overwrite the builder functions to return our loaded model
-        def _loaded_builder(device: torch.device = None):
-            return m
+        try_load_weights(model, tmp_ckpt)
 
-        build_resnet_detector = _loaded_builder
+    prepare_model_repo(args.model_name, args.output_dir, save_torch_flag, save_onnx_flag, device, model=model)
 
-    prepare_model_repo(args.model_name, args.output_dir, save_torch_flag, save_onnx_flag, device)
+    if args.quantize != "none":
+        modes = list(QUANTIZE_MODES) if args.quantize == "both" else [args.quantize]
+        calib = None
+        if args.calibration_dir is not None:
+            calib = load_calibration_frames(args.calibration_dir, args.calibration_frames)
+        prepare_quantized_repo(
+            args.model_name,
+            args.output_dir,
+            save_torch_flag,
+            save_onnx_flag,
+            modes,
+            calib,
+            model,
+            batch_size=args.bench_batch_size,
+            bench_runs=args.bench_runs,
+        )
 
 
 if __name__ == "__main__":
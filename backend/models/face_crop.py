@@ -0,0 +1,241 @@
+"""Face-region crop stage: score the faces in a frame instead of the whole frame.
+
+`FaceCropper` finds faces on a downscaled grayscale copy of each frame and
+cuts square, padded crops out of the full-resolution frame, so small faces
+reach the model at full detail instead of being blurred by the 224x224
+resize of a wide shot. Two OpenCV detectors are supported:
+
+- `haar` — the frontal-face Haar cascade bundled with OpenCV 4.x
+  (`cv2.CascadeClassifier`; removed from OpenCV 5 core)
+- `yunet` — the YuNet DNN (`cv2.FaceDetectorYN`), more accurate, needs the
+  `face_detection_yunet_*.onnx` model from the OpenCV model zoo
+
+`FaceCropDetector` wraps any detector: the crops of a whole batch of frames
+go through it in one call and a frame's score is the highest score among its
+faces. Frames without a face are either scored whole on a downsampled copy
+(`no_face="downsample"`) or skipped with `no_face_score`.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Sequence, Tuple
+
+import numpy as np
+
+FACE_DETECTORS = ("auto", "haar", "yunet")
+NO_FACE_MODES = ("downsample", "skip")
+
+# (x, y, w, h) in pixels of the frame the detector was given
+Box = Tuple[int, int, int, int]
+
+
+def _haar_detector(min_face: int) -> Callable[[np.ndarray], List[Box]]:
+    import cv2
+
+    if not hasattr(cv2, "CascadeClassifier"):
+        raise RuntimeError("this OpenCV build has no Haar cascades (OpenCV 5+); use the yunet face detector")
+    cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+    if cascade.empty():
+        raise RuntimeError("could not load haarcascade_frontalface_default.xml")
+    lock = threading.Lock()
+
+    def detect(img: np.ndarray) -> List[Box]:
+        gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY) if img.ndim == 3 else img
+        with lock:  # CascadeClassifier is not thread-safe
+            faces = cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(min_face, min_face))
+        return [tuple(int(v) for v in f) for f in faces]
+
+    return detect
+
+
+def _yunet_detector(model_path: Path | str, score_threshold: float) -> Callable[[np.ndarray], List[Box]]:
+    import cv2
+
+    if not Path(model_path).exists():
+        raise FileNotFoundError(f"face detector model not found: {model_path}")
+    net = cv2.FaceDetectorYN.create(str(model_path), "", (320, 320), score_threshold)
+    lock = threading.Lock()
+
+    def detect(img: np.ndarray) -> List[Box]:
+        bgr = cv2.cvtColor(img, cv2.COLOR_RGB2BGR) if img.ndim == 3 else cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+        with lock:
+            net.setInputSize((bgr.shape[1], bgr.shape[0]))
+            _, faces = net.detect(bgr)
+        if faces is None:
+            return []
+        return [tuple(int(v) for v in f[:4]) for f in faces]
+
+    return detect
+
+
+class FaceCropper:
+    def __init__(
+        self,
+        method: str = "auto",
+        model_path: Path | str | None = None,
+        detect_width: int = 320,
+        padding: float = 0.3,
+        min_face: int = 20,
+        max_faces: int = 4,
+        score_threshold: float = 0.7,
+        detect_fn: Callable[[np.ndarray], List[Box]] | None = None,
+    ):
+        if method not in FACE_DETECTORS:
+            raise ValueError(f"Invalid face detector: {method}")
+        if detect_fn is None:
+            if method == "yunet" or (method == "auto" and model_path):
+                if not model_path:
+                    raise ValueError("the yunet face detector needs model_path")
+                detect_fn = _yunet_detector(model_path, score_threshold)
+            else:
+                detect_fn = _haar_detector(min_face)
+        self.detect_fn = detect_fn
+        self.detect_width = int(detect_width)
+        self.padding = float(padding)
+        self.min_face = int(min_face)
+        self.max_faces = max(1, int(max_faces))
+
+    def detect(self, frame: np.ndarray) -> List[Box]:
+        """Face boxes in full-resolution pixel coordinates, largest first."""
+        import cv2
+
+        h, w = frame.shape[:2]
+        scale = min(1.0, self.detect_width / float(w))
+        small = frame if scale == 1.0 else cv2.resize(
+            frame, (self.detect_width, max(1, int(round(h * scale)))), interpolation=cv2.INTER_AREA
+        )
+        boxes = [
+            (int(x / scale), int(y / scale), int(bw / scale), int(bh / scale))
+            for x, y, bw, bh in self.detect_fn(small)
+        ]
+        boxes = [b for b in boxes if min(b[2], b[3]) >= self.min_face]
+        boxes.sort(key=lambda b: b[2] * b[3], reverse=True)
+        return boxes[:self.max_faces]
+
+    def crop(self, frame: np.ndarray, box: Box) -> np.ndarray:
+        """Square crop around `box`, padded by `padding` of its size and clamped to the frame."""
+        h, w = frame.shape[:2]
+        x, y, bw, bh = box
+        side = int(max(bw, bh) * (1.0 + 2.0 * self.padding))
+        side = min(side, w, h)
+        cx, cy = x + bw // 2, y + bh // 2
+        x0 = min(max(0, cx - side // 2), w - side)
+        y0 = min(max(0, cy - side // 2), h - side)
+        return np.ascontiguousarray(frame[y0:y0 + side, x0:x0 + side])
+
+    def __call__(self, frame: np.ndarray) -> List[np.ndarray]:
+        return [self.crop(frame, box) for box in self.detect(frame)]
+
+
+class FaceCropDetector:
+    def __init__(
+        self,
+        detector,
+        cropper: FaceCropper | None = None,
+        no_face: str = "downsample",
+        no_face_score: float = 0.0,
+        downsample_size: int = 224,
+        **cropper_options,
+    ):
+        if no_face not in NO_FACE_MODES:
+            raise ValueError(f"Invalid no-face mode: {no_face}")
+        self.detector = detector
+        self.cropper = cropper or FaceCropper(**cropper_options)
+        self.no_face = no_face
+        self.no_face_score = float(no_face_score)
+        self.downsample_size = int(downsample_size)
+        self._lock = threading.Lock()
+        self.frames = 0
+        self.frames_with_faces = 0
+        self.faces = 0
+        self.skipped_frames = 0
+        self.detect_seconds = 0.0
+
+    @property
+    def degraded(self) -> bool:
+        return bool(getattr(self.detector, "degraded", False))
+
+    def warmup(self, batch_sizes: Sequence[int] = (1,)):
+        if hasattr(self.detector, "warmup"):
+            self.detector.warmup(batch_sizes)
+
+    def _downsample(self, frame: np.ndarray) -> np.ndarray:
+        import cv2
+
+        h, w = frame.shape[:2]
+        scale = self.downsample_size / float(min(h, w))
+        if scale >= 1.0:
+            return frame
+        return cv2.resize(frame, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+
+    def predict_frames(self, frames: List[np.ndarray], max_batch_size: int | None = None) -> List[float]:
+        return self.predict_frames_with_embeddings(frames, max_batch_size)[0]
+
+    def predict_frames_with_embeddings(
+        self, frames: List[np.ndarray], max_batch_size: int | None = None
+    ) -> Tuple[List[float], np.ndarray | None]:
+        """Per-frame max over face scores; the embedding is that of the top-scoring face."""
+        if not frames:
+            return [], None
+        started = time.perf_counter()
+        inputs: List[np.ndarray] = []
+        # owner[i] = frame index of inputs[i]
+        owner: List[int] = []
+        n_faces = skipped = with_faces = 0
+        for i, frame in enumerate(frames):
+            crops = self.cropper(frame)
+            if crops:
+                with_faces += 1
+                n_faces += len(crops)
+                inputs.extend(crops)
+                owner.extend([i] * len(crops))
+            elif self.no_face == "downsample":
+                inputs.append(self._downsample(frame))
+                owner.append(i)
+            else:
+                skipped += 1
+        with self._lock:
+            self.detect_seconds += time.perf_counter() - started
+            self.frames += len(frames)
+            self.frames_with_faces += with_faces
+            self.faces += n_faces
+            self.skipped_frames += skipped
+
+        out = [self.no_face_score] * len(frames)
+        if not inputs:
+            return out, None
+        # worker pools and remote backends take no max_batch_size
+        kwargs = {"max_batch_size": max_batch_size} if max_batch_size else {}
+        if hasattr(self.detector, "predict_frames_with_embeddings"):
+            scores, input_embeddings = self.detector.predict_frames_with_embeddings(inputs, **kwargs)
+        else:
+            scores, input_embeddings = self.detector.predict_frames(inputs, **kwargs), None
+
+        best = {}
+        for j, (i, s) in enumerate(zip(owner, scores)):
+            if i not in best or s > scores[best[i]]:
+                best[i] = j
+        embeddings = None
+        if input_embeddings is not None:
+            embeddings = np.zeros((len(frames), input_embeddings.shape[1]), dtype=np.float32)
+        for i, j in best.items():
+            out[i] = float(scores[j])
+            if embeddings is not None:
+                embeddings[i] = input_embeddings[j]
+        return out, embeddings
+
+    def get_stats(self) -> dict:
+        return {
+            "no_face": self.no_face,
+            "frames": self.frames,
+            "frames_with_faces": self.frames_with_faces,
+            "faces": self.faces,
+            "skipped_frames": self.skipped_frames,
+            "detect_ms_per_frame": round(self.detect_seconds * 1000 / self.frames, 3) if self.frames else None,
+        }
+
+    def close(self):
+        if hasattr(self.detector, "close"):
+            self.detector.close()
@@ -0,0 +1,26 @@
+"""Select a detector backend by name.
+
+All backends expose `predict_frames(frames, max_batch_size=None) -> list[float]`.
+Backend modules are imported lazily so optional runtimes (e.g. onnxruntime)
+are only required when selected.
+"""
+from __future__ import annotations
+
+DETECTOR_BACKENDS = ("torch", "onnx", "triton")
+
+
+def create_detector(backend: str = "torch", **options):
+    """Build the detector for `backend`, passing `options` to its constructor."""
+    if backend == "torch":
+        from models.baseline import BaselineDetector
+
+        return BaselineDetector(**options)
+    if backend == "onnx":
+        from models.onnx_detector import OnnxDetector
+
+        return OnnxDetector(**options)
+    if backend == "triton":
+        from models.triton_detector import TritonDetector
+
+        return TritonDetector(**options)
+    raise ValueError(f"Unknown detector backend: {backend!r} (expected one of {DETECTOR_BACKENDS})")
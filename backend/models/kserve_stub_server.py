@@ -0,0 +1,131 @@
+"""Local stand-in for a Triton server, for running the `triton` backend offline.
+
+Implements the subset of the KServe v2 HTTP protocol the API uses (health,
+model readiness and `infer` with JSON or binary tensors) on top of a model
+repository written by `export_and_triton.py`. Models are loaded on first use
+from `<repo>/<name>/<version>/model.onnx` (ONNX Runtime) or `model.pt`
+(TorchScript); the latest version is served unless the URL names one.
+Loading and inference run in worker threads, so the event loop keeps serving.
+
+Usage:
+  python -m models.kserve_stub_server --model-repository model_repository --port 8080
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import threading
+from pathlib import Path
+
+import numpy as np
+from fastapi import FastAPI, HTTPException, Request, Response
+
+from models.repository import list_versions
+from models.triton_detector import INFERENCE_HEADER, decode_tensors, encode_tensors, split_body
+
+
+class _OnnxModel:
+    def __init__(self, path: Path):
+        import onnxruntime as ort
+
+        self.session = ort.InferenceSession(str(path), providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.output_names = [o.name for o in self.session.get_outputs()]
+
+    def __call__(self, inputs: dict) -> dict:
+        feeds = {name: inputs[name] for name in self.input_names}
+        return dict(zip(self.output_names, self.session.run(None, feeds)))
+
+
+class _TorchScriptModel:
+    # names used by export_and_triton's config.pbtxt
+    input_names = ["input"]
+    output_names = ["output"]
+
+    def __init__(self, path: Path):
+        import torch
+
+        self.torch = torch
+        self.module = torch.jit.load(str(path), map_location="cpu").eval()
+
+    def __call__(self, inputs: dict) -> dict:
+        with self.torch.no_grad():
+            out = self.module(self.torch.from_numpy(np.array(inputs["input"])))
+        return {"output": out.numpy()}
+
+
+def _load_model(version_dir: Path):
+    if (version_dir / "model.onnx").exists():
+        return _OnnxModel(version_dir / "model.onnx")
+    if (version_dir / "model.pt").exists():
+        return _TorchScriptModel(version_dir / "model.pt")
+    raise FileNotFoundError(f"no model.onnx or model.pt in {version_dir}")
+
+
+def create_app(model_repository: Path | str) -> FastAPI:
+    repo = Path(model_repository)
+    app = FastAPI(title="KServe v2 stub server")
+    models: dict = {}
+    lock = threading.Lock()
+
+    def get_model(name: str, version: int | None):
+        versions = list_versions(repo, name)
+        if version is None and versions:
+            version = versions[-1]
+        if version not in versions:
+            raise HTTPException(status_code=404, detail=f"model {name!r} version {version} not found")
+        with lock:
+            if (name, version) not in models:
+                models[(name, version)] = _load_model(repo / name / str(version))
+            return models[(name, version)]
+
+    @app.get("/v2/health/live")
+    @app.get("/v2/health/ready")
+    async def health():
+        return {}
+
+    @app.get("/v2/models/{name}/ready")
+    @app.get("/v2/models/{name}/versions/{version}/ready")
+    async def model_ready(name: str, version: int | None = None):
+        await asyncio.to_thread(get_model, name, version)
+        return {}
+
+    @app.post("/v2/models/{name}/infer")
+    @app.post("/v2/models/{name}/versions/{version}/infer")
+    async def infer(name: str, request: Request, version: int | None = None):
+        model = await asyncio.to_thread(get_model, name, version)
+        header_length = request.headers.get(INFERENCE_HEADER)
+        try:
+            header, blob = split_body(await request.body(), int(header_length) if header_length is not None else None)
+            outputs = await asyncio.to_thread(model, decode_tensors("inputs", header, blob))
+        except (KeyError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=f"bad inference request: {e}")
+
+        requested = header.get("outputs") or []
+        binary = any((o.get("parameters") or {}).get("binary_data") for o in requested)
+        names = [o["name"] for o in requested] or list(outputs)
+        encoded, headers = encode_tensors(
+            "outputs",
+            [(n, np.asarray(outputs[n], dtype=np.float32)) for n in names],
+            binary,
+            extra={"model_name": name, "model_version": str(version) if version is not None else None},
+        )
+        return Response(content=encoded, headers=headers)
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-repository", default="model_repository")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    uvicorn.run(create_app(args.model_repository), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""ONNX Runtime detector backend.
+
+Loads the `model.onnx` written by `export_and_triton.py` (dynamic batch axis,
+sigmoid output) from the model repository layout and serves it on CPU with
+ONNX Runtime. Exposes the same `predict_frames` interface as `BaselineDetector`
+so the API can switch backends through configuration.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+from models.preprocessing import DetectorWarmupMixin, FramePreprocessor
+from models.repository import resolve_model_file
+
+GRAPH_OPTIMIZATION_LEVELS = ("disable", "basic", "extended", "all")
+
+
+class OnnxDetector(DetectorWarmupMixin):
+    def __init__(
+        self,
+        model_repository: Path | str = "model_repository",
+        model_name: str = "deepfake_detector_onnx",
+        version: int | None = None,
+        model_path: Path | str | None = None,
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 0,
+        graph_optimization_level: str = "all",
+        max_batch_size: int = 16,
+    ):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise RuntimeError("onnxruntime is required for the onnx detector backend") from e
+
+        if graph_optimization_level not in GRAPH_OPTIMIZATION_LEVELS:
+            raise ValueError(f"Invalid graph optimization level: {graph_optimization_level}")
+
+        if model_path is None:
+            model_path = resolve_model_file(Path(model_repository), model_name, "model.onnx", version)
+        self.model_path = Path(model_path)
+        self.max_batch_size = max(1, int(max_batch_size))
+
+        opts = ort.SessionOptions()
+        # 0 lets ONNX Runtime pick based on available cores
+        opts.intra_op_num_threads = int(intra_op_threads)
+        opts.inter_op_num_threads = int(inter_op_threads)
+        opts.graph_optimization_level = {
+            "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+            "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+            "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+            "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+        }[graph_optimization_level]
+
+        self.session = ort.InferenceSession(
+            str(self.model_path), sess_options=opts, providers=["CPUExecutionProvider"]
+        )
+        self.input_name = self.session.get_inputs()[0].name
+        self.preprocessor = FramePreprocessor(size=224)
+
+    def predict_frames(self, frames: List[np.ndarray], max_batch_size: int | None = None) -> List[float]:
+        out: List[float] = []
+        batch_size = max(1, int(max_batch_size or self.max_batch_size))
+        for start in range(0, len(frames), batch_size):
+            x = self.preprocessor(frames[start:start + batch_size])
+            # output shape: (N, 1) sigmoid probabilities
+            probs = self.session.run(None, {self.input_name: x})[0]
+            out.extend(float(p) for p in np.asarray(probs).reshape(len(x), -1)[:, 0])
+        return out
+
+    def predict_frames_with_embeddings(
+        self, frames: List[np.ndarray], max_batch_size: int | None = None
+    ) -> Tuple[List[float], None]:
+        # the exported graph ends in the classifier head; no embeddings to expose
+        return self.predict_frames(frames, max_batch_size), None
@@ -0,0 +1,38 @@
+"""Helpers for reading the Triton-style model repository written by `export_and_triton.py`.
+
+Layout::
+
+  model_repository/
+    <model_name>/
+      config.pbtxt
+      <version>/model.pt | model.onnx
+"""
+from __future__ import annotations
+
+from pathlib import Path
+
+
+def list_versions(model_repository: Path, model_name: str) -> list[int]:
+    """Return the numeric version directories of `model_name`, oldest first."""
+    repo = Path(model_repository) / model_name
+    if not repo.is_dir():
+        return []
+    return sorted(int(p.name) for p in repo.iterdir() if p.is_dir() and p.name.isdigit())
+
+
+def resolve_model_file(
+    model_repository: Path,
+    model_name: str,
+    filename: str,
+    version: int | None = None,
+) -> Path:
+    """Locate `<repo>/<model_name>/<version>/<filename>`; latest version if none given."""
+    if version is None:
+        versions = list_versions(model_repository, model_name)
+        if not versions:
+            raise FileNotFoundError(f"no versions of {model_name!r} under {model_repository}")
+        version = versions[-1]
+    path = Path(model_repository) / model_name / str(version) / filename
+    if not path.exists():
+        raise FileNotFoundError(f"model file not found: {path}")
+    return path
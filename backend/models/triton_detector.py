@@ -0,0 +1,184 @@
+"""Remote detector backend speaking the KServe v2 (Triton) HTTP protocol.
+
+Frames are preprocessed locally into the `(N, 3, 224, 224)` FP32 tensor the
+exported models take and sent to `/v2/models/<name>[/versions/<v>]/infer`
+using the binary tensor extension: a JSON header followed by the raw tensor
+bytes (`Inference-Header-Content-Length` gives the header size), which avoids
+encoding every pixel as a JSON number. Batches are capped at
+`max_batch_size` (the `max_batch_size` of the model's `config.pbtxt`).
+
+Requests share one pooled `httpx.Client`. Connection errors, timeouts and
+429/5xx responses are retried `retries` times with exponential backoff;
+other errors are raised immediately.
+"""
+from __future__ import annotations
+
+import json
+import time
+from typing import List, Sequence, Tuple
+
+import httpx
+import numpy as np
+
+from models.preprocessing import DetectorWarmupMixin, FramePreprocessor
+
+INFERENCE_HEADER = "Inference-Header-Content-Length"
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# KServe v2 datatype <-> numpy dtype
+DATATYPES = {
+    "FP32": np.float32,
+    "FP16": np.float16,
+    "FP64": np.float64,
+    "INT64": np.int64,
+    "INT32": np.int32,
+    "UINT8": np.uint8,
+    "BOOL": np.bool_,
+}
+
+
+def encode_tensors(
+    key: str,
+    tensors: Sequence[Tuple[str, np.ndarray]],
+    binary: bool = True,
+    extra: dict | None = None,
+) -> Tuple[bytes, dict]:
+    """Body and headers of a v2 message listing `tensors` under `key` ("inputs"/"outputs").
+
+    With `binary` the tensor bytes follow the JSON header instead of being
+    inlined as `data`. `extra` adds fields to the JSON header.
+    """
+    dtype_names = {np.dtype(v): k for k, v in DATATYPES.items()}
+    header = dict(extra or {})
+    header[key] = []
+    blobs = []
+    for name, array in tensors:
+        array = np.ascontiguousarray(array)
+        entry = {"name": name, "shape": list(array.shape), "datatype": dtype_names[array.dtype]}
+        if binary:
+            entry["parameters"] = {"binary_data_size": array.nbytes}
+            blobs.append(array.tobytes())
+        else:
+            entry["data"] = array.ravel().tolist()
+        header[key].append(entry)
+    head = json.dumps(header).encode()
+    if not binary:
+        return head, {"Content-Type": "application/json"}
+    return head + b"".join(blobs), {
+        "Content-Type": "application/octet-stream",
+        INFERENCE_HEADER: str(len(head)),
+    }
+
+
+def split_body(body: bytes, header_length: int | None) -> Tuple[dict, bytes]:
+    """JSON header and trailing binary section of a v2 message."""
+    if header_length is None:
+        return json.loads(body), b""
+    return json.loads(body[:header_length]), body[header_length:]
+
+
+def decode_tensors(key: str, header: dict, blob: bytes) -> dict:
+    """`{name: array}` for the tensors listed under `key` of a split v2 message."""
+    tensors = {}
+    offset = 0
+    for entry in header.get(key, []):
+        dtype = DATATYPES[entry["datatype"]]
+        size = (entry.get("parameters") or {}).get("binary_data_size")
+        if size is not None:
+            data = np.frombuffer(blob, dtype=dtype, count=size // np.dtype(dtype).itemsize, offset=offset)
+            offset += size
+        else:
+            data = np.asarray(entry["data"], dtype=dtype)
+        tensors[entry["name"]] = data.reshape(entry["shape"])
+    return tensors
+
+
+class TritonDetector(DetectorWarmupMixin):
+    def __init__(
+        self,
+        url: str = "http://localhost:8080",
+        model_name: str = "deepfake_detector_onnx",
+        version: int | None = None,
+        input_name: str = "input",
+        output_name: str = "output",
+        max_batch_size: int = 8,
+        timeout: float = 30.0,
+        retries: int = 2,
+        backoff: float = 0.2,
+        binary: bool = True,
+        max_connections: int = 16,
+        client: httpx.Client | None = None,
+    ):
+        self.model_name = model_name
+        self.version = version
+        self.input_name = input_name
+        self.output_name = output_name
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.retries = max(0, int(retries))
+        self.backoff = backoff
+        self.binary = binary
+        self._owns_client = client is None
+        self.client = client or httpx.Client(
+            base_url=url,
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0)),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+        self.preprocessor = FramePreprocessor(size=224)
+
+    @property
+    def model_endpoint(self) -> str:
+        path = f"/v2/models/{self.model_name}"
+        if self.version is not None:
+            path += f"/versions/{self.version}"
+        return path
+
+    def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.client.request(method, path, **kwargs)
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.retries:
+                    response.raise_for_status()
+                    return response
+            except httpx.TransportError:
+                if attempt == self.retries:
+                    raise
+            time.sleep(self.backoff * (2 ** attempt))
+        raise AssertionError("unreachable")
+
+    def is_ready(self) -> bool:
+        try:
+            return self.client.get(f"{self.model_endpoint}/ready").status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    def _infer(self, x: np.ndarray) -> np.ndarray:
+        body, headers = encode_tensors(
+            "inputs",
+            [(self.input_name, x)],
+            self.binary,
+            extra={"outputs": [{"name": self.output_name, "parameters": {"binary_data": self.binary}}]},
+        )
+        response = self._request("POST", f"{self.model_endpoint}/infer", content=body, headers=headers)
+        header_length = response.headers.get(INFERENCE_HEADER)
+        header, blob = split_body(response.content, int(header_length) if header_length is not None else None)
+        return decode_tensors("outputs", header, blob)[self.output_name]
+
+    def predict_frames(self, frames: List[np.ndarray], max_batch_size: int | None = None) -> List[float]:
+        out: List[float] = []
+        batch_size = min(self.max_batch_size, max(1, int(max_batch_size or self.max_batch_size)))
+        for start in range(0, len(frames), batch_size):
+            x = self.preprocessor(frames[start:start + batch_size])
+            # output shape: (N, 1) sigmoid probabilities
+            probs = self._infer(x)
+            out.extend(float(p) for p in np.asarray(probs).reshape(len(x), -1)[:, 0])
+        return out
+
+    def predict_frames_with_embeddings(
+        self, frames: List[np.ndarray], max_batch_size: int | None = None
+    ) -> Tuple[List[float], None]:
+        # served models end in the classifier head; no embeddings to expose
+        return self.predict_frames(frames, max_batch_size), None
+
+    def close(self):
+        if self._owns_client:
+            self.client.close()
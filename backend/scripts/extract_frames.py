@@ -2,57 +2,303 @@
 
 Requires `yt-dlp` and `opencv-python`.
 
+`iter_frames` decodes frames in-process and yields them as RGB numpy arrays;
+the API scores those directly (`video_frames_from_url`), while the CLI below
+writes them out as JPEGs.
+
+`stream_frames` skips the download-then-decode round trip: yt-dlp fetches a
+low-resolution, video-only format to stdout, the bytes are piped through a
+FIFO into OpenCV, and frames are yielded while the download is still running.
+Once enough frames are sampled the download is killed.
+
 Usage:
   python extract_frames.py <video_url> <out_dir> [--frames N]
 """
 import sys
+import glob
+import time
 from pathlib import Path
+from typing import Iterator, List
 import subprocess
 import tempfile
 import shutil
 import math
 import os
+import threading
 import cv2
+import numpy as np
+
+
+DEFAULT_FORMAT = "bestvideo[ext=mp4]+bestaudio[ext=m4a]/mp4/best"
+
+
+def low_res_format(max_height: int = 360) -> str:
+    """yt-dlp format selector: best video-only stream up to `max_height`, else the smallest one.
+
+    The detector sees 224x224 frames, so anything above ~360p is wasted bandwidth.
+    """
+    return f"bv[height<={max_height}]/wv/w"
+
+
+class VideoTooLarge(RuntimeError):
+    """The video is bigger than the download's `max_bytes`."""
+
+
+def _written_bytes(tmp: Path) -> int:
+    # yt-dlp writes `<tmp>.part`, or per-format `<stem>.f<id>.<ext>.part` files before merging
+    total = 0
+    for name in glob.glob(glob.escape(str(tmp.with_suffix(""))) + "*"):
+        try:
+            total += os.path.getsize(name)
+        except OSError:
+            pass  # renamed or removed meanwhile
+    return total
+
+
+def _run_capped(cmd: List[str], tmp: Path, max_bytes: int, poll_interval: float = 0.5):
+    """Run the downloader, killing it once its files grow past `max_bytes`.
+
+    `--max-filesize` only rejects formats whose size is known up front; this
+    also stops downloads of unknown length.
+    """
+    proc = subprocess.Popen(cmd)
+    try:
+        while proc.poll() is None:
+            if _written_bytes(tmp) > max_bytes:
+                proc.kill()
+                proc.wait()
+                for name in glob.glob(glob.escape(str(tmp.with_suffix(""))) + "*"):
+                    Path(name).unlink(missing_ok=True)
+                raise VideoTooLarge(f"video exceeds the {max_bytes} byte limit")
+            time.sleep(poll_interval)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
 
 
-def download_video(url: str, out_path: Path) -> Path:
+def download_video(url: str, out_path: Path, fmt: str = DEFAULT_FORMAT, max_bytes: int | None = None) -> Path:
+    """Download `url` to `out_path`; raises `VideoTooLarge` past `max_bytes` (None = no cap)."""
     out_path.parent.mkdir(parents=True, exist_ok=True)
     tmp = out_path.with_suffix(".tmp.mp4")
     cmd = [
         "yt-dlp",
         "-f",
-        "bestvideo[ext=mp4]+bestaudio[ext=m4a]/mp4/best",
+        fmt,
         "-o",
         str(tmp),
         url,
     ]
-    subprocess.check_call(cmd)
+    if not max_bytes:
+        subprocess.check_call(cmd)
+    else:
+        cmd[1:1] = ["--max-filesize", str(int(max_bytes))]
+        _run_capped(cmd, tmp, int(max_bytes))
+        if not tmp.exists():
+            # yt-dlp skips formats over --max-filesize and still exits 0
+            raise VideoTooLarge(f"video exceeds the {max_bytes} byte limit")
     tmp.rename(out_path)
     return out_path
 
 
-def extract_frames(video_path: Path, out_dir: Path, n_frames: int = 8):
-    out_dir.mkdir(parents=True, exist_ok=True)
-    cap = cv2.VideoCapture(str(video_path))
-    if not cap.isOpened():
-        raise RuntimeError("cannot open video")
-    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+SAMPLING_MODES = ("auto", "seek", "sequential")
+# A random seek decodes from the preceding keyframe; typical GOPs are 1-4 s,
+# so one seek costs roughly this much video worth of decoding.
+SEEK_COST_SECONDS = 2.0
+# CAP_PROP_FRAME_COUNT beyond this length is treated as bogus metadata
+MAX_PLAUSIBLE_SECONDS = 24 * 3600
+
+
+def choose_sampling_mode(frame_count: int, fps: float, n_frames: int) -> str:
+    """`sequential` when decoding the whole video is cheaper than `n_frames` seeks, else `seek`.
+
+    An unknown frame count (<= 0) always reads sequentially.
+    """
     if frame_count <= 0:
-        frame_count = 1
-    indices = [math.floor(i * frame_count / n_frames) for i in range(n_frames)]
-    saved = 0
+        return "sequential"
+    fps = fps if fps > 0 else 30.0
+    return "sequential" if frame_count <= n_frames * SEEK_COST_SECONDS * fps else "seek"
+
+
+def _frame_count(cap) -> int:
+    """Metadata frame count, or 0 when missing or implausible."""
+    count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    if count <= 0 or count > (fps if fps > 0 else 60.0) * MAX_PLAUSIBLE_SECONDS:
+        return 0
+    return count
+
+
+def _sample_seek(cap, indices: List[int]) -> Iterator[np.ndarray]:
     for idx in indices:
         cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
         ret, frame = cap.read()
         if not ret:
-            continue
+            # frame count overstated: everything after this is past the end too
+            break
+        yield frame
+
+
+def _sample_sequential(cap, indices: List[int]) -> Iterator[np.ndarray]:
+    """grab() every frame, retrieve() (colour-convert) only the sampled ones."""
+    pos = 0
+    for idx in indices:
+        while pos < idx:
+            if not cap.grab():
+                return
+            pos += 1
+        if not cap.grab():
+            return
+        pos += 1
+        ret, frame = cap.retrieve()
+        if ret:
+            yield frame
+
+
+def _sample_unknown_length(cap, n_frames: int) -> List[np.ndarray]:
+    """Evenly spaced frames of a video of unknown length, in one sequential pass.
+
+    Keeps every `stride`-th frame; whenever 4 * n_frames are held, every other
+    one is dropped and the stride doubles, so memory stays bounded.
+    """
+    # (frame index, frame)
+    kept: List[tuple] = []
+    stride = 1
+    pos = 0
+    while cap.grab():
+        if pos % stride == 0:
+            ret, frame = cap.retrieve()
+            if ret:
+                kept.append((pos, frame))
+                if len(kept) >= 4 * n_frames:
+                    kept = kept[::2]
+                    stride *= 2
+        pos += 1
+    if len(kept) <= n_frames:
+        return [frame for _, frame in kept]
+    # now that the length is known, take the kept frame nearest each evenly spaced target
+    picked = []
+    for i in range(n_frames):
+        target = math.floor(i * pos / n_frames)
+        j = min(range(len(kept)), key=lambda k: abs(kept[k][0] - target))
+        if not picked or picked[-1] != j:
+            picked.append(j)
+    return [kept[j][1] for j in picked]
+
+
+def iter_frames(video_path: Path, n_frames: int = 8, mode: str = "auto") -> Iterator[np.ndarray]:
+    """Yield up to `n_frames` evenly spaced frames of `video_path` as RGB uint8 arrays.
+
+    `mode` is `seek` (one seek per sample), `sequential` (decode straight
+    through, keeping only the sampled frames) or `auto` (see
+    `choose_sampling_mode`). Videos without a usable frame count are always
+    read sequentially.
+    """
+    if mode not in SAMPLING_MODES:
+        raise ValueError(f"Invalid sampling mode: {mode}")
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise RuntimeError("cannot open video")
+    try:
+        frame_count = _frame_count(cap)
+        if frame_count == 0:
+            frames = iter(_sample_unknown_length(cap, n_frames))
+        else:
+            indices = sorted({math.floor(i * frame_count / n_frames) for i in range(n_frames)})
+            if mode == "auto":
+                mode = choose_sampling_mode(frame_count, cap.get(cv2.CAP_PROP_FPS), n_frames)
+            frames = _sample_seek(cap, indices) if mode == "seek" else _sample_sequential(cap, indices)
+        for frame in frames:
+            yield cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    finally:
+        cap.release()
+
+
+def extract_frames(video_path: Path, out_dir: Path, n_frames: int = 8, mode: str = "auto"):
+    out_dir.mkdir(parents=True, exist_ok=True)
+    saved = 0
+    for frame in iter_frames(video_path, n_frames, mode):
         out_file = out_dir / f"frame_{saved:03d}.jpg"
-        cv2.imwrite(str(out_file), frame)
+        cv2.imwrite(str(out_file), cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
         saved += 1
-    cap.release()
     return saved
 
 
+def video_frames_from_url(
+    url: str, n_frames: int = 8, mode: str = "auto", max_bytes: int | None = None
+) -> List[np.ndarray]:
+    """Download `url` to a temp dir and return its sampled frames (RGB), no JPEG round-trip."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        vfile = Path(tmpdir) / "video.mp4"
+        download_video(url, vfile, max_bytes=max_bytes)
+        return list(iter_frames(vfile, n_frames, mode))
+
+
+def _stream_command(url: str, fmt: str) -> List[str]:
+    return ["yt-dlp", "-q", "--no-playlist", "--socket-timeout", "30", "-f", fmt, "-o", "-", url]
+
+
+def _pump(src, fifo: Path):
+    """Copy the downloader's stdout into the FIFO until EOF or the reader goes away."""
+    try:
+        with open(fifo, "wb") as out:
+            while True:
+                chunk = src.read(1 << 16)
+                if not chunk:
+                    break
+                out.write(chunk)
+    except (BrokenPipeError, OSError, ValueError):
+        pass
+
+
+def stream_frames(
+    url: str, n_frames: int = 8, interval: float = 2.0, max_height: int = 360
+) -> Iterator[np.ndarray]:
+    """Yield up to `n_frames` RGB frames, one per `interval` seconds, while `url` downloads.
+
+    Only the first `n_frames * interval` seconds are downloaded; the
+    downloader is killed as soon as the last frame is taken (or the
+    generator is closed).
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fifo = Path(tmpdir) / "video"
+        os.mkfifo(fifo)
+        proc = subprocess.Popen(
+            _stream_command(url, low_res_format(max_height)), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        pump = threading.Thread(target=_pump, args=(proc.stdout, fifo), name="video-stream", daemon=True)
+        pump.start()
+        # FFmpeg only: other backends would re-open the FIFO and block once the writer is gone
+        cap = cv2.VideoCapture(str(fifo), cv2.CAP_FFMPEG)
+        try:
+            if not cap.isOpened():
+                raise RuntimeError("cannot open video stream")
+            taken = 0
+            next_t = 0.0
+            while taken < n_frames and cap.grab():
+                t = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+                if t + 1e-3 < next_t:
+                    continue
+                ret, frame = cap.retrieve()
+                if not ret:
+                    continue
+                taken += 1
+                next_t = t + interval
+                yield cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        finally:
+            cap.release()
+            proc.kill()
+            proc.wait()
+            if pump.is_alive():
+                # the pump may still be blocked opening the FIFO if OpenCV never did
+                fd = os.open(fifo, os.O_RDONLY | os.O_NONBLOCK)
+                os.close(fd)
+            pump.join(timeout=5)
+            proc.stdout.close()
+
+
 def main():
     if len(sys.argv) < 3:
         print("usage: extract_frames.py <video_url> <out_dir> [--frames N]")
@@ -0,0 +1,21 @@
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Make both `backend.*` (repo root) and `app.*` / `models.*` (backend root) importable
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+for path in (BACKEND_ROOT.parent, BACKEND_ROOT):
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+
+# On-disk caches and indexes go to a throwaway directory, not backend/data
+_DATA_DIR = tempfile.mkdtemp(prefix="dfg-tests-")
+os.environ.setdefault("CONTENT_CACHE_PATH", os.path.join(_DATA_DIR, "content_cache.sqlite3"))
+os.environ.setdefault("SCAM_INDEX_DIR", os.path.join(_DATA_DIR, "scam_index"))
+os.environ.setdefault("VIDEO_CACHE_DIR", os.path.join(_DATA_DIR, "video_cache"))
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_DATA_DIR, ignore_errors=True)
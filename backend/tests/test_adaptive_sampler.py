@@ -0,0 +1,76 @@
+"""Tests for scene-aware adaptive frame sampling.
+
+Run with: pytest tests/test_adaptive_sampler.py -v
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+
+from app.services.adaptive_sampler import AdaptiveFrameSampler
+
+
+def solid(value):
+    return np.full((48, 64, 3), value, dtype=np.uint8)
+
+
+class FakeModel:
+    """Score of a frame is looked up by its (uniform) pixel value."""
+
+    def __init__(self, scores):
+        self.scores = scores
+        self.calls = []
+
+    async def __call__(self, frames):
+        self.calls.append(len(frames))
+        values = [int(f[0, 0, 0]) for f in frames]
+        return [self.scores[v] for v in values], np.array([[v, 1.0] for v in values], dtype=np.float32)
+
+
+def test_scenes_group_near_identical_frames():
+    sampler = AdaptiveFrameSampler()
+    frames = [solid(10), solid(11), solid(10), solid(200), solid(201), solid(60)]
+    assert sampler.scenes(frames) == [(0, 3), (3, 5), (5, 6)]
+
+
+@pytest.mark.asyncio
+async def test_static_video_costs_one_inference():
+    model = FakeModel({10: 0.9})
+    result = await AdaptiveFrameSampler().score([solid(10)] * 16, model)
+    assert model.calls == [1]
+    assert result["score"] == pytest.approx(0.9)
+    assert result["scenes"] == 1
+    assert result["embeddings"].shape == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_stops_early_when_clearly_benign():
+    scores = {v: 0.05 for v in range(0, 256, 20)}
+    model = FakeModel(scores)
+    frames = [solid(v) for v in range(0, 256, 20)]
+    result = await AdaptiveFrameSampler(min_frames=2, max_frames=8).score(frames, model)
+    assert model.calls == [2]
+    assert result["stopped_early"]
+    assert result["scored_frames"] == [0, len(frames) - 1]
+
+
+@pytest.mark.asyncio
+async def test_refines_where_scores_disagree():
+    values = list(range(0, 256, 20))  # 13 distinct scenes
+    # suspicious second half
+    model = FakeModel({v: (0.1 if v < 120 else 0.95) for v in values})
+    frames = [solid(v) for v in values]
+    result = await AdaptiveFrameSampler(min_frames=2, max_frames=5, step=1).score(frames, model)
+    assert len(result["scores"]) == 5
+    assert not result["stopped_early"]
+    # refinement bisects toward the benign/suspicious boundary
+    assert result["scored_frames"] == sorted(result["scored_frames"])
+    assert 6 in result["scored_frames"] or 5 in result["scored_frames"]
+    assert result["embeddings"].shape == (5, 2)
+
+
+@pytest.mark.asyncio
+async def test_no_frames():
+    result = await AdaptiveFrameSampler().score([], FakeModel({}))
+    assert result["score"] is None
@@ -1,3 +1,4 @@
+import pytest
 from fastapi.testclient import TestClient
 from backend.app.main import app
 
@@ -16,3 +17,240 @@ def test_seed_endpoint():
     assert r.status_code == 200
     data = r.json()
     assert 'urls' in data
+
+
+def test_ready_reports_cold_model_separately_from_health():
+    # lifespan (and so background loading) only runs inside `with TestClient(app)`
+    r = client.get('/ready')
+    assert r.status_code == 503
+    assert r.json()['detail']['status'] == 'cold'
+    assert client.get('/health').status_code == 200
+
+
+def test_repeat_scan_of_same_url_is_served_from_cache(monkeypatch):
+    import backend.app.main as main
+    from app.services.api_key_manager import APIKeyManager
+    from app.services.media_fetch import UnsupportedMedia
+
+    fetched = []
+
+    async def fetch(url):
+        # a plain HTML page: heuristics only, no model
+        fetched.append(url)
+        raise UnsupportedMedia("not an image or video (text/html)")
+
+    monkeypatch.setattr(main.media_fetcher, 'fetch', fetch)
+    api_key = APIKeyManager.create_user(email='cache@example.com', tier='pro')['api_key']
+    headers = {'X-API-Key': api_key}
+
+    first = client.post('/v1/scan', json={'url': 'https://example.com/giveaway'}, headers=headers)
+    assert first.status_code == 200
+    assert first.json()['score'] == 0.7
+    assert 'cached' not in first.json()['details']
+
+    again = client.post('/v1/scan', json={'url': 'https://www.example.com/giveaway/?utm_source=x'}, headers=headers)
+    assert again.status_code == 200
+    body = again.json()
+    assert body['score'] == 0.7
+    assert body['flags'] == ['contains_giveaway_keyword']
+    assert body['details']['cached'] is True
+    assert body['details']['cache_age_seconds'] >= 0
+    assert fetched == ['https://example.com/giveaway']
+
+
+def test_video_scan_is_queued_as_a_job():
+    from app.services.api_key_manager import APIKeyManager
+
+    api_key = APIKeyManager.create_user(email='jobs@example.com', tier='pro')['api_key']
+    r = client.post('/v1/scan', json={'url': 'https://youtu.be/dQw4w9WgXcQ'}, headers={'X-API-Key': api_key})
+    assert r.status_code == 202
+    job = r.json()
+    assert job['status'] == 'queued'
+    assert job['status_url'] == f"/v1/scan/jobs/{job['job_id']}"
+
+    status = client.get(job['status_url'], headers={'X-API-Key': api_key})
+    assert status.status_code == 200
+    assert status.json()['job_id'] == job['job_id']
+    assert 'api_key' not in status.text
+    # other keys cannot see the job
+    assert client.get(job['status_url'], headers={'X-API-Key': 'someone-else'}).status_code == 404
+
+
+def test_queued_jobs_are_charged_at_submit():
+    from app.services.api_key_manager import APIKeyManager
+
+    api_key = APIKeyManager.create_user(email='quota@example.com', tier='free')['api_key']
+    headers = {'X-API-Key': api_key}
+    for i in range(10):
+        r = client.post('/v1/scan', json={'url': f'https://youtu.be/quota{i:06d}'}, headers=headers)
+        assert r.status_code == 202
+    r = client.post('/v1/scan', json={'url': 'https://youtu.be/quota000010'}, headers=headers)
+    assert r.status_code == 401
+    assert 'Monthly scan limit' in r.json()['detail']
+
+
+def _png_bytes():
+    import cv2
+    import numpy as np
+
+    ok, buf = cv2.imencode('.png', np.full((32, 32, 3), 128, dtype=np.uint8))
+    return buf.tobytes()
+
+
+@pytest.mark.asyncio
+async def test_fallback_scores_are_not_cached(monkeypatch):
+    import backend.app.main as main
+
+    png = _png_bytes()
+
+    async def fetch(url):
+        return {'media_type': 'image', 'content_type': 'image/png', 'data': png, 'size': len(png)}
+
+    async def predict(frames):
+        return [0.1] * len(frames), None
+
+    stored = []
+    monkeypatch.setattr(main.media_fetcher, 'fetch', fetch)
+    monkeypatch.setattr(main.inference_scheduler, 'predict_frames_with_embeddings', predict)
+    monkeypatch.setattr(main.model_registry, 'state', 'degraded')
+    if main.phash_cache:
+        monkeypatch.setattr(main.phash_cache, 'store', lambda *args: stored.append('phash'))
+    if main.content_cache:
+        monkeypatch.setattr(main.content_cache, 'put', lambda *args: stored.append('content'))
+
+    analysis = await main.analyze_media('https://cdn.example.com/img/degraded')
+    assert analysis['error'] is None
+    assert analysis['details']['model_degraded'] is True
+    assert stored == []
+
+
+@pytest.mark.asyncio
+async def test_failed_job_sends_scan_failed_webhook(monkeypatch):
+    import asyncio
+
+    import backend.app.main as main
+
+    sent = []
+
+    async def notify_scan_failed(**kwargs):
+        sent.append(kwargs)
+
+    async def analyze_media(url, defer_video=False):
+        return {'score': 0.05, 'flags': [], 'details': {}, 'media_type': 'video', 'error': 'download failed',
+                'embeddings': None}
+
+    monkeypatch.setattr(main.WebhookService, 'notify_scan_failed', notify_scan_failed)
+    monkeypatch.setattr(main, 'analyze_media', analyze_media)
+    monkeypatch.setattr(main, 'url_cache', None)
+    user = {'webhook_url': 'https://hooks.example.com/dfg'}
+
+    body = await main._run_scan('https://youtu.be/x', None, 'key', user, job_id='job-1')
+    await asyncio.sleep(0)
+    assert body['details']['error'] == 'download failed'
+    assert sent and sent[0]['job_id'] == 'job-1' and sent[0]['error'] == 'download failed'
+
+
+@pytest.mark.asyncio
+async def test_audio_score_feeds_scan_score_and_flags(monkeypatch):
+    import backend.app.main as main
+
+    class FakeAudioScorer:
+        def score_url(self, url, max_abr):
+            return {'score': 0.9, 'windows': 4, 'stopped_early': True}
+
+    monkeypatch.setattr(main, 'audio_scorer', FakeAudioScorer())
+    monkeypatch.setattr(main, 'video_cache', None)
+    monkeypatch.setattr(main, 'VIDEO_DOWNLOAD_MODE', 'file')
+    monkeypatch.setattr(main, 'video_frames_from_url', lambda url, n_frames, mode, max_bytes: [])
+
+    analysis = await main.analyze_media('https://youtu.be/dQw4w9WgXcQ')
+    assert analysis['error'] is None
+    assert analysis['score'] == pytest.approx(0.9 * 0.95)
+    assert 'model_suspect_audio' in analysis['flags']
+    assert analysis['details']['audio']['windows'] == 4
+
+
+@pytest.mark.asyncio
+async def test_job_whose_key_was_revoked_sends_scan_failed_and_is_refunded(monkeypatch):
+    import asyncio
+
+    import backend.app.main as main
+    from app.services.api_key_manager import APIKeyManager
+
+    sent = []
+
+    async def notify_scan_failed(**kwargs):
+        sent.append(kwargs)
+
+    monkeypatch.setattr(main.WebhookService, 'notify_scan_failed', notify_scan_failed)
+    user = APIKeyManager.create_user(email='revoked@example.com', tier='free', webhook_url='https://hooks.example.com/r')
+    APIKeyManager.reserve_scan(user['api_key'])
+    user['active'] = False
+
+    job = {'job_id': 'job-r', 'payload': {'url': 'https://youtu.be/x', 'source': None, 'api_key': user['api_key']}}
+    with pytest.raises(RuntimeError, match='deactivated'):
+        await main._run_scan_job(job)
+    await asyncio.sleep(0)
+    assert sent and sent[0]['job_id'] == 'job-r'
+    assert user['scans_used_this_month'] == 0
+
+
+def test_link_sniffed_as_video_is_queued(monkeypatch):
+    import backend.app.main as main
+    from app.services.api_key_manager import APIKeyManager
+
+    async def fetch(url):
+        return {'media_type': 'video', 'content_type': 'video/mp4', 'data': None, 'size': 64}
+
+    downloads = []
+    monkeypatch.setattr(main.media_fetcher, 'fetch', fetch)
+    monkeypatch.setattr(main, 'video_frames_from_url', lambda *args, **kwargs: downloads.append(args) or [])
+    monkeypatch.setattr(main, 'video_cache', None)
+
+    user = APIKeyManager.create_user(email='sniffed@example.com', tier='pro')
+    r = client.post('/v1/scan', json={'url': 'https://cdn.example.com/v/9c2e'}, headers={'X-API-Key': user['api_key']})
+    assert r.status_code == 202
+    assert r.json()['status'] == 'queued'
+    assert downloads == []
+    assert user['scans_used_this_month'] == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_results_still_match_newly_confirmed_scams(monkeypatch):
+    import numpy as np
+
+    import backend.app.main as main
+
+    if main.scam_index is None or main.content_cache is None or main.url_cache is None:
+        pytest.skip("scam index and result caches are enabled by default")
+    png = _png_bytes()
+    vector = np.random.default_rng(7).standard_normal((1, 512)).astype(np.float32)
+    calls = []
+
+    async def fetch(url):
+        return {'media_type': 'image', 'content_type': 'image/png', 'data': png, 'size': len(png)}
+
+    async def predict(frames):
+        calls.append(len(frames))
+        return [0.2] * len(frames), vector
+
+    monkeypatch.setattr(main.media_fetcher, 'fetch', fetch)
+    monkeypatch.setattr(main.inference_scheduler, 'predict_frames_with_embeddings', predict)
+    user = main.APIKeyManager.create_user(email='campaign@example.com', tier='pro')
+    key = user['api_key']
+
+    first = await main._run_scan('https://cdn.example.com/campaign/a.png', None, key, user)
+    assert 'matches_confirmed_scam' not in first['flags']
+    # a reviewer confirms the first copy
+    main.scam_index.add(vector, first['details']['scan_id'])
+
+    # same bytes under another URL: a content-cache hit
+    copy = await main._run_scan('https://cdn.example.com/campaign/b.png', None, key, user)
+    assert copy['details']['content_match'] is True
+    assert 'matches_confirmed_scam' in copy['flags']
+    # the first URL again: a URL-cache hit
+    again = await main._run_scan('https://cdn.example.com/campaign/a.png', None, key, user)
+    assert again['details']['cached'] is True
+    assert 'matches_confirmed_scam' in again['flags']
+    assert again['details']['scam_match']['scan_id'] == first['details']['scan_id']
+    assert calls == [1]
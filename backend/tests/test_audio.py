@@ -0,0 +1,105 @@
+"""Tests for windowed audio scoring.
+
+Run with: pytest tests/test_audio.py -v
+"""
+
+import io
+
+import numpy as np
+import pytest
+
+import models.audio
+from models.audio import AudioScorer, audio_format, pcm_windows
+
+
+def pcm(samples):
+    return io.BytesIO((np.asarray(samples) * 32767).astype("<i2").tobytes())
+
+
+class FakeModel:
+    """Window score = its mean sample value; records batch sizes."""
+
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, windows):
+        self.batches.append(len(windows))
+        return [float(w.mean()) for w in windows]
+
+
+def scorer(model, **options):
+    # identity frontend: the fake model sees raw windows
+    return AudioScorer(model, frontend=lambda w: w, sample_rate=100, **options)
+
+
+def test_pcm_windows_batches_and_pads_tail():
+    batches = list(pcm_windows(pcm(np.full(1050, 0.5)), window_samples=100, batch_windows=4))
+    assert [len(b) for b in batches] == [4, 4, 3]
+    assert batches[-1].shape == (3, 100)
+    assert batches[0][0, 0] == pytest.approx(0.5, abs=1e-3)
+    # 50-sample tail padded into a final window
+    assert batches[-1][-1, 60] == 0.0
+
+
+def test_short_tail_is_dropped():
+    batches = list(pcm_windows(pcm(np.full(130, 0.5)), window_samples=100))
+    assert sum(len(b) for b in batches) == 1
+
+
+def test_scores_whole_clip_in_batches():
+    model = FakeModel()
+    result = scorer(model, window_seconds=1.0, batch_windows=2, min_windows=100).score_stream(
+        pcm(np.full(600, 0.5))
+    )
+    assert model.batches == [2, 2, 2]
+    assert result["windows"] == 6
+    assert result["seconds"] == 6.0
+    assert result["score"] == pytest.approx(0.5, abs=1e-3)
+    assert not result["stopped_early"]
+
+
+def test_stops_early_once_confident():
+    model = FakeModel()
+    result = scorer(model, window_seconds=1.0, batch_windows=2, min_windows=4).score_stream(
+        pcm(np.full(100 * 60, 0.95))
+    )
+    assert result["stopped_early"]
+    assert result["windows"] == 4
+    assert result["score"] > 0.75
+
+
+def test_max_seconds_caps_reading():
+    model = FakeModel()
+    result = scorer(model, window_seconds=1.0, batch_windows=4, max_seconds=5, min_windows=100).score_stream(
+        pcm(np.full(100 * 60, 0.5))
+    )
+    assert result["windows"] == 5
+
+
+def test_log_mel_frontend_shape():
+    pytest.importorskip("torchaudio")
+    from models.audio import LogMelFrontend
+
+    mels = LogMelFrontend(n_mels=64)(np.random.default_rng(0).standard_normal((3, 16000)).astype(np.float32))
+    assert tuple(mels.shape[:3]) == (3, 1, 64)
+
+
+def test_audio_format_falls_back_to_combined_stream():
+    # direct .mp4 links have no audio-only format
+    assert audio_format(64).split("/")[-1] == "b"
+
+
+def test_score_url_streams_fetch_through_decoder(tmp_path, monkeypatch):
+    clip = tmp_path / "clip.pcm"
+    clip.write_bytes(pcm(np.full(400, 0.5)).getvalue())
+    monkeypatch.setattr(models.audio, "fetch_command", lambda url, max_abr: ["cat", str(clip)])
+    monkeypatch.setattr(models.audio, "decode_command", lambda source, sample_rate: ["cat"])
+    result = scorer(FakeModel(), window_seconds=1.0, min_windows=100).score_url("https://cdn.example.com/v.mp4")
+    assert result["windows"] == 4
+
+
+def test_failed_fetch_is_an_error_not_an_empty_score(monkeypatch):
+    monkeypatch.setattr(models.audio, "fetch_command", lambda url, max_abr: ["false"])
+    monkeypatch.setattr(models.audio, "decode_command", lambda source, sample_rate: ["cat"])
+    with pytest.raises(RuntimeError, match="yt-dlp exited with code 1"):
+        scorer(FakeModel(), window_seconds=1.0).score_url("https://cdn.example.com/v.mp4")
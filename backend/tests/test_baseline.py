@@ -0,0 +1,112 @@
+"""Tests for the baseline frame detector.
+
+Run with: pytest tests/test_baseline.py -v
+"""
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+models = pytest.importorskip("torchvision.models")
+
+from backend.models.baseline import BaselineDetector
+
+
+@pytest.fixture
+def detector():
+    """Detector with a randomly initialised ResNet (no weight download)."""
+    det = BaselineDetector(device="cpu", max_batch_size=4, allow_download=False)
+    torch.manual_seed(0)
+    resnet = models.resnet18(weights=None)
+    det.feature_extractor = torch.nn.Sequential(*list(resnet.children())[:-1]).eval()
+    return det
+
+
+def _frames(n):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, size=(120, 160, 3), dtype=np.uint8) for _ in range(n)]
+
+
+def test_batched_scores_match_single_frame_scores(detector):
+    """Chunked batches must score each frame the same as batch-of-1 passes."""
+    frames = _frames(6)
+    batched = detector.predict_frames(frames)
+    single = detector.predict_frames(frames, max_batch_size=1)
+    assert len(batched) == 6
+    np.testing.assert_allclose(batched, single, rtol=1e-4, atol=1e-5)
+
+
+def test_one_forward_pass_per_chunk(detector):
+    """Frames are stacked into chunks of at most max_batch_size."""
+    seen = []
+    detector.feature_extractor.register_forward_hook(lambda m, i, o: seen.append(i[0].shape[0]))
+    detector.predict_frames(_frames(10))
+    assert seen == [4, 4, 2]
+
+
+def test_loads_exported_torchscript_classifier(tmp_path):
+    """A TorchScript export with a (N, 1) sigmoid head is used directly as the scorer."""
+    head = torch.nn.Sequential(
+        torch.nn.AdaptiveAvgPool2d(1), torch.nn.Flatten(), torch.nn.Linear(3, 1), torch.nn.Sigmoid()
+    ).eval()
+    path = tmp_path / "model.pt"
+    torch.jit.trace(head, torch.randn(1, 3, 224, 224)).save(str(path))
+
+    det = BaselineDetector(device="cpu", model_path=path, max_batch_size=4)
+    assert det.feature_extractor is None
+    frames = _frames(5)
+    scores = det.predict_frames(frames)
+    with torch.no_grad():
+        expected = head(torch.from_numpy(det.preprocessor(frames).copy())).reshape(-1).tolist()
+    np.testing.assert_allclose(scores, expected, rtol=1e-5)
+
+
+def test_torchscript_resolved_from_repository_and_frozen(tmp_path):
+    """`model_name` picks the latest version; freezing must not change scores."""
+    torch.manual_seed(0)
+    net = torch.nn.Sequential(
+        torch.nn.Conv2d(3, 4, 3), torch.nn.ReLU(), torch.nn.AdaptiveAvgPool2d(1),
+        torch.nn.Flatten(), torch.nn.Linear(4, 1), torch.nn.Sigmoid(),
+    ).eval()
+    for version in (1, 2):
+        (tmp_path / "det" / str(version)).mkdir(parents=True)
+    torch.jit.trace(net, torch.randn(1, 3, 224, 224)).save(str(tmp_path / "det" / "2" / "model.pt"))
+
+    frozen = BaselineDetector(device="cpu", model_repository=tmp_path, model_name="det")
+    plain = BaselineDetector(
+        device="cpu", model_path=tmp_path / "det" / "2" / "model.pt", freeze=False, channels_last=False
+    )
+    # freezing inlines the parameters as constants: no attribute reads remain
+    assert isinstance(frozen.model, torch.jit.RecursiveScriptModule)
+    assert "prim::GetAttr" not in str(frozen.model.graph)
+    assert "prim::GetAttr" in str(plain.model.inlined_graph)
+
+    inputs = []
+    model = frozen.model
+    frozen.model = lambda x: inputs.append(x) or model(x)
+    frames = _frames(3)
+    np.testing.assert_allclose(frozen.predict_frames(frames), plain.predict_frames(frames), rtol=1e-4)
+    assert inputs[0].is_contiguous(memory_format=torch.channels_last)
+    assert not inputs[0].is_contiguous()
+
+
+def test_missing_torchscript_file_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        BaselineDetector(device="cpu", model_path=tmp_path / "missing.pt")
+
+
+def test_local_weights_path_loads_without_download(tmp_path):
+    path = tmp_path / "resnet18.pth"
+    torch.save(models.resnet18(weights=None).state_dict(), path)
+    det = BaselineDetector(device="cpu", weights_path=path)
+    assert det.feature_extractor is not None
+    assert not det.degraded
+    det.warmup([2])
+    assert len(det.predict_frames(_frames(2))) == 2
+
+
+def test_no_download_without_weights_uses_fallback():
+    det = BaselineDetector(device="cpu", allow_download=False)
+    assert det.feature_extractor is None
+    assert det.degraded
+    assert det.predict_frames(_frames(3)) == [0.1, 0.1, 0.1]
@@ -0,0 +1,83 @@
+"""Tests for the two-stage triage cascade.
+
+Run with: pytest tests/test_cascade.py -v
+"""
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from models.cascade import CascadeDetector, TriageScorer, cascade_report
+
+
+class RecordingDetector:
+    """Full-detector stand-in: scores by mean brightness, records what it saw."""
+
+    def __init__(self):
+        self.seen = []
+
+    def predict_frames_with_embeddings(self, frames, max_batch_size=None):
+        self.seen.append(len(frames))
+        scores = [float(f.mean() / 255.0) for f in frames]
+        return scores, np.ones((len(frames), 4), dtype=np.float32)
+
+
+def _frame(level, seed=0):
+    rng = np.random.default_rng(seed)
+    noise = rng.integers(-10, 10, size=(48, 64, 3))
+    return np.clip(level + noise, 0, 255).astype(np.uint8)
+
+
+def test_unfitted_triage_sends_everything_to_stage_two():
+    full = RecordingDetector()
+    cascade = CascadeDetector(full, low=0.2, high=0.9)
+    frames = [_frame(50), _frame(200)]
+    scores, embeddings = cascade.predict_frames_with_embeddings(frames)
+    assert full.seen == [2]
+    assert scores == pytest.approx([f.mean() / 255.0 for f in frames])
+    assert embeddings.shape == (2, 4)
+    assert cascade.get_stats()["skip_fraction"] == 0.0
+
+
+def test_only_uncertain_frames_reach_full_detector(tmp_path):
+    levels = np.linspace(10, 245, 40)
+    train = [_frame(level, seed=i) for i, level in enumerate(levels)]
+    teacher = [f.mean() / 255.0 for f in train]
+    triage = TriageScorer.fit(train, teacher, iterations=2000)
+    path = tmp_path / "triage.json"
+    triage.save(path)
+
+    full = RecordingDetector()
+    cascade = CascadeDetector(full, low=0.2, high=0.8, triage_weights_path=path)
+    frames = [_frame(15), _frame(128), _frame(240)]
+    scores, embeddings = cascade.predict_frames_with_embeddings(frames)
+
+    # dark and bright frames exit early; the mid-grey one is scored in full
+    assert full.seen == [1]
+    assert scores[0] < 0.2 and scores[2] > 0.8
+    assert scores[1] == pytest.approx(frames[1].mean() / 255.0)
+    assert embeddings[[0, 2]].sum() == 0 and embeddings[1].sum() == 4
+
+    stats = cascade.get_stats()
+    assert stats["triage_fitted"]
+    assert (stats["exited_low"], stats["exited_high"], stats["stage2_frames"]) == (1, 1, 1)
+    assert stats["skip_fraction"] == pytest.approx(2 / 3, abs=1e-3)
+
+
+def test_invalid_thresholds_and_mismatched_weights(tmp_path):
+    with pytest.raises(ValueError):
+        CascadeDetector(RecordingDetector(), low=0.8, high=0.2)
+    path = tmp_path / "old.json"
+    path.write_text('{"features": ["a"], "weights": [1], "bias": 0, "mean": [0], "std": [1]}')
+    with pytest.raises(ValueError):
+        TriageScorer.load(path)
+
+
+def test_cascade_report():
+    triage = np.array([0.05, 0.5, 0.95, 0.1])
+    full = np.array([0.1, 0.4, 0.3, 0.7])
+    report = cascade_report(triage, full, low=0.2, high=0.9)
+    assert report["skip_fraction"] == 0.75
+    assert report["exit_max_abs_error"] == pytest.approx(0.65)
+    assert report["exit_decision_flips"] == 2
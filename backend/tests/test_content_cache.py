@@ -0,0 +1,68 @@
+"""Tests for the persistent content-addressed result cache.
+
+Run with: pytest tests/test_content_cache.py -v
+"""
+
+from app.services.content_cache import ContentResultCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_results_survive_reopen(tmp_path):
+    db = tmp_path / "cache.sqlite3"
+    key = ContentResultCache.content_key(b"image bytes")
+    cache = ContentResultCache(db, model_version="v1")
+    cache.put(key, {"score": 0.8, "flags": ["model_suspect_frame"]})
+    cache.close()
+
+    reopened = ContentResultCache(db, model_version="v1")
+    hit = reopened.get(key)
+    assert hit["score"] == 0.8
+    assert hit["flags"] == ["model_suspect_frame"]
+    assert reopened.get(ContentResultCache.content_key(b"other bytes")) is None
+    assert reopened.get_stats()["hit_rate"] == 0.5
+
+
+def test_model_swap_invalidates(tmp_path):
+    db = tmp_path / "cache.sqlite3"
+    cache = ContentResultCache(db, model_version="v1")
+    cache.put("abc", {"score": 0.8, "flags": []})
+    cache.close()
+
+    swapped = ContentResultCache(db, model_version="v2")
+    assert swapped.get("abc") is None
+    assert swapped.get_stats()["entries"] == 0
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    clock = Clock()
+    cache = ContentResultCache(tmp_path / "c.sqlite3", model_version="v1", ttl_seconds=60, clock=clock)
+    cache.put("abc", {"score": 0.1, "flags": []})
+    clock.now += 30
+    assert cache.get("abc") is not None
+    clock.now += 31
+    assert cache.get("abc") is None
+
+
+def test_least_recently_used_evicted_over_byte_budget(tmp_path):
+    clock = Clock()
+    result = {"score": 0.5, "flags": []}
+    row_size = len('{"score": 0.5, "flags": []}')
+    cache = ContentResultCache(tmp_path / "c.sqlite3", model_version="v1", max_bytes=2 * row_size, clock=clock)
+    for key in ("a", "b"):
+        cache.put(key, result)
+        clock.now += 1
+    assert cache.get("a") is not None  # "b" is now least recently used
+    clock.now += 1
+    cache.put("c", result)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.get_stats()["evictions"] == 1
@@ -0,0 +1,128 @@
+"""Tests for the confirmed-scam embedding similarity index.
+
+Run with: pytest tests/test_embedding_index.py -v
+"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app.services.embedding_index import ScamEmbeddingIndex
+
+
+def _vectors(n, dim=32, seed=0):
+    return np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+
+
+def test_brute_force_top_k(tmp_path):
+    index = ScamEmbeddingIndex(tmp_path, brute_force_max=1000)
+    data = _vectors(50)
+    for i, v in enumerate(data):
+        index.add(v, f"scan-{i}")
+    index.rebuild()
+    assert index.get_stats()["layout"] == "brute_force"
+
+    # a lightly perturbed copy of row 7 should find row 7 first
+    query = data[7] + 0.01 * _vectors(1, seed=1)[0]
+    results = index.search(np.stack([query, data[3]]), k=3)
+    assert results[0][0][0] == "scan-7"
+    assert results[0][0][1] > 0.99
+    assert len(results[0]) == 3
+    assert results[1][0][0] == "scan-3"
+
+
+def test_best_match_threshold(tmp_path):
+    index = ScamEmbeddingIndex(tmp_path)
+    data = _vectors(10)
+    index.add(data[:2], "scan-a")
+    assert index.best_match(data[1:2] * 3.0, threshold=0.95) == ("scan-a", pytest.approx(1.0, abs=1e-5))
+    assert index.best_match(data[5:6], threshold=0.95) is None
+    assert index.get_stats()["matches"] == 1
+
+
+def test_ivf_layout_persists_and_finds_neighbours(tmp_path):
+    data = _vectors(3000, seed=2)
+    index = ScamEmbeddingIndex(tmp_path, brute_force_max=500, nprobe=8, merge_threshold=10**6)
+    index.add(data, "bulk")
+    index.add(data[42] * 2.0, "scan-42")
+    index.rebuild(n_lists=32)
+    assert index.get_stats()["layout"] == "ivf"
+
+    reopened = ScamEmbeddingIndex(tmp_path, brute_force_max=500, nprobe=8)
+    assert len(reopened) == 3001
+    assert isinstance(reopened._vectors, np.memmap)
+    hits = reopened.search(data[42:43], k=2)[0]
+    assert {scan_id for scan_id, _ in hits} == {"bulk", "scan-42"}
+    assert hits[0][1] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_delta_survives_restart_and_merges(tmp_path):
+    data = _vectors(5)
+    index = ScamEmbeddingIndex(tmp_path, merge_threshold=4)
+    index.add(data[:2], "scan-1")
+    assert ScamEmbeddingIndex(tmp_path).get_stats()["delta_vectors"] == 2
+
+    index.add(data[2:4], "scan-2")
+    assert index.wait_for_rebuild(timeout=30)
+    stats = index.get_stats()
+    assert stats["delta_vectors"] == 0
+    assert stats["vectors"] == 4
+    assert ScamEmbeddingIndex(tmp_path).search(data[3:4])[0][0][0] == "scan-2"
+
+
+def test_confirm_indexes_remembered_scan(tmp_path):
+    index = ScamEmbeddingIndex(tmp_path, recent_scans=1)
+    data = _vectors(3)
+    index.remember("old", data[:1])
+    index.remember("new", data[1:2])
+    assert index.confirm("old") is False
+    assert index.confirm("new") is True
+    assert index.best_match(data[1:2], threshold=0.99)[0] == "new"
+    assert index.search(np.zeros((1, 16)))[0] == []
+
+
+def test_remembered_scan_can_be_confirmed_after_restart(tmp_path):
+    data = _vectors(2)
+    ScamEmbeddingIndex(tmp_path).remember("scan-1", data[:1])
+    reopened = ScamEmbeddingIndex(tmp_path)
+    assert reopened.confirm("scan-1") is True
+    assert reopened.best_match(data[:1], threshold=0.99)[0] == "scan-1"
+    # confirmed embeddings are consumed
+    assert reopened.confirm("scan-1") is False
+    assert reopened.confirm("../vectors") is False
+
+
+def test_searches_and_adds_do_not_wait_for_a_background_merge(tmp_path, monkeypatch):
+    from app.services import embedding_index
+
+    started, release = threading.Event(), threading.Event()
+    kmeans = embedding_index._spherical_kmeans
+
+    def slow_kmeans(*args, **kwargs):
+        started.set()
+        release.wait(30)
+        return kmeans(*args, **kwargs)
+
+    monkeypatch.setattr(embedding_index, "_spherical_kmeans", slow_kmeans)
+    data = _vectors(301, seed=3)
+    index = ScamEmbeddingIndex(tmp_path, brute_force_max=100, merge_threshold=300)
+    index.add(data[:200], "a")
+    index.add(data[200:300], "b")  # reaches the threshold
+    assert started.wait(30)
+
+    begun = time.monotonic()
+    assert index.search(data[250:251])[0][0][0] == "b"
+    index.add(data[300], "c")
+    assert time.monotonic() - begun < 5
+    assert index.get_stats()["merging"] is True
+
+    release.set()
+    assert index.wait_for_rebuild(timeout=30)
+    stats = index.get_stats()
+    assert (stats["vectors"], stats["delta_vectors"], stats["layout"]) == (301, 1, "ivf")
+    reopened = ScamEmbeddingIndex(tmp_path, brute_force_max=100)
+    assert len(reopened) == 301
+    assert reopened.search(data[300:301])[0][0][0] == "c"
+    assert sorted(p.name for p in tmp_path.iterdir() if p.name.startswith("main-")) == ["main-1"]
@@ -0,0 +1,58 @@
+"""Tests for the INT8 export and quantization report.
+
+Run with: pytest tests/test_export_and_triton.py -v
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from models.export_and_triton import prepare_model_repo, prepare_quantized_repo
+
+
+class TinyDetector(torch.nn.Module):
+    """Conv -> pool -> Linear -> Sigmoid with the exported detector's I/O shapes."""
+
+    def __init__(self):
+        super().__init__()
+        torch.manual_seed(0)
+        self.conv = torch.nn.Conv2d(3, 4, 3, stride=4)
+        self.pool = torch.nn.AdaptiveAvgPool2d(1)
+        self.fc = torch.nn.Sequential(torch.nn.Linear(4, 1), torch.nn.Sigmoid())
+
+    def forward(self, x):
+        return self.fc(torch.flatten(self.pool(torch.relu(self.conv(x))), 1))
+
+
+@pytest.mark.parametrize("save_torch,save_onnx", [(True, False), (False, True)])
+def test_report_compares_int8_with_the_exported_fp32_model(tmp_path, save_torch, save_onnx):
+    if save_onnx:
+        pytest.importorskip("onnxruntime")
+    model = TinyDetector()
+    calib = torch.randn(8, 3, 224, 224, generator=torch.Generator().manual_seed(1))
+    prepare_model_repo("tiny", tmp_path, save_torch, save_onnx, torch.device("cpu"), model=model)
+    report = prepare_quantized_repo(
+        "tiny", tmp_path, save_torch, save_onnx, ["dynamic", "static"], calib, model, batch_size=4, bench_runs=1
+    )
+
+    assert report == json.loads((tmp_path / "quantization_report.json").read_text())
+    variants = {v["name"]: v for v in report["variants"]}
+    fmt = "torchscript" if save_torch else "onnx"
+    fp32 = variants[f"{fmt}_fp32"]
+    expected_fp32 = tmp_path / "tiny/1/model.pt" if save_torch else tmp_path / "tiny_onnx/1/model.onnx"
+    assert Path(fp32["path"]) == expected_fp32
+    assert fp32["score_drift"] == {"mean_abs": 0.0, "max_abs": 0.0}
+    for mode in ("dynamic", "static"):
+        v = variants[f"{fmt}_int8_{mode}"]
+        assert Path(v["path"]).is_file()
+        assert v["path"].startswith(str(tmp_path))
+        # a quantized copy of the same weights, not a different network
+        assert v["score_drift"]["max_abs"] < 0.05
+
+
+def test_missing_fp32_export_is_an_error(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        prepare_quantized_repo("tiny", tmp_path, True, False, ["dynamic"], None, TinyDetector(), batch_size=2, bench_runs=1)
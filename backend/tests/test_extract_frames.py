@@ -0,0 +1,150 @@
+"""Tests for in-process video frame extraction.
+
+Run with: pytest tests/test_extract_frames.py -v
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from scripts import extract_frames
+
+
+@pytest.fixture
+def video(tmp_path):
+    """30-frame clip whose red channel encodes the frame index."""
+    path = tmp_path / "clip.mp4"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), 10, (64, 48))
+    if not writer.isOpened():
+        pytest.skip("no mp4 encoder available")
+    for i in range(30):
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        frame[:, :, 2] = i * 8  # BGR: red
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def test_iter_frames_yields_evenly_spaced_rgb_frames(video):
+    frames = list(extract_frames.iter_frames(video, n_frames=3))
+    assert len(frames) == 3
+    assert all(f.shape == (48, 64, 3) and f.dtype == np.uint8 for f in frames)
+    # red is channel 0 in RGB; indices 0, 10, 20
+    reds = [float(f[:, :, 0].mean()) for f in frames]
+    assert reds == pytest.approx([0, 80, 160], abs=6)
+    assert all(f[:, :, 2].mean() < 6 for f in frames)
+
+
+def test_cli_extract_writes_jpegs(video, tmp_path):
+    out = tmp_path / "frames"
+    assert extract_frames.extract_frames(video, out, n_frames=4) == 4
+    assert len(list(out.glob("*.jpg"))) == 4
+
+
+def test_video_frames_from_url_skips_disk_frames(video, monkeypatch):
+    monkeypatch.setattr(extract_frames, "download_video", lambda url, out, max_bytes=None: shutil.copy(video, out))
+    frames = extract_frames.video_frames_from_url("https://youtu.be/abc", n_frames=2)
+    assert len(frames) == 2
+
+
+def test_unreadable_video_raises(tmp_path):
+    bad = tmp_path / "bad.mp4"
+    bad.write_bytes(b"not a video")
+    with pytest.raises(RuntimeError):
+        list(extract_frames.iter_frames(bad))
+
+
+@pytest.mark.parametrize("mode", ["seek", "sequential"])
+def test_sampling_modes_pick_the_same_frames(video, mode):
+    reds = [float(f[:, :, 0].mean()) for f in extract_frames.iter_frames(video, n_frames=3, mode=mode)]
+    assert reds == pytest.approx([0, 80, 160], abs=6)
+
+
+def test_auto_mode_reads_short_videos_sequentially():
+    assert extract_frames.choose_sampling_mode(300, 30.0, 8) == "sequential"
+    assert extract_frames.choose_sampling_mode(30 * 3600, 30.0, 8) == "seek"
+    assert extract_frames.choose_sampling_mode(0, 30.0, 8) == "sequential"
+
+
+def test_missing_frame_count_samples_whole_video(video, monkeypatch):
+    monkeypatch.setattr(extract_frames, "_frame_count", lambda cap: 0)
+    frames = list(extract_frames.iter_frames(video, n_frames=3))
+    reds = [float(f[:, :, 0].mean()) for f in frames]
+    assert len(frames) == 3
+    # spread over the whole clip, not bunched at the start
+    assert reds[0] < 10 and reds[-1] > 140
+
+
+def test_invalid_sampling_mode(video):
+    with pytest.raises(ValueError):
+        list(extract_frames.iter_frames(video, mode="keyframes"))
+
+
+def test_config_rejects_unknown_sampling_mode():
+    env = dict(os.environ, VIDEO_FRAME_SAMPLING="keyframe")
+    result = subprocess.run(
+        [sys.executable, "-c", "import config"],
+        cwd=Path(__file__).resolve().parents[1], env=env, capture_output=True, text=True,
+    )
+    assert result.returncode != 0
+    assert "VIDEO_FRAME_SAMPLING must be one of auto, seek, sequential" in result.stderr
+
+
+def test_config_sampling_modes_match_extractor():
+    import config
+
+    assert config.VIDEO_FRAME_SAMPLING_MODES == extract_frames.SAMPLING_MODES
+
+
+def _fake_ytdlp(tmp_path, monkeypatch, body):
+    """Put a `yt-dlp` on PATH that runs `body` with `out` set to its `-o` path."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "yt-dlp"
+    script.write_text(f"#!{sys.executable}\nimport sys, time\nout = sys.argv[sys.argv.index('-o') + 1]\n{body}\n")
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+
+def test_download_of_unknown_size_is_killed_past_max_bytes(tmp_path, monkeypatch):
+    _fake_ytdlp(tmp_path, monkeypatch, (
+        "f = open(out + '.part', 'wb')\n"
+        "while True:\n    f.write(b'x' * 4096); f.flush(); time.sleep(0.01)"
+    ))
+    out = tmp_path / "dl" / "video.mp4"
+    with pytest.raises(extract_frames.VideoTooLarge, match="10000 byte limit"):
+        extract_frames.download_video("https://example.com/v", out, max_bytes=10000)
+    assert list(out.parent.iterdir()) == []
+
+
+def test_download_skipped_for_max_filesize_raises(tmp_path, monkeypatch):
+    # yt-dlp exits 0 without writing anything when the known size is too big
+    _fake_ytdlp(tmp_path, monkeypatch, "assert '--max-filesize' in sys.argv")
+    with pytest.raises(extract_frames.VideoTooLarge):
+        extract_frames.download_video("https://example.com/v", tmp_path / "video.mp4", max_bytes=10000)
+
+
+def test_stream_frames_samples_by_time_and_stops_early(video, monkeypatch):
+    # stand-in for `yt-dlp -o -`: write the clip to stdout
+    monkeypatch.setattr(extract_frames, "_stream_command", lambda url, fmt: ["cat", str(video)])
+    frames = list(extract_frames.stream_frames("https://youtu.be/abc", n_frames=2, interval=1.0))
+    reds = [float(f[:, :, 0].mean()) for f in frames]
+    # 10 fps: frames at 0 s and 1 s
+    assert reds == pytest.approx([0, 80], abs=6)
+
+
+def test_stream_frames_failed_download(monkeypatch):
+    monkeypatch.setattr(extract_frames, "_stream_command", lambda url, fmt: ["false"])
+    with pytest.raises(RuntimeError):
+        list(extract_frames.stream_frames("https://youtu.be/abc"))
+
+
+def test_low_res_format_is_video_only():
+    assert extract_frames.low_res_format(360) == "bv[height<=360]/wv/w"
@@ -0,0 +1,90 @@
+"""Tests for the face-region crop stage.
+
+Run with: pytest tests/test_face_crop.py -v
+"""
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from models.face_crop import FaceCropDetector, FaceCropper
+
+
+class RecordingDetector:
+    def __init__(self):
+        self.inputs = []
+
+    def predict_frames_with_embeddings(self, frames, max_batch_size=None):
+        self.inputs.append([f.shape for f in frames])
+        # score = mean brightness, embedding = [brightness]
+        scores = [float(f.mean() / 255.0) for f in frames]
+        return scores, np.array([[s] for s in scores], dtype=np.float32)
+
+
+def _boxes(mapping):
+    """Fake face detector returning fixed boxes keyed by frame brightness."""
+    return lambda img: mapping.get(int(round(img.mean())), [])
+
+
+def test_boxes_are_scaled_to_full_resolution_and_filtered():
+    frame = np.full((720, 1280, 3), 10, dtype=np.uint8)
+    # detector sees a 320px-wide copy (scale 0.25)
+    cropper = FaceCropper(detect_fn=_boxes({10: [(10, 10, 20, 20), (100, 50, 4, 4)]}), min_face=20)
+    assert cropper.detect(frame) == [(40, 40, 80, 80)]
+
+
+def test_crop_is_square_padded_and_clamped():
+    frame = np.zeros((100, 200, 3), dtype=np.uint8)
+    cropper = FaceCropper(detect_fn=lambda img: [], padding=0.5)
+    assert cropper.crop(frame, (90, 40, 20, 20)).shape == (40, 40, 3)
+    # near the corner the crop slides inside the frame instead of shrinking
+    assert cropper.crop(frame, (0, 0, 30, 30)).shape == (60, 60, 3)
+    assert cropper.crop(frame, (0, 0, 90, 90)).shape == (100, 100, 3)
+
+
+def test_scores_faces_in_one_batch_and_keeps_best_face():
+    # 640px wide: the detector sees a half-resolution copy
+    faces = np.full((400, 640, 3), 100, dtype=np.uint8)
+    faces[140:180, 280:320] = 250  # the second, brighter face
+    empty = np.full((400, 640, 3), 30, dtype=np.uint8)
+    cropper = FaceCropper(
+        detect_fn=lambda img: [(20, 20, 30, 30), (140, 70, 20, 20)] if img.mean() > 50 else [],
+        padding=0.0,
+        min_face=10,
+    )
+    full = RecordingDetector()
+    detector = FaceCropDetector(full, cropper=cropper, no_face="downsample")
+
+    scores, embeddings = detector.predict_frames_with_embeddings([faces, empty])
+    assert len(full.inputs) == 1  # crops and the downsampled frame share one batch
+    assert full.inputs[0] == [(60, 60, 3), (40, 40, 3), (224, 358, 3)]
+    assert scores[0] == pytest.approx(250 / 255)
+    assert scores[1] == pytest.approx(30 / 255)
+    assert embeddings[0, 0] == pytest.approx(scores[0])
+
+    stats = detector.get_stats()
+    assert (stats["frames"], stats["frames_with_faces"], stats["faces"]) == (2, 1, 2)
+
+
+def test_skip_mode_scores_faceless_frames_without_model():
+    full = RecordingDetector()
+    detector = FaceCropDetector(full, cropper=FaceCropper(detect_fn=lambda img: []), no_face="skip", no_face_score=0.05)
+    assert detector.predict_frames([np.zeros((50, 50, 3), dtype=np.uint8)]) == [0.05]
+    assert full.inputs == []
+    assert detector.get_stats()["skipped_frames"] == 1
+
+
+def test_invalid_options():
+    with pytest.raises(ValueError):
+        FaceCropDetector(RecordingDetector(), cropper=FaceCropper(detect_fn=lambda img: []), no_face="blur")
+    with pytest.raises(ValueError):
+        FaceCropper(method="yunet")
+    with pytest.raises(FileNotFoundError):
+        FaceCropper(method="yunet", model_path="missing.onnx")
+
+
+@pytest.mark.skipif(not hasattr(cv2, "CascadeClassifier"), reason="OpenCV build without Haar cascades")
+def test_haar_detector_runs():
+    cropper = FaceCropper(method="haar")
+    assert cropper.detect(np.zeros((240, 320, 3), dtype=np.uint8)) == []
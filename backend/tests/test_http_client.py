@@ -0,0 +1,92 @@
+"""Tests for the shared application HTTP client.
+
+Run with: pytest tests/test_http_client.py -v
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.http_client import SharedHttpClient
+from app.services.webhook_service import WebhookService
+
+
+def recording_transport(requests, delay=0.0):
+    async def handler(request):
+        requests.append(request)
+        if delay:
+            await asyncio.sleep(delay)
+        return httpx.Response(200, content=b"ok")
+
+    return httpx.MockTransport(handler)
+
+
+@pytest.mark.asyncio
+async def test_one_client_is_reused_until_closed():
+    requests = []
+    shared = SharedHttpClient(http2=False, transport=recording_transport(requests), headers={"User-Agent": "t"})
+    first = shared.start()
+    await shared.client.get("https://cdn.example.com/a.jpg")
+    await shared.client.get("https://cdn.example.com/b.jpg")
+    assert shared.client is first
+    assert [r.headers["user-agent"] for r in requests] == ["t", "t"]
+    await shared.aclose()
+    assert first.is_closed
+
+
+def test_http2_falls_back_without_h2(monkeypatch):
+    import builtins
+
+    real_import = builtins.__import__
+
+    def no_h2(name, *args, **kwargs):
+        if name == "h2":
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", no_h2)
+    assert SharedHttpClient(http2=True).http2 is False
+
+
+@pytest.mark.asyncio
+async def test_webhooks_use_the_shared_client(monkeypatch):
+    requests = []
+    shared = SharedHttpClient(http2=False, transport=recording_transport(requests))
+    monkeypatch.setattr(WebhookService, "http_client", shared)
+    assert await WebhookService.send_webhook("https://hooks.example.com/x", "scan.completed", {"scan_id": "1"})
+    assert requests[0].url.host == "hooks.example.com"
+    await shared.aclose()
+
+
+def redirecting_transport(requests):
+    async def handler(request):
+        requests.append(request)
+        if request.url.path == "/old":
+            return httpx.Response(302, headers={"Location": "/new"})
+        return httpx.Response(200, content=b"ok")
+
+    return httpx.MockTransport(handler)
+
+
+@pytest.mark.asyncio
+async def test_webhook_redirect_is_a_failed_delivery(monkeypatch):
+    requests = []
+    shared = SharedHttpClient(http2=False, transport=redirecting_transport(requests))
+    monkeypatch.setattr(WebhookService, "http_client", shared)
+    delivered = await WebhookService.send_webhook("https://hooks.example.com/old", "scan.completed", {}, retry_count=1)
+    assert delivered is False
+    assert [(r.method, r.url.path) for r in requests] == [("POST", "/old")]
+    await shared.aclose()
+
+
+def test_client_from_another_loop_is_replaced_with_a_warning(capsys):
+    shared = SharedHttpClient(http2=False, transport=recording_transport([]))
+
+    async def current():
+        return shared.client
+
+    first = asyncio.run(current())
+    second = asyncio.run(current())
+    assert second is not first
+    assert "another event loop" in capsys.readouterr().out
@@ -0,0 +1,89 @@
+"""Tests for the process-pool inference workers.
+
+Run with: pytest tests/test_inference_pool.py -v
+"""
+
+import os
+import time
+
+import numpy as np
+import pytest
+
+from app.services.inference_pool import InferencePool
+
+
+class MeanPixelDetector:
+    """Scores each frame by its mean pixel value so transfers can be checked."""
+
+    def __init__(self, fail_on_empty=False):
+        self.fail_on_empty = fail_on_empty
+
+    def predict_frames(self, frames):
+        if self.fail_on_empty and any(f.size == 0 for f in frames):
+            raise ValueError("empty frame")
+        return [float(f.mean()) / 255.0 for f in frames]
+
+
+class CrashingDetector(MeanPixelDetector):
+    """Kills its worker process on a frame whose first pixel is 13."""
+
+    def predict_frames(self, frames):
+        if any(f.size and f.flat[0] == 13 for f in frames):
+            os._exit(1)
+        return super().predict_frames(frames)
+
+
+def make_detector(**kwargs):
+    return MeanPixelDetector(**kwargs)
+
+
+def make_crashing_detector():
+    return CrashingDetector()
+
+
+def failing_factory():
+    raise RuntimeError("cannot load model")
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = InferencePool(make_detector, {"fail_on_empty": True}, workers=2, threads_per_worker=None)
+    yield pool
+    pool.close()
+
+
+def test_frames_round_trip_through_shared_memory(pool):
+    frames = [
+        np.full((10, 12, 3), 51, dtype=np.uint8),
+        np.full((4, 4, 3), 255, dtype=np.uint8),
+        np.zeros((7, 5, 3), dtype=np.uint8),
+    ]
+    scores = pool.predict_frames(frames)
+    np.testing.assert_allclose(scores, [0.2, 1.0, 0.0])
+    assert pool.get_stats()['alive'] == 2
+
+
+def test_worker_errors_are_raised_in_caller(pool):
+    with pytest.raises(RuntimeError, match="empty frame"):
+        pool.predict_frames([np.zeros((0, 3, 3), dtype=np.uint8)])
+    # the worker keeps serving afterwards
+    assert pool.predict_frames([np.zeros((2, 2, 3), dtype=np.uint8)]) == [0.0]
+
+
+def test_startup_failure_is_reported():
+    with pytest.raises(RuntimeError, match="cannot load model"):
+        InferencePool(failing_factory, workers=1, threads_per_worker=None, start_timeout=60)
+
+
+def test_dead_worker_fails_its_job_and_is_restarted():
+    pool = InferencePool(make_crashing_detector, workers=1, threads_per_worker=None, watchdog_interval=0.1)
+    try:
+        started = time.monotonic()
+        with pytest.raises(RuntimeError, match="worker 0 died"):
+            pool.predict_frames([np.full((2, 2, 3), 13, dtype=np.uint8)])
+        assert time.monotonic() - started < 30  # not the 120 s job timeout
+        assert pool.predict_frames([np.zeros((2, 2, 3), dtype=np.uint8)]) == [0.0]
+        assert pool.get_stats()['restarts'] == 1
+        assert pool.get_stats()['alive'] == 1
+    finally:
+        pool.close()
@@ -0,0 +1,89 @@
+"""Tests for the cross-request micro-batching scheduler.
+
+Run with: pytest tests/test_inference_scheduler.py -v
+"""
+
+import asyncio
+
+import pytest
+
+from backend.app.services.inference_scheduler import InferenceScheduler
+
+
+class RecordingModel:
+    """Fake detector: score is the frame value, batch sizes are recorded."""
+
+    def __init__(self):
+        self.batches = []
+
+    def predict_frames(self, frames):
+        self.batches.append(len(frames))
+        return [float(f) for f in frames]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_a_batch():
+    model = RecordingModel()
+    scheduler = InferenceScheduler(model.predict_frames, max_batch_size=8, max_wait_ms=50)
+
+    results = await asyncio.gather(*[scheduler.predict_frames([i, i + 0.5]) for i in range(3)])
+
+    assert results == [[0.0, 0.5], [1.0, 1.5], [2.0, 2.5]]
+    assert model.batches == [6]
+    stats = scheduler.get_stats()
+    assert stats['batches'] == 1
+    assert stats['requests'] == 3
+    assert stats['batch_size']['max'] == 6
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_batches_respect_max_batch_size():
+    model = RecordingModel()
+    scheduler = InferenceScheduler(model.predict_frames, max_batch_size=4, max_wait_ms=50)
+
+    results = await asyncio.gather(*[scheduler.predict_frames([i, i]) for i in range(5)])
+
+    assert [r[0] for r in results] == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert all(size <= 4 for size in model.batches)
+    assert sum(model.batches) == 10
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_model_errors_reach_every_caller_in_the_batch():
+    def broken(frames):
+        raise RuntimeError("boom")
+
+    scheduler = InferenceScheduler(broken, max_batch_size=8, max_wait_ms=20)
+    results = await asyncio.gather(
+        scheduler.predict_frames([1]), scheduler.predict_frames([2]), return_exceptions=True
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_batches_overlap():
+    """With several slots, a slow batch does not hold back the next one."""
+    import threading
+
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def slow(frames):
+        import time
+
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.pop()
+        return [0.0 for _ in frames]
+
+    scheduler = InferenceScheduler(slow, max_batch_size=1, max_wait_ms=0, max_concurrent_batches=2)
+    await asyncio.gather(*[scheduler.predict_frames([i]) for i in range(4)])
+    assert max(peak) == 2
+    await scheduler.stop()
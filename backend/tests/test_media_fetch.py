@@ -0,0 +1,137 @@
+"""Tests for the streaming media fetcher.
+
+Run with: pytest tests/test_media_fetch.py -v
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.http_client import SharedHttpClient
+from app.services.media_fetch import MediaFetcher, MediaTooLarge, UnsupportedMedia, sniff_media_type
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 56
+MP4 = b"\x00\x00\x00\x18ftypisom" + b"\x00" * 52
+
+
+class ChunkedBody(httpx.AsyncByteStream):
+    """Yields `chunk` up to `count` times and records how many were read."""
+
+    def __init__(self, chunk, count):
+        self.chunk = chunk
+        self.count = count
+        self.sent = 0
+
+    async def __aiter__(self):
+        for _ in range(self.count):
+            self.sent += 1
+            yield self.chunk
+
+
+def fetcher_for(handler, max_bytes=1024, follow_redirects=False):
+    shared = SharedHttpClient(http2=False, transport=httpx.MockTransport(handler))
+    return MediaFetcher(shared, max_bytes=max_bytes, follow_redirects=follow_redirects)
+
+
+def redirect_to_png(request):
+    if request.url.path == "/short":
+        return httpx.Response(302, headers={"Location": "https://cdn.example.com/i/7f3a9c"})
+    return httpx.Response(200, content=PNG)
+
+
+@pytest.mark.parametrize(
+    "head,content_type,expected",
+    [
+        (b"\xff\xd8\xff\xe0" + b"\x00" * 28, None, "image"),
+        (PNG[:32], "application/octet-stream", "image"),
+        (b"RIFF\x00\x00\x00\x00WEBPVP8 ", None, "image"),
+        (MP4[:32], None, "video"),
+        (b"\x1a\x45\xdf\xa3" + b"\x00" * 28, None, "video"),
+        (b"\x00\x00\x00\x1cftypavif" + b"\x00" * 20, None, None),
+        (b"\x00" * 32, "image/jpeg", "image"),
+        (b"<!doctype html><html>" + b" " * 11, None, None),
+    ],
+)
+def test_sniff_media_type(head, content_type, expected):
+    assert sniff_media_type(head, content_type) == expected
+
+
+@pytest.mark.asyncio
+async def test_extensionless_image_is_returned_in_full():
+    fetcher = fetcher_for(lambda request: httpx.Response(200, content=PNG))
+    fetched = await fetcher.fetch("https://cdn.example.com/i/7f3a9c")
+    assert fetched["media_type"] == "image"
+    assert fetched["data"] == PNG
+
+
+@pytest.mark.asyncio
+async def test_html_is_rejected_before_reading_the_body():
+    body = ChunkedBody(b"<p>hello</p>" * 10, 100)
+    fetcher = fetcher_for(lambda request: httpx.Response(200, headers={"Content-Type": "text/html"}, stream=body))
+    with pytest.raises(UnsupportedMedia):
+        await fetcher.fetch("https://example.com/page")
+    assert body.sent == 0
+
+
+@pytest.mark.asyncio
+async def test_declared_length_over_cap_is_rejected_up_front():
+    body = ChunkedBody(PNG, 100)
+    fetcher = fetcher_for(
+        lambda request: httpx.Response(200, headers={"Content-Length": "6400"}, stream=body), max_bytes=1024
+    )
+    with pytest.raises(MediaTooLarge):
+        await fetcher.fetch("https://cdn.example.com/huge.png")
+    assert body.sent == 0
+
+
+@pytest.mark.asyncio
+async def test_body_over_cap_aborts_mid_stream():
+    body = ChunkedBody(PNG, 100)
+    fetcher = fetcher_for(lambda request: httpx.Response(200, stream=body), max_bytes=1024)
+    with pytest.raises(MediaTooLarge):
+        await fetcher.fetch("https://cdn.example.com/huge.png")
+    assert body.sent == 1024 // len(PNG) + 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_bytes_abort_after_the_first_chunk():
+    body = ChunkedBody(b"\x00" * 64, 100)
+    fetcher = fetcher_for(lambda request: httpx.Response(200, stream=body))
+    with pytest.raises(UnsupportedMedia):
+        await fetcher.fetch("https://cdn.example.com/blob")
+    assert body.sent == 1
+
+
+@pytest.mark.asyncio
+async def test_video_stops_after_sniffing():
+    body = ChunkedBody(MP4, 1000)
+    fetcher = fetcher_for(lambda request: httpx.Response(200, stream=body), max_bytes=1024)
+    fetched = await fetcher.fetch("https://cdn.example.com/clip")
+    assert fetched["media_type"] == "video"
+    assert fetched["data"] is None
+    assert body.sent == 1
+
+
+@pytest.mark.asyncio
+async def test_redirects_fail_the_fetch_unless_enabled():
+    with pytest.raises(httpx.HTTPStatusError):
+        await fetcher_for(redirect_to_png).fetch("https://sho.rt/short")
+    fetched = await fetcher_for(redirect_to_png, follow_redirects=True).fetch("https://sho.rt/short")
+    assert fetched["data"] == PNG
+
+
+@pytest.mark.asyncio
+async def test_total_timeout_bounds_the_whole_fetch():
+    class SlowBody(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            yield PNG[:8]
+            await asyncio.sleep(1.0)
+            yield PNG[8:]
+
+    shared = SharedHttpClient(
+        http2=False, total_timeout=0.05, transport=httpx.MockTransport(lambda request: httpx.Response(200, stream=SlowBody()))
+    )
+    with pytest.raises(httpx.TimeoutException):
+        await MediaFetcher(shared).fetch("https://cdn.example.com/slow")
+    await shared.aclose()
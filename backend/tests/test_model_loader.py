@@ -0,0 +1,70 @@
+"""Tests for background model loading and warmup.
+
+Run with: pytest tests/test_model_loader.py -v
+"""
+
+import threading
+
+import pytest
+
+from app.services.model_loader import ModelLoader
+
+
+class FakeDetector:
+    def __init__(self):
+        self.warmed = []
+
+    def warmup(self, batch_sizes):
+        self.warmed.extend(batch_sizes)
+
+    def predict_frames(self, frames):
+        return [0.5 for _ in frames]
+
+
+def test_loads_in_background_and_warms_up():
+    release = threading.Event()
+    detector = FakeDetector()
+
+    def factory():
+        release.wait(5)
+        return detector
+
+    loader = ModelLoader(factory, warmup_batch_sizes=[1, 8])
+    assert loader.get_status()['status'] == 'cold'
+    loader.start()
+    assert loader.get_status()['status'] == 'loading'
+    assert not loader.is_ready
+
+    release.set()
+    assert loader.wait_ready(timeout=5) is detector
+    assert loader.is_ready
+    assert detector.warmed == [1, 8]
+
+
+def test_first_prediction_triggers_lazy_load():
+    loader = ModelLoader(FakeDetector)
+    assert loader.predict_frames([1, 2]) == [0.5, 0.5]
+    assert loader.is_ready
+
+
+def test_failed_load_is_reported():
+    def factory():
+        raise RuntimeError("no weights")
+
+    loader = ModelLoader(factory)
+    with pytest.raises(RuntimeError, match="no weights"):
+        loader.predict_frames([1])
+    status = loader.get_status()
+    assert status['status'] == 'failed'
+    assert 'no weights' in status['error']
+
+
+def test_fallback_detector_is_reported_as_degraded():
+    class FallbackDetector(FakeDetector):
+        degraded = True
+
+    loader = ModelLoader(FallbackDetector)
+    assert loader.predict_frames([1]) == [0.5]
+    assert not loader.is_ready
+    assert loader.degraded
+    assert loader.get_status()['status'] == 'degraded'
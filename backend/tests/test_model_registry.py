@@ -0,0 +1,200 @@
+"""Tests for the versioned model registry (hot swap, draining, shadow mode).
+
+Run with: pytest tests/test_model_registry.py -v
+"""
+
+import threading
+import time
+
+import pytest
+
+from app.services.model_registry import ModelRegistry
+
+
+class VersionedDetector:
+    def __init__(self, version, gate=None):
+        self.version = version
+        self.gate = gate
+        self.closed = False
+
+    def predict_frames(self, frames):
+        if self.gate is not None:
+            self.gate.wait(5)
+        assert not self.closed, "scored on a closed detector"
+        return [self.version / 10 for _ in frames]
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def repo(tmp_path):
+    for version in (1, 2, 3):
+        (tmp_path / "det" / str(version)).mkdir(parents=True)
+    return tmp_path
+
+
+def _wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+def test_defaults_to_latest_version(repo):
+    registry = ModelRegistry(VersionedDetector, repo, "det")
+    assert registry.version == 3
+    assert registry.predict_frames([1, 2]) == [0.3, 0.3]
+    assert registry.get_status()["version"] == 3
+
+
+def test_deploy_swaps_after_draining_old_model(repo):
+    gate = threading.Event()
+    built = {}
+
+    def factory(version):
+        built[version] = VersionedDetector(version, gate if version == 1 else None)
+        return built[version]
+
+    swapped = []
+    registry = ModelRegistry(factory, repo, "det", version=1)
+    registry.on_swap.append(swapped.append)
+    registry.wait_ready(timeout=5)
+
+    # a batch still running on v1 while v2 is deployed
+    slow = {}
+    worker = threading.Thread(target=lambda: slow.setdefault("scores", registry.predict_frames([1])))
+    worker.start()
+    _wait_for(lambda: registry._in_flight)
+
+    registry.deploy(2)
+    # on_swap callbacks run just after the version flips
+    _wait_for(lambda: swapped == [2])
+    assert registry.version == 2
+    # new traffic goes to v2 while v1 drains
+    assert registry.predict_frames([1]) == [0.2]
+    assert registry.deployment["state"] == "draining"
+    assert not built[1].closed
+
+    gate.set()
+    worker.join(5)
+    assert slow["scores"] == [0.1]
+    _wait_for(lambda: registry.deployment["state"] == "done")
+    assert built[1].closed
+    assert registry.deployment["drained"] is True
+
+
+def test_deploy_rejects_unknown_version_and_concurrent_deploys(repo):
+    gate = threading.Event()
+
+    def factory(version):
+        if version == 2:
+            gate.wait(5)
+        return VersionedDetector(version)
+
+    registry = ModelRegistry(factory, repo, "det", version=1)
+    with pytest.raises(ValueError):
+        registry.deploy(9)
+    registry.deploy(2)
+    with pytest.raises(RuntimeError):
+        registry.deploy(3)
+    gate.set()
+    _wait_for(lambda: registry.deployment["state"] == "done")
+    assert registry.version == 2
+
+
+def test_failed_deploy_keeps_serving_current_version(repo):
+    def factory(version):
+        if version == 2:
+            raise RuntimeError("corrupt model")
+        return VersionedDetector(version)
+
+    registry = ModelRegistry(factory, repo, "det", version=1)
+    registry.deploy(2)
+    _wait_for(lambda: registry.deployment["state"] == "failed")
+    assert "corrupt model" in registry.deployment["error"]
+    assert registry.predict_frames([1]) == [0.1]
+
+
+def test_deploy_before_first_load_does_not_load_outgoing_version(repo):
+    built = []
+
+    def factory(version):
+        built.append(version)
+        return VersionedDetector(version)
+
+    registry = ModelRegistry(factory, repo, "det", version=1)  # as with MODEL_PRELOAD=false
+    registry.deploy(2)
+    _wait_for(lambda: registry.deployment["state"] == "done")
+    assert registry.predict_frames([1]) == [0.2]
+    assert registry.is_ready
+    assert built == [2]
+
+
+def test_shadow_scores_sampled_traffic(repo):
+    samples = iter([0.05, 0.9, 0.05])
+    registry = ModelRegistry(VersionedDetector, repo, "det", version=1, rng=lambda: next(samples))
+    registry.start_shadow(3, fraction=0.1)
+    _wait_for(lambda: registry.shadow_state == "active")
+
+    for _ in range(3):
+        assert registry.predict_frames([1, 2]) == [0.1, 0.1]
+    _wait_for(lambda: len(registry.shadow_log) == 2)
+    entry = registry.shadow_log[0]
+    assert (entry["primary_version"], entry["primary_score"]) == (1, 0.1)
+    assert (entry["shadow_version"], entry["shadow_score"]) == (3, 0.3)
+    assert registry.get_registry_status()["shadow"]["mean_abs_diff"] == pytest.approx(0.2)
+
+    registry.stop_shadow()
+    assert registry.get_registry_status()["shadow"]["state"] is None
+    registry.close()
+
+
+def test_busy_shadow_drops_batches_instead_of_queueing_them(repo):
+    gate = threading.Event()
+    registry = ModelRegistry(
+        lambda version: VersionedDetector(version, gate if version == 3 else None), repo, "det", version=1
+    )
+    registry.start_shadow(3, fraction=1.0)
+    _wait_for(lambda: registry.shadow_state == "active")
+
+    for _ in range(3):
+        assert registry.predict_frames([1]) == [0.1]
+    assert registry.get_registry_status()["shadow"]["dropped"] == 2
+
+    gate.set()
+    _wait_for(lambda: len(registry.shadow_log) == 1)
+    registry.predict_frames([1])
+    _wait_for(lambda: len(registry.shadow_log) == 2)
+    registry.close()
+
+
+def test_shadow_stopped_while_loading_is_closed_not_installed(repo):
+    release = threading.Event()
+    built = []
+
+    def factory(version):
+        if version == 3:
+            release.wait(5)
+        built.append(VersionedDetector(version))
+        return built[-1]
+
+    registry = ModelRegistry(factory, repo, "det", version=1)
+    registry.start_shadow(3, fraction=1.0)
+    assert registry.shadow_state == "loading"
+    registry.stop_shadow()
+    release.set()
+
+    _wait_for(lambda: any(d.version == 3 for d in built))
+    _wait_for(lambda: next(d for d in built if d.version == 3).closed)
+    assert registry.shadow is None
+    assert registry.shadow_state is None
+    registry.close()
+
+
+def test_unversioned_backend_cannot_deploy():
+    registry = ModelRegistry(lambda version: VersionedDetector(1))
+    assert registry.version is None
+    assert registry.available_versions() == []
+    with pytest.raises(ValueError):
+        registry.deploy(1)
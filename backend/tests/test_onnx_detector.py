@@ -0,0 +1,63 @@
+"""Tests for the ONNX Runtime detector backend.
+
+Run with: pytest tests/test_onnx_detector.py -v
+"""
+
+import numpy as np
+import pytest
+
+onnx = pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+from onnx import TensorProto, helper
+
+from models.factory import create_detector
+from models.onnx_detector import OnnxDetector
+
+
+def _write_tiny_model(path):
+    """sigmoid(mean(input)) with the exported detector's I/O names and dynamic batch axis."""
+    graph = helper.make_graph(
+        [
+            helper.make_node("Flatten", ["input"], ["flat"], axis=1),
+            helper.make_node("ReduceMean", ["flat"], ["mean"], axes=[1], keepdims=1),
+            helper.make_node("Sigmoid", ["mean"], ["output"]),
+        ],
+        "tiny_detector",
+        [helper.make_tensor_value_info("input", TensorProto.FLOAT, ["batch", 3, 224, 224])],
+        [helper.make_tensor_value_info("output", TensorProto.FLOAT, ["batch", 1])],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)], ir_version=8)
+    path.parent.mkdir(parents=True)
+    onnx.save(model, str(path))
+
+
+@pytest.fixture
+def model_repo(tmp_path):
+    _write_tiny_model(tmp_path / "deepfake_detector_onnx" / "1" / "model.onnx")
+    _write_tiny_model(tmp_path / "deepfake_detector_onnx" / "2" / "model.onnx")
+    return tmp_path
+
+
+def test_loads_latest_version_from_repository(model_repo):
+    det = OnnxDetector(model_repository=model_repo, intra_op_threads=1)
+    assert det.model_path == model_repo / "deepfake_detector_onnx" / "2" / "model.onnx"
+
+
+def test_predict_frames_batches_and_scores(model_repo):
+    det = create_detector("onnx", model_repository=model_repo, version=1, max_batch_size=2)
+    frames = [np.zeros((100, 80, 3), dtype=np.uint8), np.full((300, 200, 3), 255, dtype=np.uint8)] * 3
+    scores = det.predict_frames(frames)
+    assert len(scores) == 6
+    assert all(0.0 < s < 1.0 for s in scores)
+    # brighter frames have a larger normalized mean
+    assert scores[1] > scores[0]
+
+
+def test_missing_model_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        OnnxDetector(model_repository=tmp_path)
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError, match="Unknown detector backend"):
+        create_detector("tensorrt")
@@ -0,0 +1,61 @@
+"""Tests for the perceptual-hash near-duplicate cache.
+
+Run with: pytest tests/test_phash_cache.py -v
+"""
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from app.services.phash_cache import PerceptualHashCache
+
+
+def _image(seed):
+    """Smooth random image (blurred noise) so hashes are stable under re-encoding."""
+    rng = np.random.default_rng(seed)
+    noise = rng.integers(0, 255, size=(60, 80, 3), dtype=np.uint8)
+    return cv2.resize(cv2.GaussianBlur(noise, (9, 9), 0), (640, 480))
+
+
+def _reencode(img, scale=0.5, quality=60):
+    small = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    ok, buf = cv2.imencode(".jpg", small, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    assert ok
+    return cv2.imdecode(buf, cv2.IMREAD_COLOR)
+
+
+@pytest.mark.parametrize("method", ["dhash", "phash"])
+def test_resized_reencoded_copy_hits(method):
+    cache = PerceptualHashCache(max_entries=10, radius=8, method=method)
+    original = _image(1)
+    cache.store(cache.hash_image(original), {"score": 0.9, "flags": ["model_suspect_frame"]})
+
+    hit = cache.lookup(cache.hash_image(_reencode(original)))
+    assert hit is not None
+    assert hit["score"] == 0.9
+    assert hit["flags"] == ["model_suspect_frame"]
+    assert cache.lookup(cache.hash_image(_image(2))) is None
+
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PerceptualHashCache(max_entries=2, radius=0)
+    cache.store(0b0001, {"score": 0.1, "flags": []})
+    cache.store(0b1111 << 8, {"score": 0.2, "flags": []})
+    assert cache.lookup(0b0001) is not None  # refresh first entry
+    cache.store(0xFF << 32, {"score": 0.3, "flags": []})
+
+    assert cache.lookup(0b0001)["score"] == 0.1
+    assert cache.lookup(0b1111 << 8) is None
+    assert cache.get_stats()["evictions"] == 1
+    assert cache.get_stats()["entries"] == 2
+
+
+def test_lookup_respects_radius():
+    cache = PerceptualHashCache(radius=2)
+    cache.store(0, {"score": 0.5, "flags": []})
+    assert cache.lookup(0b11)["distance"] == 2
+    assert cache.lookup(0b111) is None
@@ -0,0 +1,50 @@
+"""Tests for the vectorized frame preprocessing stage.
+
+Run with: pytest tests/test_preprocessing.py -v
+"""
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from models.preprocessing import IMAGENET_MEAN, IMAGENET_STD, FramePreprocessor
+
+
+def _reference(frame, size=224):
+    """Straightforward per-frame resize -> float -> normalize -> CHW."""
+    interp = cv2.INTER_AREA if max(frame.shape[:2]) > size else cv2.INTER_LINEAR
+    arr = cv2.resize(frame, (size, size), interpolation=interp).astype(np.float32) / 255.0
+    arr = (arr - np.array(IMAGENET_MEAN, dtype=np.float32)) / np.array(IMAGENET_STD, dtype=np.float32)
+    return arr.transpose(2, 0, 1)
+
+
+def test_batch_matches_per_frame_reference():
+    rng = np.random.default_rng(0)
+    frames = [
+        rng.integers(0, 255, size=(480, 640, 3), dtype=np.uint8),
+        rng.integers(0, 255, size=(224, 224, 3), dtype=np.uint8),
+        rng.integers(0, 255, size=(100, 90, 3), dtype=np.uint8),
+    ]
+    batch = FramePreprocessor()(frames)
+    assert batch.shape == (3, 3, 224, 224)
+    assert batch.dtype == np.float32
+    for got, frame in zip(batch, frames):
+        np.testing.assert_allclose(got, _reference(frame), atol=1e-5)
+
+
+def test_buffers_are_reused_between_calls():
+    pre = FramePreprocessor(size=32)
+    frame = np.zeros((64, 64, 3), dtype=np.uint8)
+    first = pre([frame] * 4)
+    second = pre([frame] * 2)
+    assert second.shape == (2, 3, 32, 32)
+    assert np.shares_memory(first, second)
+
+
+def test_grayscale_and_rgba_frames_are_converted():
+    pre = FramePreprocessor(size=16)
+    gray = np.full((20, 20), 128, dtype=np.uint8)
+    rgba = np.full((20, 20, 4), 128, dtype=np.uint8)
+    batch = pre([gray, rgba])
+    np.testing.assert_allclose(batch[0], batch[1])
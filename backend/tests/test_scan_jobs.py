@@ -0,0 +1,90 @@
+"""Tests for the background scan job queue.
+
+Run with: pytest tests/test_scan_jobs.py -v
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.scan_jobs import ScanJobQueue, ScanQueueFull
+
+
+async def wait_for(queue, job_id, status, timeout=2.0):
+    for _ in range(int(timeout / 0.01)):
+        if queue.get(job_id)['status'] == status:
+            return queue.get(job_id)
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job never reached {status}: {queue.get(job_id)}")
+
+
+@pytest.mark.asyncio
+async def test_job_runs_in_background_and_keeps_result():
+    async def process(job):
+        await asyncio.sleep(0.01)
+        return {'score': job['payload']['n'] * 0.1}
+
+    queue = ScanJobQueue(process, workers=1)
+    queue.start()
+    job = queue.submit({'n': 3})
+    assert job['status'] == 'queued'
+    done = await wait_for(queue, job['job_id'], 'done')
+    assert done['result'] == {'score': pytest.approx(0.3)}
+    assert done['finished_at'] >= done['started_at']
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_worker_count_bounds_concurrency():
+    active, peak = 0, 0
+
+    async def process(job):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+
+    queue = ScanJobQueue(process, workers=2)
+    queue.start()
+    jobs = [queue.submit({}) for _ in range(6)]
+    for job in jobs:
+        await wait_for(queue, job['job_id'], 'done')
+    assert peak == 2
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects():
+    queue = ScanJobQueue(lambda job: asyncio.sleep(0), max_queue=2)
+    first = queue.submit({})
+    queue.submit({})
+    with pytest.raises(ScanQueueFull):
+        queue.submit({})
+    assert queue.get_stats()['rejected'] == 1
+    assert queue.queue_position(first['job_id']) == 1
+
+
+@pytest.mark.asyncio
+async def test_failure_is_recorded():
+    async def process(job):
+        raise ValueError('download failed')
+
+    queue = ScanJobQueue(process)
+    queue.start()
+    job = queue.submit({})
+    failed = await wait_for(queue, job['job_id'], 'failed')
+    assert failed['error'] == 'download failed'
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_finished_jobs_expire():
+    now = [1000.0]
+    queue = ScanJobQueue(lambda job: asyncio.sleep(0), ttl_seconds=60, clock=lambda: now[0])
+    queue.start()
+    job = queue.submit({})
+    await wait_for(queue, job['job_id'], 'done')
+    now[0] += 61
+    assert queue.get(job['job_id']) is None
+    await queue.stop()
@@ -0,0 +1,102 @@
+"""Tests for the KServe v2 / Triton HTTP backend against the bundled stub server.
+
+Run with: pytest tests/test_triton_detector.py -v
+"""
+
+import numpy as np
+import pytest
+
+httpx = pytest.importorskip("httpx")
+onnx = pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+from fastapi.testclient import TestClient
+from onnx import TensorProto, helper
+
+from models.kserve_stub_server import create_app
+from models.onnx_detector import OnnxDetector
+from models.triton_detector import TritonDetector, decode_tensors, encode_tensors, split_body
+
+
+def _write_model(path, weight):
+    """Tiny ONNX model: sigmoid(weight * mean over C, H, W), output (N, 1)."""
+    inp = helper.make_tensor_value_info("input", TensorProto.FLOAT, ["N", 3, 224, 224])
+    out = helper.make_tensor_value_info("output", TensorProto.FLOAT, ["N", 1])
+    nodes = [
+        helper.make_node("ReduceMean", ["input"], ["m"], axes=[2, 3], keepdims=0),
+        helper.make_node("ReduceMean", ["m"], ["mm"], axes=[1], keepdims=1),
+        helper.make_node("Mul", ["mm", "w"], ["z"]),
+        helper.make_node("Sigmoid", ["z"], ["output"]),
+    ]
+    w = helper.make_tensor("w", TensorProto.FLOAT, [1], [weight])
+    graph = helper.make_graph(nodes, "tiny", [inp], [out], initializer=[w])
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 11)])
+    model.ir_version = 8
+    path.parent.mkdir(parents=True)
+    onnx.save(model, str(path))
+
+
+@pytest.fixture
+def repo(tmp_path):
+    _write_model(tmp_path / "det" / "1" / "model.onnx", 1.0)
+    _write_model(tmp_path / "det" / "2" / "model.onnx", -2.0)
+    return tmp_path
+
+
+def _frames(n):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, size=(100, 120, 3), dtype=np.uint8) for _ in range(n)]
+
+
+@pytest.mark.parametrize("binary", [True, False])
+def test_encode_decode_roundtrip(binary):
+    x = np.arange(24, dtype=np.float32).reshape(2, 3, 4)
+    body, headers = encode_tensors("inputs", [("input", x)], binary, extra={"id": "1"})
+    header_length = headers.get("Inference-Header-Content-Length")
+    header, blob = split_body(body, int(header_length) if header_length else None)
+    assert header["id"] == "1"
+    np.testing.assert_array_equal(decode_tensors("inputs", header, blob)["input"], x)
+
+
+@pytest.mark.parametrize("binary", [True, False])
+def test_scores_match_local_onnx_runtime(repo, binary):
+    client = TestClient(create_app(repo))
+    detector = TritonDetector(model_name="det", version=1, max_batch_size=2, binary=binary, client=client)
+    local = OnnxDetector(model_repository=repo, model_name="det", version=1)
+    assert detector.is_ready()
+
+    frames = _frames(5)
+    np.testing.assert_allclose(detector.predict_frames(frames), local.predict_frames(frames), rtol=1e-5)
+
+
+def test_latest_version_and_missing_model(repo):
+    client = TestClient(create_app(repo))
+    latest = TritonDetector(model_name="det", client=client)
+    assert latest.predict_frames(_frames(1))[0] < 0.5  # version 2 has a negative weight
+
+    missing = TritonDetector(model_name="nope", client=client, retries=0)
+    assert not missing.is_ready()
+    with pytest.raises(Exception, match="404"):
+        missing.predict_frames(_frames(1))
+
+
+def test_retries_transient_errors():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) < 3:
+            return httpx.Response(503)
+        header, blob = split_body(request.content, int(request.headers["Inference-Header-Content-Length"]))
+        n = decode_tensors("inputs", header, blob)["input"].shape[0]
+        body, headers = encode_tensors("outputs", [("output", np.full((n, 1), 0.7, dtype=np.float32))])
+        return httpx.Response(200, content=body, headers=headers)
+
+    client = httpx.Client(base_url="http://triton", transport=httpx.MockTransport(handler))
+    detector = TritonDetector(model_name="det", client=client, retries=2, backoff=0)
+    assert detector.predict_frames(_frames(2)) == pytest.approx([0.7, 0.7])
+    assert len(calls) == 3
+
+    calls.clear()
+    detector.retries = 1
+    with pytest.raises(httpx.HTTPStatusError):
+        detector.predict_frames(_frames(1))
@@ -0,0 +1,77 @@
+"""Tests for URL normalization and the URL-level result cache.
+
+Run with: pytest tests/test_url_cache.py -v
+"""
+
+import pytest
+
+from app.services.url_cache import UrlResultCache, normalize_url, youtube_video_id
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://youtu.be/dQw4w9WgXcQ?si=abcdef",
+    "https://m.youtube.com/watch?feature=share&v=dQw4w9WgXcQ&t=42",
+    "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+    "https://www.youtube.com/embed/dQw4w9WgXcQ",
+])
+def test_youtube_variants_share_one_key(url):
+    assert youtube_video_id(url) == "dQw4w9WgXcQ"
+    assert normalize_url(url) == "youtube:dQw4w9WgXcQ"
+
+
+def test_tracking_params_fragment_and_host_case_are_ignored():
+    a = normalize_url("HTTPS://WWW.Example.com:443/img/Fake.jpg?b=2&a=1&utm_source=tw&fbclid=x#top")
+    b = normalize_url("https://example.com/img/Fake.jpg?a=1&b=2")
+    assert a == b == "https://example.com/img/Fake.jpg?a=1&b=2"
+    # path case is significant
+    assert normalize_url("https://example.com/img/fake.jpg") != b
+
+
+def test_generic_param_names_are_only_stripped_on_known_hosts():
+    # on a CDN `ref` / `si` may select the content
+    assert normalize_url("https://cdn.example.com/media?ref=a") != normalize_url("https://cdn.example.com/media?ref=b")
+    assert normalize_url("https://cdn.example.com/media?si=1") == "https://cdn.example.com/media?si=1"
+    assert normalize_url("https://www.youtube.com/@channel?si=abc&feature=share") == "https://youtube.com/@channel"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_per_media_type_ttls_and_age():
+    clock = Clock()
+    cache = UrlResultCache({"image": 100, "video": 1000, "error": 10}, clock=clock)
+    cache.put("https://cdn.example.com/a.jpg", {"score": 0.3, "error": None}, "image")
+    cache.put("https://youtu.be/dQw4w9WgXcQ", {"score": 0.9, "error": None}, "video")
+    clock.now = 50
+    hit = cache.get("https://cdn.example.com/a.jpg?utm_campaign=x")
+    assert hit["result"]["score"] == 0.3
+    assert hit["age_seconds"] == 50
+    clock.now = 150
+    assert cache.get("https://cdn.example.com/a.jpg") is None
+    assert cache.get("https://www.youtube.com/watch?v=dQw4w9WgXcQ") is not None
+
+
+def test_failures_are_negatively_cached_with_short_ttl():
+    clock = Clock()
+    cache = UrlResultCache({"image": 100, "error": 10}, clock=clock)
+    cache.put("https://cdn.example.com/broken.jpg", {"score": 0.05, "error": "could not decode image"}, "image")
+    clock.now = 5
+    assert cache.get("https://cdn.example.com/broken.jpg")["result"]["error"] == "could not decode image"
+    clock.now = 11
+    assert cache.get("https://cdn.example.com/broken.jpg") is None
+    stats = cache.get_stats()
+    assert (stats["negative_hits"], stats["misses"]) == (1, 1)
+
+
+def test_lru_bound():
+    cache = UrlResultCache({"other": 100}, max_entries=2)
+    for i in range(3):
+        cache.put(f"https://example.com/{i}", {"score": i, "error": None}, "other")
+    assert cache.get("https://example.com/0") is None
+    assert cache.get_stats()["evictions"] == 1
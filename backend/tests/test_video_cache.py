@@ -0,0 +1,117 @@
+"""Tests for the on-disk video download cache.
+
+Run with: pytest tests/test_video_cache.py -v
+"""
+
+import threading
+import time
+
+import pytest
+
+from app.services.video_cache import VideoDownloadCache
+
+
+class FakeDownloader:
+    def __init__(self, size=100, delay=0.0, fail=False):
+        self.size = size
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+
+    def __call__(self, url, out_path):
+        self.calls.append(url)
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("download failed")
+        out_path.write_bytes(b"x" * self.size)
+
+
+def test_link_variants_share_one_download(tmp_path):
+    download = FakeDownloader()
+    cache = VideoDownloadCache(tmp_path, download)
+    for url in (
+        "https://youtu.be/dQw4w9WgXcQ",
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ&si=abc",
+        "https://m.youtube.com/shorts/dQw4w9WgXcQ",
+    ):
+        with cache.fetch(url) as path:
+            assert path.read_bytes() == b"x" * 100
+    assert len(download.calls) == 1
+    assert cache.get_stats()["hits"] == 2
+
+
+def test_concurrent_scans_share_the_in_flight_download(tmp_path):
+    download = FakeDownloader(delay=0.2)
+    cache = VideoDownloadCache(tmp_path, download)
+    paths = []
+
+    def scan():
+        with cache.fetch("https://youtu.be/dQw4w9WgXcQ") as path:
+            paths.append(path.exists())
+
+    threads = [threading.Thread(target=scan) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert paths == [True] * 4
+    assert len(download.calls) == 1
+    assert cache.get_stats()["shared_downloads"] == 3
+
+
+def test_evicts_least_recently_used_beyond_max_bytes(tmp_path):
+    cache = VideoDownloadCache(tmp_path, FakeDownloader(size=100), max_bytes=250)
+    for video_id in ("aaaaaaaaaaa", "bbbbbbbbbbb"):
+        with cache.fetch(f"https://youtu.be/{video_id}"):
+            pass
+    with cache.fetch("https://youtu.be/aaaaaaaaaaa"):
+        pass
+    with cache.fetch("https://youtu.be/ccccccccccc"):
+        pass
+    names = {p.name for p in tmp_path.iterdir()}
+    assert cache.file_name("https://youtu.be/bbbbbbbbbbb") not in names
+    assert cache.file_name("https://youtu.be/aaaaaaaaaaa") in names
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_file_in_use_is_not_evicted(tmp_path):
+    cache = VideoDownloadCache(tmp_path, FakeDownloader(size=100), max_bytes=150)
+    with cache.fetch("https://youtu.be/aaaaaaaaaaa") as first:
+        with cache.fetch("https://youtu.be/bbbbbbbbbbb"):
+            assert first.exists()
+    assert cache.get_stats()["bytes"] <= 150
+
+
+def test_failed_download_leaves_nothing_behind(tmp_path):
+    cache = VideoDownloadCache(tmp_path, FakeDownloader(fail=True))
+    with pytest.raises(RuntimeError):
+        with cache.fetch("https://youtu.be/dQw4w9WgXcQ"):
+            pass
+    assert list(tmp_path.iterdir()) == []
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_survives_restart_and_drops_partials(tmp_path):
+    cache = VideoDownloadCache(tmp_path, FakeDownloader())
+    with cache.fetch("https://youtu.be/dQw4w9WgXcQ"):
+        pass
+    stale = "0" * 32 + "." + "f" * 32
+    (tmp_path / f"{stale}.part").write_bytes(b"partial")
+    (tmp_path / f"{stale}.tmp.mp4").write_bytes(b"partial")
+
+    download = FakeDownloader()
+    reopened = VideoDownloadCache(tmp_path, download)
+    with reopened.fetch("https://www.youtube.com/watch?v=dQw4w9WgXcQ"):
+        pass
+    assert download.calls == []
+    assert not (tmp_path / f"{stale}.part").exists()
+    assert not (tmp_path / f"{stale}.tmp.mp4").exists()
+
+
+def test_leaves_unrelated_files_alone(tmp_path):
+    for name in ("notes.txt", "clip.mp4", "content_cache.sqlite3", "upload.part"):
+        (tmp_path / name).write_bytes(b"keep")
+    VideoDownloadCache(tmp_path, FakeDownloader())
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "clip.mp4", "content_cache.sqlite3", "notes.txt", "upload.part"
+    ]
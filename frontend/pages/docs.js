@@ -51,6 +51,25 @@ export default function APIDocs() {
     "url": "https://example.com/suspicious-video.mp4"
   }'`}</code>
               </pre>
+              <p className="text-gray-400 mt-4 mb-4">
+                Images are scanned while you wait. Videos can take minutes, so a video URL is answered with
+                <code className="bg-gray-700 px-2 py-1 rounded mx-1">202 Accepted</code> and a job to poll (or wait for the webhook):
+              </p>
+              <pre className="bg-black rounded-lg p-4 overflow-x-auto mb-4">
+                <code className="text-green-400">{`{
+  "job_id": "3f2b9c...",
+  "status": "queued",
+  "status_url": "/v1/scan/jobs/3f2b9c...",
+  "queue_position": 1
+}`}</code>
+              </pre>
+              <pre className="bg-black rounded-lg p-4 overflow-x-auto">
+                <code className="text-green-400">{`curl https://api.deepfakeguard.com/v1/scan/jobs/3f2b9c... \\
+  -H "X-API-Key: dfg_your_api_key_here"`}</code>
+              </pre>
+              <p className="text-gray-400 mt-4">
+                Add <code className="bg-gray-700 px-2 py-1 rounded">"wait": true</code> to the request body to hold the request open and get the scan result directly instead.
+              </p>
             </div>
           </section>
 
@@ -83,11 +102,19 @@ export default function APIDocs() {
               <pre className="bg-black rounded-lg p-4 overflow-x-auto mb-4">
                 <code className="text-yellow-400">{`{
   "url": "https://example.com/media.jpg",
-  "source": "telegram"  // optional
+  "source": "telegram",  // optional
+  "wait": false          // optional; true = scan videos synchronously
 }`}</code>
               </pre>
 
-              <h4 className="font-semibold mb-2">Response</h4>
+              <p className="text-gray-400 mb-4">
+                Video URLs return <code className="bg-gray-700 px-2 py-1 rounded">202</code> with a
+                <code className="bg-gray-700 px-2 py-1 rounded mx-1">job_id</code> unless
+                <code className="bg-gray-700 px-2 py-1 rounded mx-1">wait</code> is true; see
+                <code className="bg-gray-700 px-2 py-1 rounded mx-1">GET /v1/scan/jobs/{'{job_id}'}</code> below.
+              </p>
+
+              <h4 className="font-semibold mb-2">Response (image, or video with wait)</h4>
               <pre className="bg-black rounded-lg p-4 overflow-x-auto mb-4">
                 <code className="text-green-400">{`{
   "score": 0.85,              // 0-1, higher = more likely deepfake
@@ -121,6 +148,40 @@ console.log('Deepfake score:', result.score);`}</code>
               </pre>
             </div>
 
+            {/* Scan Job Status */}
+            <div className="bg-gray-800 rounded-lg p-6 border border-gray-700 mb-6">
+              <div className="flex items-center space-x-3 mb-4">
+                <span className="bg-blue-600 px-3 py-1 rounded text-sm font-bold">GET</span>
+                <span className="text-xl font-mono">/v1/scan/jobs/{'{job_id}'}</span>
+              </div>
+              <p className="text-gray-400 mb-4">
+                Status of a queued video scan, visible only to the API key that submitted it. The status moves from
+                <code className="bg-gray-700 px-2 py-1 rounded mx-1">queued</code> to
+                <code className="bg-gray-700 px-2 py-1 rounded mx-1">running</code> to
+                <code className="bg-gray-700 px-2 py-1 rounded mx-1">done</code> (with the scan response under
+                <code className="bg-gray-700 px-2 py-1 rounded mx-1">result</code>) or
+                <code className="bg-gray-700 px-2 py-1 rounded mx-1">failed</code> (with an
+                <code className="bg-gray-700 px-2 py-1 rounded mx-1">error</code>).
+              </p>
+
+              <h4 className="font-semibold mb-2">Response</h4>
+              <pre className="bg-black rounded-lg p-4 overflow-x-auto">
+                <code className="text-green-400">{`{
+  "job_id": "3f2b9c...",
+  "status": "done",
+  "status_url": "/v1/scan/jobs/3f2b9c...",
+  "created_at": 1766831400.0,
+  "started_at": 1766831401.2,
+  "finished_at": 1766831433.9,
+  "result": {
+    "score": 0.85,
+    "flags": ["model_suspect_video_frames"],
+    "details": { "scan_id": "abc123...", "job_id": "3f2b9c..." }
+  }
+}`}</code>
+              </pre>
+            </div>
+
             {/* Get Stats */}
             <div className="bg-gray-800 rounded-lg p-6 border border-gray-700 mb-6">
               <div className="flex items-center space-x-3 mb-4">
@@ -182,7 +243,8 @@ console.log('Deepfake score:', result.score);`}</code>
     "scan_id": "abc123",
     "url": "https://...",
     "score": 0.35,
-    "is_flagged": false
+    "is_flagged": false,
+    "job_id": null  // set for queued video scans
   }
 }`}</code>
                   </pre>
@@ -206,6 +268,25 @@ console.log('Deepfake score:', result.score);`}</code>
                   </pre>
                 </div>
 
+                <div className="bg-gray-900 rounded p-4">
+                  <h4 className="font-semibold mb-2">scan.failed</h4>
+                  <p className="text-gray-400 text-sm mb-2">Triggered when a queued video scan could not analyse its media</p>
+                  <pre className="bg-black rounded p-3 overflow-x-auto text-sm">
+                    <code className="text-yellow-400">{`{
+  "event": "scan.failed",
+  "timestamp": "2025-12-27T10:30:00Z",
+  "data": {
+    "job_id": "3f2b9c...",
+    "scan_id": "abc123",
+    "url": "https://...",
+    "error": "could not download video",
+    "score": 0.05,
+    "flags": []
+  }
+}`}</code>
+                  </pre>
+                </div>
+
                 <div className="bg-gray-900 rounded p-4">
                   <h4 className="font-semibold mb-2">review.completed</h4>
                   <p className="text-gray-400 text-sm mb-2">Triggered after manual review (Pro/Enterprise only)</p>
@@ -284,6 +365,10 @@ console.log('Deepfake score:', result.score);`}</code>
                   <code className="bg-yellow-900/50 text-yellow-300 px-3 py-1 rounded mr-4">429</code>
                   <span>Rate Limited - Monthly scan limit reached</span>
                 </div>
+                <div className="flex">
+                  <code className="bg-yellow-900/50 text-yellow-300 px-3 py-1 rounded mr-4">503</code>
+                  <span>Scan queue full - retry after the Retry-After header</span>
+                </div>
                 <div className="flex">
                   <code className="bg-red-900/50 text-red-300 px-3 py-1 rounded mr-4">500</code>
                   <span>Server Error - Something went wrong on our end</span>